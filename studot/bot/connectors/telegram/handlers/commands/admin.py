@@ -1,3 +1,7 @@
+import asyncio
+import datetime
+import json
+
 from aiogram import types, Dispatcher
 from aiogram.types import ContentTypes
 from aiogram.dispatcher.filters.state import State, StatesGroup
@@ -5,12 +9,31 @@ from aiogram.dispatcher import FSMContext
 
 from config import settings
 
-from bot.core.data_parser.JSONParser.parser import JSONParser
-from bot.core.data_parser.PDFParser.csv_parser import CSVParser
+from bot.core.data_parser.tasks import parse_change_csv
 from bot.core.notifier.notifier import notifier
 from bot.core.file_resolver.resolver import File
+from bot.core.statistics.metrics.metrics import metrics
+from bot.core.statistics.metrics.archive import metricsArchive
 from bot.core.statistics.proxy.proxy_users_db import usersDB
 from bot.core.utils.types.userinfo import UserInfo
+from bot.core.utils.workers import parsingPool, PoolQueueFull
+
+
+async def run_parsing(message: types.Message, func, *args):
+    """Run parsing stage in the parsing pool, tell admin if it is busy or failed
+
+    Returns:
+        Result of func or None
+    """
+    try:
+        return await parsingPool.run(func, *args, wait=False)
+    except PoolQueueFull:
+        await message.answer('Сейчас обрабатываются другие файлы, попробуй позже')
+    except asyncio.TimeoutError:
+        await message.answer('Обработка заняла слишком много времени и была отменена')
+    except Exception as e:
+        await message.answer(f'Ошибка обработки -- {e}')
+    return None
 
 
 async def get_user_info(user_id: int) -> UserInfo:
@@ -69,38 +92,60 @@ async def process_file(filepath, message: types.Message, state: FSMContext):
     date = data['date']
     await state.finish()
 
-    csvParser = CSVParser(csv_filepath=filepath)
-    csvParser.process()
-    dict_to_parse = csvParser.dict()
-    jsonParser = JSONParser(dict_to_parse=dict_to_parse)
-    changes = jsonParser.parse()
+    changes = await run_parsing(message, parse_change_csv, filepath)
+    if changes is None:
+        return
+
     new_changes_path = File('new_changes.json')
     with open(new_changes_path, 'w') as file:
-        import json
         json.dump(changes, file, ensure_ascii=False, indent=4, sort_keys=True)
 
     with open(new_changes_path, 'rb') as file:
         await message.bot.send_message(settings.admin_id, 'Обработал')
         await message.bot.send_document(settings.admin_id, file)
 
-    await save_to_db(changes, date)
-    await notifier.notify_changes()
+    changed = await save_to_db(changes, date)
+    await message.bot.send_message(settings.admin_id, f'Изменились замены {len(changed)} групп')
+    await notifier.notify_changes(datetime.date.fromisoformat(date), groups=changed)
 
 
-async def save_to_db(changes: dict, date: str):
+async def save_to_db(changes: dict, date: str) -> list[tuple[str, str]]:
     from bot.core.utils.db.shedule import sheduleDB
-    await sheduleDB.save_change_shedule(changes, date)
+    return await sheduleDB.save_change_shedule(changes, date)
+
+
 
 
 
 
+def format_metrics_summary(summary: dict, days: int) -> str:
+    day_counts = {}
+    for day, _, count in summary['days']:
+        day_counts[day] = day_counts.get(day, 0) + count
+
+    lines = [f'Метрики за {days} дн.', f'Пользователей: {summary["users"]}', '', 'По метрикам:']
+    lines += [f'{metric}: {count}' for metric, count in summary['metrics'].items()]
+    lines += ['', 'По дням:']
+    lines += [f'{day}: {count}' for day, count in day_counts.items()]
+    lines += ['', 'Активные группы:']
+    lines += [f'{course} {group}: {count}' for course, group, count in summary['groups']]
+    return '\n'.join(lines)
 
 
 async def cmd_get_metrcis_csv(message: types.Message, state: FSMContext):
     await state.finish()
     if message.from_user.id not in settings.admins_id:
         return
-    
+
+    # /metrics [days]
+    args = message.get_args()
+    days = int(args) if args and args.isdigit() else 7
+    end = datetime.datetime.now(settings.tz_info)
+    summary = await metrics.storage.summary(end - datetime.timedelta(days=days), end)
+    if summary is not None:
+        await message.answer(format_metrics_summary(summary, days))
+        return
+
     with open('data/metrics/metrics.csv', 'rb') as file:
         await message.bot.send_document(message.from_user.id, file)
 
@@ -109,6 +154,66 @@ async def cmd_get_metrcis_csv(message: types.Message, state: FSMContext):
 
 
 
+def parse_stats_period(args: str) -> tuple[datetime.date, datetime.date]:
+    """'' -- last 7 days, 'N' -- last N days, 'YYYY-MM-DD YYYY-MM-DD' -- the dates
+
+    Raises:
+        ValueError: Not a positive number, not ISO dates or start after end
+        OverflowError: Too many days
+    """
+    today = datetime.datetime.now(settings.tz_info).date()
+    parts = args.split()
+    if len(parts) > 2:
+        raise ValueError(f'Too many arguments: {args}')
+    if len(parts) == 2:
+        start, end = datetime.date.fromisoformat(parts[0]), datetime.date.fromisoformat(parts[1])
+        if start > end:
+            raise ValueError(f'Start {start} is after end {end}')
+        return start, end
+    days = int(parts[0]) if parts else 7
+    if days < 1:
+        raise ValueError(f'Days must be positive: {days}')
+    return today - datetime.timedelta(days=days-1), today
+
+
+def format_stats(stats: dict, start: datetime.date, end: datetime.date) -> str:
+    lines = [
+        f'Статистика {start.isoformat()} -- {end.isoformat()}',
+        f'Запросов: {stats["requests"]}',
+        f'Пользователей: {stats["users"]}'
+    ]
+    if stats['peak_hour'] is not None:
+        hour, count = stats['peak_hour']
+        lines.append(f'Пиковый час: {hour:02d}:00 ({count} запросов)')
+    lines += ['', 'DAU:']
+    lines += [f'{date}: {count}' for date, count in stats['dau'].items()]
+    lines += ['', 'Запросы по группам:']
+    lines += [f'{course} {group}: {count}' for course, group, count in stats['groups']]
+    return '\n'.join(lines)
+
+
+async def cmd_get_stats(message: types.Message, state: FSMContext):
+    await state.finish()
+    if message.from_user.id not in settings.admins_id:
+        return
+
+    # /stats [days] or /stats YYYY-MM-DD YYYY-MM-DD
+    try:
+        start, end = parse_stats_period(message.get_args() or '')
+    except (ValueError, OverflowError):
+        await message.answer('Формат: /stats [дней] или /stats ГГГГ-ММ-ДД ГГГГ-ММ-ДД')
+        return
+
+    # Reads only partitions of the period, still a blocking file read
+    loop = asyncio.get_running_loop()
+    stats = await loop.run_in_executor(None, metricsArchive.stats, start, end)
+    await message.answer(format_stats(stats, start, end))
+
+
+
+
+
+
 async def cmd_notify_all(message: types.Message, state: FSMContext):
     await state.finish()
     if message.from_user.id not in settings.admins_id:
@@ -181,10 +286,12 @@ async def pre_get_shedule(message: types.Message, state: FSMContext):
 
 
 async def get_shedule(filepath, message: types.Message):
-    from bot.connectors.telegram.handlers.commands.mainSheduleParser import MainSheduleParser
+    from bot.connectors.telegram.handlers.commands.mainSheduleParser import parse_main_shedule
 
-    parser = MainSheduleParser(filepath)
-    final, tmp = await parser.parse()
+    result = await run_parsing(message, parse_main_shedule, filepath)
+    if result is None:
+        return
+    final, tmp = result
 
     with open(final, 'rb') as final_io, open(tmp, 'rb') as tmp_io:
         await message.bot.send_document(
@@ -228,10 +335,11 @@ async def pre_get_parsed(message: types.Message, state: FSMContext):
 
 
 async def get_parsed(filepath, message: types.Message):
-    from bot.connectors.telegram.handlers.commands.sheduleParser import SheduleParser
+    from bot.connectors.telegram.handlers.commands.sheduleParser import parse_shedule
 
-    parser = SheduleParser(filepath)
-    final = await parser.parse()
+    final = await run_parsing(message, parse_shedule, filepath)
+    if final is None:
+        return
 
     with open(final, 'rb') as final_io:
         await message.bot.send_document(
@@ -244,6 +352,7 @@ async def get_parsed(filepath, message: types.Message):
 def register_admin_cmd(dp: Dispatcher):
     dp.register_message_handler(cmd_update_changes, commands="set_changes", state="*")
     dp.register_message_handler(cmd_get_metrcis_csv, commands="metrics", state="*")
+    dp.register_message_handler(cmd_get_stats, commands="stats", state="*")
     dp.register_message_handler(get_date, state=UpdateChangesSG.start)
     dp.register_message_handler(get_file_csv, state=UpdateChangesSG.csv_set, content_types=ContentTypes.DOCUMENT)
 
@@ -20,7 +20,7 @@ class MainSheduleParser:
 
         os.remove('jason.json')
 
-    async def _get_day(self, num: int) -> str:
+    def _get_day(self, num: int) -> str:
         if num < 7:
             return 'Понедельник'
         elif num < 14:
@@ -34,7 +34,7 @@ class MainSheduleParser:
         else:
             return 'Суббота'
         
-    async def parse(self) -> None:
+    def parse(self) -> tuple[str, str]:
         next = {}
         for group, shed in self.r.items():
             day_dict = {
@@ -69,4 +69,10 @@ class MainSheduleParser:
         with open(final, "w") as file:
             json.dump(next, file, ensure_ascii=False, indent=4)
 
-        return final, tmp
\ No newline at end of file
+        return final, tmp
+
+
+def parse_main_shedule(filepath: str) -> tuple[str, str]:
+    """ParsingPool stage: XLSX shedule -> (result json, technical json) paths
+    """
+    return MainSheduleParser(filepath).parse()
@@ -21,20 +21,9 @@ async def cmd_get_shedule_today(message: types.Message, state: FSMContext):
     day = datetime.date.today().weekday()
     today = SHEDULE_DAY.WEEKDAYS[day]
 
-    dayShedule = await sheduleDB.get_day_shedule(today, userInfo)
-    if isinstance(dayShedule, str):
-        await message.answer(dayShedule)
-        return
-    if dayShedule is None:
-        await message.answer(f'Нет расписания. Проверь название своей группы или курса\nТвоя группа - {userInfo.group}')
-        return
-    
-    await message.answer(
-        (
-            f'Расписание на {dayShedule.name}:\n'+
-            repr(dayShedule)
-        )
-    )
+    text = await sheduleDB.get_day_text(today, userInfo)
+
+    await message.answer(text)
 
 
 async def cmd_get_shedule_tomorrow(message: types.Message, state: FSMContext):
@@ -44,20 +33,9 @@ async def cmd_get_shedule_tomorrow(message: types.Message, state: FSMContext):
     day = datetime.date.today().weekday()
     today = SHEDULE_DAY.WEEKDAYS[day+1]
 
-    dayShedule = await sheduleDB.get_day_shedule(today, userInfo)
-    if isinstance(dayShedule, str):
-        await message.answer(dayShedule)
-        return
-    if dayShedule is None:
-        await message.answer(f'Нет расписания. Проверь название своей группы или курса\nТвоя группа - {userInfo.group}')
-        return
-    
-    await message.answer(
-        (
-            f'Расписание на {dayShedule.name}:\n'+
-            repr(dayShedule)
-        )
-    )
+    text = await sheduleDB.get_day_text(today, userInfo)
+
+    await message.answer(text)
 
 
 async def cmd_get_change_shedule(message: types.Message, state: FSMContext):
@@ -66,16 +44,7 @@ async def cmd_get_change_shedule(message: types.Message, state: FSMContext):
 
     now_date = datetime.date.today()
     change_date = now_date+datetime.timedelta(days=1)
-    dayShedule = await sheduleDB.get_change_shedule(change_date, userInfo)
-
-    text = 'Замен нет'
-    if dayShedule is not None:
-        if hasattr(dayShedule, 'name'):
-            text = (f'Замены на {dayShedule.name}:\n'+
-                    repr(dayShedule)
-            )
-        else:
-            text = dayShedule
+    text = await sheduleDB.get_change_text(change_date, userInfo)
 
     await message.answer(
         text
@@ -87,26 +56,21 @@ async def get_shedule_day(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
     userInfo = await get_userinfo(user_id)
 
-    dayShedule = await sheduleDB.get_day_shedule(day, userInfo)
+    text = await sheduleDB.get_day_text(day, userInfo)
 
-    await message.answer(
-        (
-            f'Расписание на {day}:\n'+
-            repr(dayShedule)
-        )
-    )
+    await message.answer(text)
 
 
 async def cmd_get_week_shedule(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
     userInfo = await get_userinfo(user_id)
 
-    weekShedule = await sheduleDB.get_week_shedule(userInfo)
+    text = await sheduleDB.get_week_text(userInfo)
 
     await message.answer(
         (
             f'Расписание на неделю:\n'+
-            repr(weekShedule)
+            text
         )
     )
 
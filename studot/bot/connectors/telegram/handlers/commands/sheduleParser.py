@@ -30,7 +30,7 @@ class SheduleParser:
         with open(filepath, 'r') as file:
             self.dict = json.load(file)
 
-    async def parse(self) -> str:
+    def parse(self) -> str:
         doc = self.dict
 
         for course, group in doc['Курс'].items():
@@ -48,11 +48,18 @@ class SheduleParser:
                             'Пара': subject,
                             'Время': time
                         }
-        result = await self._save(doc)
+        result = self._save(doc)
         return result
 
-    async def _save(doc: dict) -> str:
+    @staticmethod
+    def _save(doc: dict) -> str:
         filename = 'shedule.json'
         with open(filename, 'w') as file:
             json.dump(doc, file, ensure_ascii=False, indent=4)
-        return filename
\ No newline at end of file
+        return filename
+
+
+def parse_shedule(filepath: str) -> str:
+    """ParsingPool stage: shedule json -> json with subject times path
+    """
+    return SheduleParser(filepath).parse()
@@ -3,8 +3,10 @@ from aiogram.dispatcher.filters import Text
 from aiogram.dispatcher import FSMContext
 
 from bot.connectors.telegram.handlers.menu.start_menu import MenuSG, get_user_info
+from config import settings
+
 from bot.core.statistics.proxy.proxy_users_db import usersDB
-from bot.core.utils.types.userinfo import UserInfo
+from bot.core.utils.types.userinfo import UserInfo, minute_of_day, time_of_minute
 
 
 async def menu_settings(message: types.Message, state: FSMContext):
@@ -13,6 +15,7 @@ async def menu_settings(message: types.Message, state: FSMContext):
     keyboard.add(types.KeyboardButton('Мой профиль'))
     keyboard.add(types.KeyboardButton('Уведомление о заменах'))
     keyboard.add(types.KeyboardButton('Уведомление о расписании'))
+    keyboard.add(types.KeyboardButton('Уведомление о следующей паре'))
     keyboard.add(types.KeyboardButton('Изменить группу'))
     keyboard.add(types.KeyboardButton('Назад'))
     await message.answer(
@@ -30,6 +33,16 @@ async def get_button_text(userInfo: UserInfo, type):
         if userInfo.shedule_notify:
             return 'Выключить'
         return 'Включить'
+    elif type == 'next_subject':
+        if userInfo.next_subject_notify:
+            return 'Выключить'
+        return 'Включить'
+
+
+def get_shedule_time(userInfo: UserInfo) -> str:
+    if userInfo.shedule_notify_minute is None:
+        return settings.scheduler['shedule-push']['time']
+    return time_of_minute(userInfo.shedule_notify_minute)
 
 
 async def notify_changes(message: types.Message, state: FSMContext):
@@ -86,10 +99,12 @@ async def notify_shedule(message: types.Message, state: FSMContext):
     keyboard = types.ReplyKeyboardMarkup(resize_keyboard=True)
     button_text = await get_button_text(userInfo, 'shedule')
     keyboard.add(types.KeyboardButton(button_text))
+    keyboard.add(types.KeyboardButton('Время уведомления'))
     keyboard.add(types.KeyboardButton('Назад'))
     
     await message.answer(
-        'Уведомление, со списком пар на следующий день',
+        'Уведомление, со списком пар на следующий день.\n'
+        f'Время уведомления: {get_shedule_time(userInfo)}',
         reply_markup=keyboard
     )
 
@@ -102,6 +117,7 @@ async def notify_shedule_enable(message: types.Message, state: FSMContext):
     keyboard = types.ReplyKeyboardMarkup(resize_keyboard=True)
     button_text = await get_button_text(userInfo, 'shedule')
     keyboard.add(types.KeyboardButton(button_text))
+    keyboard.add(types.KeyboardButton('Время уведомления'))
     keyboard.add(types.KeyboardButton('Назад'))
 
     await message.answer(
@@ -118,6 +134,7 @@ async def notify_shedule_disable(message: types.Message, state: FSMContext):
     keyboard = types.ReplyKeyboardMarkup(resize_keyboard=True)
     button_text = await get_button_text(userInfo, 'shedule')
     keyboard.add(types.KeyboardButton(button_text))
+    keyboard.add(types.KeyboardButton('Время уведомления'))
     keyboard.add(types.KeyboardButton('Назад'))
 
     await message.answer(
@@ -125,6 +142,109 @@ async def notify_shedule_disable(message: types.Message, state: FSMContext):
         reply_markup=keyboard
     )
 
+async def shedule_time(message: types.Message, state: FSMContext):
+    await state.set_state(MenuSG.settings_shedule_time.state)
+    userInfo = await get_user_info(message.from_user.id)
+
+    keyboard = types.ReplyKeyboardMarkup(resize_keyboard=True)
+    keyboard.row(*[
+        types.KeyboardButton(time_str)
+        for time_str in settings.scheduler['shedule-notify-times']
+    ])
+    keyboard.add(types.KeyboardButton('Назад'))
+
+    await message.answer(
+        f'Сейчас расписание приходит в {get_shedule_time(userInfo)}.\nВыберите время',
+        reply_markup=keyboard
+    )
+
+
+async def shedule_time_set(message: types.Message, state: FSMContext):
+    if message.text not in settings.scheduler['shedule-notify-times']:
+        await message.answer('Выберите время на клавиатуре')
+        return
+
+    userInfo = await get_user_info(message.from_user.id)
+    if message.text == settings.scheduler['shedule-push']['time']:
+        userInfo.shedule_notify_minute = None
+    else:
+        userInfo.shedule_notify_minute = minute_of_day(message.text)
+    userInfo.shedule_notify = True
+    await usersDB.update_user(userInfo)
+
+    await message.answer(
+        f'Теперь бот будет присылать расписание на следующий день в <b>{message.text}</b>'
+    )
+    await notify_shedule(message, state)
+
+
+async def notify_next_subject(message: types.Message, state: FSMContext):
+    await state.set_state(MenuSG.settings_next_subject.state)
+    userInfo = await get_user_info(message.from_user.id)
+
+    keyboard = types.ReplyKeyboardMarkup(resize_keyboard=True)
+    button_text = await get_button_text(userInfo, 'next_subject')
+    keyboard.add(types.KeyboardButton(button_text))
+    keyboard.add(types.KeyboardButton('За сколько минут'))
+    keyboard.add(types.KeyboardButton('Назад'))
+
+    await message.answer(
+        f'Уведомление за {userInfo.next_subject_before} мин. до начала пары',
+        reply_markup=keyboard
+    )
+
+
+async def notify_next_subject_enable(message: types.Message, state: FSMContext):
+    userInfo = await get_user_info(message.from_user.id)
+    userInfo.next_subject_notify = True
+    await usersDB.update_user(userInfo)
+
+    await message.answer(
+        'Настройка <b>включена</b>.\n'
+        f'Теперь бот будет присылать уведомление за {userInfo.next_subject_before} мин. до начала пары'
+    )
+    await notify_next_subject(message, state)
+
+
+async def notify_next_subject_disable(message: types.Message, state: FSMContext):
+    userInfo = await get_user_info(message.from_user.id)
+    userInfo.next_subject_notify = False
+    await usersDB.update_user(userInfo)
+
+    await message.answer(
+        'Настройка <b>выключена</b>.\nТеперь бот не будет присылать уведомление о следующей паре'
+    )
+    await notify_next_subject(message, state)
+
+
+async def next_subject_before(message: types.Message, state: FSMContext):
+    await state.set_state(MenuSG.settings_next_subject_before.state)
+
+    keyboard = types.ReplyKeyboardMarkup(resize_keyboard=True)
+    keyboard.row(*[
+        types.KeyboardButton(f'{before} мин')
+        for before in settings.scheduler['next-subject-before']
+    ])
+    keyboard.add(types.KeyboardButton('Назад'))
+
+    await message.answer(
+        'За сколько минут до начала пары присылать уведомление?',
+        reply_markup=keyboard
+    )
+
+
+async def next_subject_before_set(message: types.Message, state: FSMContext):
+    before = int(message.text.split()[0])
+    if before not in settings.scheduler['next-subject-before']:
+        await message.answer('Выберите время на клавиатуре')
+        return
+
+    userInfo = await get_user_info(message.from_user.id)
+    userInfo.next_subject_before = before
+    userInfo.next_subject_notify = True
+    await usersDB.update_user(userInfo)
+
+    await notify_next_subject(message, state)
 
 
 def register_settings_menu(dp: Dispatcher):
@@ -132,6 +252,7 @@ def register_settings_menu(dp: Dispatcher):
     dp.register_message_handler(menu_settings, Text(equals='Назад', ignore_case=True), state=MenuSG.settings_changes.state)
     dp.register_message_handler(menu_settings, Text(equals='Назад', ignore_case=True), state=MenuSG.settings_shedule.state)
     dp.register_message_handler(menu_settings, Text(equals='Назад', ignore_case=True), state=MenuSG.profile.state)
+    dp.register_message_handler(menu_settings, Text(equals='Назад', ignore_case=True), state=MenuSG.settings_next_subject.state)
 
     dp.register_message_handler(notify_changes, Text(equals='Уведомление о заменах', ignore_case=True), state=MenuSG.start.state)
     dp.register_message_handler(notify_changes_enable, Text(equals='Включить', ignore_case=True), state=MenuSG.settings_changes.state)
@@ -140,4 +261,14 @@ def register_settings_menu(dp: Dispatcher):
 
     dp.register_message_handler(notify_shedule, Text(equals='Уведомление о расписании', ignore_case=True), state=MenuSG.start.state)
     dp.register_message_handler(notify_shedule_enable, Text(equals='Включить', ignore_case=True), state=MenuSG.settings_shedule.state)
-    dp.register_message_handler(notify_shedule_disable, Text(equals='Выключить', ignore_case=True), state=MenuSG.settings_shedule.state)
\ No newline at end of file
+    dp.register_message_handler(notify_shedule_disable, Text(equals='Выключить', ignore_case=True), state=MenuSG.settings_shedule.state)
+    dp.register_message_handler(shedule_time, Text(equals='Время уведомления', ignore_case=True), state=MenuSG.settings_shedule.state)
+    dp.register_message_handler(notify_shedule, Text(equals='Назад', ignore_case=True), state=MenuSG.settings_shedule_time.state)
+    dp.register_message_handler(shedule_time_set, regexp=r'^\d{1,2}:\d{2}$', state=MenuSG.settings_shedule_time.state)
+
+    dp.register_message_handler(notify_next_subject, Text(equals='Уведомление о следующей паре', ignore_case=True), state=MenuSG.start.state)
+    dp.register_message_handler(notify_next_subject_enable, Text(equals='Включить', ignore_case=True), state=MenuSG.settings_next_subject.state)
+    dp.register_message_handler(notify_next_subject_disable, Text(equals='Выключить', ignore_case=True), state=MenuSG.settings_next_subject.state)
+    dp.register_message_handler(next_subject_before, Text(equals='За сколько минут', ignore_case=True), state=MenuSG.settings_next_subject.state)
+    dp.register_message_handler(notify_next_subject, Text(equals='Назад', ignore_case=True), state=MenuSG.settings_next_subject_before.state)
+    dp.register_message_handler(next_subject_before_set, regexp=r'^\d+ мин$', state=MenuSG.settings_next_subject_before.state)
\ No newline at end of file
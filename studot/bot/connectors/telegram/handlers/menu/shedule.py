@@ -42,19 +42,19 @@ async def menu_get_change_shedule(message: types.Message, state: FSMContext):
 
 async def menu_get_this_week(message: types.Message, state: FSMContext):
     userInfo = await get_user_info(message.from_user.id)
-    shedule = await sheduleDB.get_week_shedule(userInfo)
+    text = await sheduleDB.get_week_text(userInfo)
 
     await message.answer(
-        repr(shedule)
+        text
     )
 
 
 async def menu_get_next_week(message: types.Message, state: FSMContext):
     userInfo = await get_user_info(message.from_user.id)
-    shedule = await sheduleDB.get_next_week_shedule(userInfo)
+    text = await sheduleDB.get_next_week_text(userInfo)
     
     await message.answer(
-        repr(shedule)
+        text
     )
 
 
@@ -85,14 +85,9 @@ async def menu_day_shedule(message: types.Message, state: FSMContext):
 async def day_shedule(message: types.Message, state: FSMContext):
     userInfo = await get_user_info(message.from_user.id)
     day = message.text
-    shedule = await sheduleDB.get_day_shedule(day, userInfo)
+    text = await sheduleDB.get_day_text(day, userInfo)
 
-    await message.answer(
-        (
-            f'Расписание на {shedule.name}\n'+
-            repr(shedule)
-        )
-    )
+    await message.answer(text)
 
 
 async def rings_shedule(message: types.Message, state: FSMContext):
@@ -26,6 +26,9 @@ class MenuSG(StatesGroup):
 
     settings_changes = State()
     settings_shedule = State()
+    settings_shedule_time = State()
+    settings_next_subject = State()
+    settings_next_subject_before = State()
 
     changeGroup = State()
 
@@ -0,0 +1,30 @@
+from aiogram import types
+from aiogram.dispatcher.handler import current_handler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from bot.core.statistics.metrics.request_timing import start_request, finish_request
+
+
+class LatencyMiddleware(BaseMiddleware):
+    """Handler latency from the message update to the end of the handler,
+    filters and state storage included. DB and Bot API time is counted
+    by TimedMongoStorage, TimedBot and the timed DB classes
+    """
+
+    async def on_pre_process_message(self, message: types.Message, data: dict):
+        data['_timing'] = start_request()
+
+    async def on_process_message(self, message: types.Message, data: dict):
+        # Handler is known only after filters, it is reset before post process
+        data['_handler'] = current_handler.get().__name__
+
+    async def on_post_process_message(self, message: types.Message, results: list, data: dict):
+        timing = data.get('_timing')
+        if timing is None:
+            return
+        finish_request(
+            'telegram',
+            data.get('_handler', 'unhandled'),
+            timing,
+            detail=f'user {message.from_user.id} text {(message.text or "")[:50]!r}'
+        )
@@ -1,23 +1,29 @@
-from aiogram import Bot, Dispatcher, types
-from aiogram.contrib.fsm_storage.mongo import MongoStorage
+from aiogram import Dispatcher, types
 from aiogram.contrib.fsm_storage.memory import MemoryStorage
 from bot.connectors.telegram.handlers.registration import register_all
+from bot.connectors.telegram.middleware import LatencyMiddleware
+from bot.connectors.telegram.timed import TimedBot, TimedMongoStorage
+from bot.core.utils.workers import parsingPool
 from config import settings
 
 
-mongoStorage = MongoStorage(
+mongoStorage = TimedMongoStorage(
     host=settings.telegram_mongo_host,
     port=settings.mongo_port,
     db_name='telegram_states'
 )
 
-bot = Bot(settings.bot_api_key, parse_mode=types.ParseMode.HTML)
+bot = TimedBot(settings.bot_api_key, parse_mode=types.ParseMode.HTML)
 dp = Dispatcher(bot=bot, storage=mongoStorage)
 
 
 async def __start_tg():
     await register_all(dp)
-    await dp.start_polling()
+    dp.middleware.setup(LatencyMiddleware())
+    try:
+        await dp.start_polling()
+    finally:
+        parsingPool.shutdown()
 
 
 async def run_tg_bot():
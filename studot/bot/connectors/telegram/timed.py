@@ -0,0 +1,31 @@
+import time
+
+from aiogram import Bot
+from aiogram.contrib.fsm_storage.mongo import MongoStorage
+
+from bot.core.statistics.metrics.prometheus import API_REQUEST_SECONDS, STATE_STORAGE_SECONDS
+from bot.core.statistics.metrics.request_timing import section, timed_methods
+
+
+class TimedBot(Bot):
+    """Bot that times every Bot API request
+    """
+
+    async def request(self, method, data=None, files=None, **kwargs):
+        start = time.perf_counter()
+        try:
+            with section('api'):
+                return await super().request(method, data, files, **kwargs)
+        finally:
+            API_REQUEST_SECONDS.labels('telegram', method).observe(time.perf_counter() - start)
+
+
+@timed_methods(
+    STATE_STORAGE_SECONDS,
+    names=('get_state', 'get_data', 'set_state', 'set_data', 'update_data'),
+    kind='db',
+    labels=('telegram',)
+)
+class TimedMongoStorage(MongoStorage):
+    """FSM storage that times state reads and writes
+    """
@@ -1,6 +1,8 @@
 from vkbottle import Keyboard, Text, KeyboardButtonColor
 from vkbottle.bot import Message
 
+from config import settings
+
 from bot.connectors.vk.vk_bot_config import labeler, state_dispenser
 
 from bot.connectors.vk.menu.start_menu import MenuSG, get_user_info
@@ -9,7 +11,7 @@ from bot.core.utils.types.shedule import SHEDULE_DAY
 from bot.core.statistics.proxy.proxy_users_db import usersDB
 from bot.core.statistics.proxy.proxy_shedule_db import sheduleDB
 
-from bot.core.utils.types.userinfo import UserInfo
+from bot.core.utils.types.userinfo import UserInfo, minute_of_day, time_of_minute
 
 
 @labeler.message(text='[club218297281|@studotbot] Настройки', state=MenuSG.start)
@@ -20,6 +22,8 @@ from bot.core.utils.types.userinfo import UserInfo
 @labeler.message(text='Назад', state=MenuSG.settings_shedule)
 @labeler.message(text='[club218297281|@studotbot] Назад', state=MenuSG.profile)
 @labeler.message(text='Назад', state=MenuSG.profile)
+@labeler.message(text='[club218297281|@studotbot] Назад', state=MenuSG.settings_next_subject)
+@labeler.message(text='Назад', state=MenuSG.settings_next_subject)
 async def menu_settings(message: Message):
     await state_dispenser.set(message.peer_id, MenuSG.start)
 
@@ -28,6 +32,7 @@ async def menu_settings(message: Message):
         .add(Text('Мой профиль'), KeyboardButtonColor.SECONDARY).row()
         .add(Text('Уведомление о заменах')).row()
         .add(Text('Уведомление о расписании')).row()
+        .add(Text('Уведомление о следующей паре')).row()
         .add(Text('Изменить группу')).row()
         .add(Text('Назад'), KeyboardButtonColor.PRIMARY)
     )
@@ -46,6 +51,16 @@ async def get_button_text(userInfo: UserInfo, type):
         if userInfo.shedule_notify:
             return 'Выключить'
         return 'Включить'
+    elif type == 'next_subject':
+        if userInfo.next_subject_notify:
+            return 'Выключить'
+        return 'Включить'
+
+
+def get_shedule_time(userInfo: UserInfo) -> str:
+    if userInfo.shedule_notify_minute is None:
+        return settings.scheduler['shedule-push']['time']
+    return time_of_minute(userInfo.shedule_notify_minute)
 
 
 @labeler.message(text='[club218297281|@studotbot] Уведомление о заменах', state=MenuSG.start)
@@ -106,6 +121,8 @@ async def notify_changes_disable(message: Message):
 
 @labeler.message(text='[club218297281|@studotbot] Уведомление о расписании', state=MenuSG.start)
 @labeler.message(text='Уведомление о расписании', state=MenuSG.start)
+@labeler.message(text='[club218297281|@studotbot] Назад', state=MenuSG.settings_shedule_time)
+@labeler.message(text='Назад', state=MenuSG.settings_shedule_time)
 async def notify_shedule(message: Message):
     await state_dispenser.set(message.peer_id, MenuSG.settings_shedule)
     userInfo = await get_user_info(message.from_id)
@@ -114,10 +131,13 @@ async def notify_shedule(message: Message):
         Keyboard()
         .add(Text(t:=await get_button_text(userInfo, 'shedule')))
         .row()
+        .add(Text('Время уведомления'))
+        .row()
         .add(Text('Назад'), KeyboardButtonColor.PRIMARY)
     )
     await message.answer(
-        'Уведомление, со списком пар на следующий день',
+        'Уведомление, со списком пар на следующий день.\n'
+        f'Время уведомления: {get_shedule_time(userInfo)}',
         keyboard=keyboard
     )
 
@@ -133,6 +153,8 @@ async def notify_shedule_enable(message: Message):
         Keyboard()
         .add(Text(t:=await get_button_text(userInfo, 'shedule')))
         .row()
+        .add(Text('Время уведомления'))
+        .row()
         .add(Text('Назад'), KeyboardButtonColor.PRIMARY)
     )
     await message.answer(
@@ -152,10 +174,130 @@ async def notify_shedule_disable(message: Message):
         Keyboard()
         .add(Text(t:=await get_button_text(userInfo, 'shedule')))
         .row()
+        .add(Text('Время уведомления'))
+        .row()
         .add(Text('Назад'), KeyboardButtonColor.PRIMARY)
     )
 
     await message.answer(
         'Настройка выключена.\nТеперь бот не будет присылать расписание на следующий день',
         keyboard=keyboard
-    )
\ No newline at end of file
+    )
+
+
+@labeler.message(text='[club218297281|@studotbot] Время уведомления', state=MenuSG.settings_shedule)
+@labeler.message(text='Время уведомления', state=MenuSG.settings_shedule)
+async def shedule_time(message: Message):
+    await state_dispenser.set(message.peer_id, MenuSG.settings_shedule_time)
+    userInfo = await get_user_info(message.from_id)
+
+    keyboard = Keyboard()
+    for time_str in settings.scheduler['shedule-notify-times']:
+        keyboard.add(Text(time_str))
+    keyboard.row().add(Text('Назад'), KeyboardButtonColor.PRIMARY)
+
+    await message.answer(
+        f'Сейчас расписание приходит в {get_shedule_time(userInfo)}.\nВыберите время',
+        keyboard=keyboard
+    )
+
+
+@labeler.message(regex=r'^(\[club218297281\|@studotbot\] )?\d{1,2}:\d{2}$', state=MenuSG.settings_shedule_time)
+async def shedule_time_set(message: Message):
+    time_str = message.text.split()[-1]
+    if time_str not in settings.scheduler['shedule-notify-times']:
+        await message.answer('Выберите время на клавиатуре')
+        return
+
+    userInfo = await get_user_info(message.from_id)
+    if time_str == settings.scheduler['shedule-push']['time']:
+        userInfo.shedule_notify_minute = None
+    else:
+        userInfo.shedule_notify_minute = minute_of_day(time_str)
+    userInfo.shedule_notify = True
+    await usersDB.update_user(userInfo)
+
+    await message.answer(
+        f'Теперь бот будет присылать расписание на следующий день в {time_str}'
+    )
+    await notify_shedule(message)
+
+
+@labeler.message(text='[club218297281|@studotbot] Уведомление о следующей паре', state=MenuSG.start)
+@labeler.message(text='Уведомление о следующей паре', state=MenuSG.start)
+@labeler.message(text='[club218297281|@studotbot] Назад', state=MenuSG.settings_next_subject_before)
+@labeler.message(text='Назад', state=MenuSG.settings_next_subject_before)
+async def notify_next_subject(message: Message):
+    await state_dispenser.set(message.peer_id, MenuSG.settings_next_subject)
+    userInfo = await get_user_info(message.from_id)
+
+    keyboard = (
+        Keyboard()
+        .add(Text(await get_button_text(userInfo, 'next_subject')))
+        .row()
+        .add(Text('За сколько минут'))
+        .row()
+        .add(Text('Назад'), KeyboardButtonColor.PRIMARY)
+    )
+    await message.answer(
+        f'Уведомление за {userInfo.next_subject_before} мин. до начала пары',
+        keyboard=keyboard
+    )
+
+
+@labeler.message(text='[club218297281|@studotbot] включить', state=MenuSG.settings_next_subject)
+@labeler.message(text='включить', state=MenuSG.settings_next_subject)
+async def notify_next_subject_enable(message: Message):
+    userInfo = await get_user_info(message.from_id)
+    userInfo.next_subject_notify = True
+    await usersDB.update_user(userInfo)
+
+    await message.answer(
+        'Настройка включена.\n'
+        f'Теперь бот будет присылать уведомление за {userInfo.next_subject_before} мин. до начала пары'
+    )
+    await notify_next_subject(message)
+
+
+@labeler.message(text='[club218297281|@studotbot] выключить', state=MenuSG.settings_next_subject)
+@labeler.message(text='выключить', state=MenuSG.settings_next_subject)
+async def notify_next_subject_disable(message: Message):
+    userInfo = await get_user_info(message.from_id)
+    userInfo.next_subject_notify = False
+    await usersDB.update_user(userInfo)
+
+    await message.answer(
+        'Настройка выключена.\nТеперь бот не будет присылать уведомление о следующей паре'
+    )
+    await notify_next_subject(message)
+
+
+@labeler.message(text='[club218297281|@studotbot] За сколько минут', state=MenuSG.settings_next_subject)
+@labeler.message(text='За сколько минут', state=MenuSG.settings_next_subject)
+async def next_subject_before(message: Message):
+    await state_dispenser.set(message.peer_id, MenuSG.settings_next_subject_before)
+
+    keyboard = Keyboard()
+    for before in settings.scheduler['next-subject-before']:
+        keyboard.add(Text(f'{before} мин'))
+    keyboard.row().add(Text('Назад'), KeyboardButtonColor.PRIMARY)
+
+    await message.answer(
+        'За сколько минут до начала пары присылать уведомление?',
+        keyboard=keyboard
+    )
+
+
+@labeler.message(regex=r'^(\[club218297281\|@studotbot\] )?\d+ мин$', state=MenuSG.settings_next_subject_before)
+async def next_subject_before_set(message: Message):
+    before = int(message.text.split()[-2])
+    if before not in settings.scheduler['next-subject-before']:
+        await message.answer('Выберите время на клавиатуре')
+        return
+
+    userInfo = await get_user_info(message.from_id)
+    userInfo.next_subject_before = before
+    userInfo.next_subject_notify = True
+    await usersDB.update_user(userInfo)
+
+    await notify_next_subject(message)
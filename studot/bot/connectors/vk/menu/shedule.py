@@ -47,20 +47,9 @@ async def menu_get_today_shedule(message: Message):
     day = datetime.date.today().weekday()
     today = SHEDULE_DAY.WEEKDAYS[day]
 
-    dayShedule = await sheduleDB.get_day_shedule(today, userInfo)
-    if isinstance(dayShedule, str):
-        await message.answer(dayShedule)
-        return
-    if dayShedule is None:
-        await message.answer(f'Нет расписания. Проверь название своей группы или курса\nТвоя группа - {userInfo.group}')
-        return
+    text = await sheduleDB.get_day_text(today, userInfo)
 
-    await message.answer(
-        (
-            f'Расписание на {dayShedule.name}:\n'+
-            repr(dayShedule)
-        )
-    )
+    await message.answer(text)
 
 
 @labeler.message(text='[club218297281|@studotbot] Завтра', state=MenuSG.start)
@@ -71,20 +60,9 @@ async def menu_get_tomorrow_shedule(message: Message):
     day = datetime.date.today().weekday()
     today = SHEDULE_DAY.WEEKDAYS[day+1]
 
-    dayShedule = await sheduleDB.get_day_shedule(today, userInfo)
-    if isinstance(dayShedule, str):
-        await message.answer(dayShedule)
-        return
-    if dayShedule is None:
-        await message.answer(f'Нет расписания. Проверь название своей группы или курса\nТвоя группа - {userInfo.group}')
-        return
+    text = await sheduleDB.get_day_text(today, userInfo)
 
-    await message.answer(
-        (
-            f'Расписание на {dayShedule.name}:\n'+
-            repr(dayShedule)
-        )
-    )
+    await message.answer(text)
 
 
 @labeler.message(text='[club218297281|@studotbot] Замены', state=MenuSG.start)
@@ -94,16 +72,7 @@ async def menu_get_change_shedule(message: Message):
 
     change_date = datetime.date.today() + datetime.timedelta(days=1)
 
-    dayShedule = await sheduleDB.get_change_shedule(change_date, userInfo)
-
-    text = 'Замен нет'
-    if dayShedule is not None:
-        if hasattr(dayShedule, 'name'):
-            text = (f'Замены на {dayShedule.name}:\n'+
-                    repr(dayShedule)
-            )
-        else:
-            text = dayShedule
+    text = await sheduleDB.get_change_text(change_date, userInfo)
 
     await message.answer(
         text
@@ -115,13 +84,10 @@ async def menu_get_change_shedule(message: Message):
 async def menu_get_this_week(message: Message):
     userInfo = await get_user_info(message.from_id)
 
-    shedule = await sheduleDB.get_week_shedule(userInfo)
-    if shedule is None:
-        await message.answer('Нет расписания. Проверь название своей группы или курса')
-        return
+    text = await sheduleDB.get_week_text(userInfo)
 
     await message.answer(
-        repr(shedule)
+        text
     )
 
 
@@ -130,13 +96,10 @@ async def menu_get_this_week(message: Message):
 async def menu_get_next_week(message: Message):
     userInfo = await get_user_info(message.from_id)
 
-    shedule = await sheduleDB.get_next_week_shedule(userInfo)
-    if shedule is None:
-        await message.answer('Нет расписания. Проверь название своей группы или курса')
-        return
+    text = await sheduleDB.get_next_week_text(userInfo)
     
     await message.answer(
-        repr(shedule)
+        text
     )
 
 
@@ -190,17 +153,9 @@ async def day_shedule(message: Message, day=None):
 
     userInfo = await get_user_info(message.from_id)
 
-    shedule = await sheduleDB.get_day_shedule(day, userInfo)
-    if shedule is None:
-        await message.answer('Нет расписания. Проверь название своей группы или курса')
-        return
+    text = await sheduleDB.get_day_text(day, userInfo)
 
-    await message.answer(
-        (
-            f'Расписание на {shedule.name}\n'+
-            repr(shedule)
-        )
-    )
+    await message.answer(text)
 
 
 @labeler.message(text='[club218297281|@studotbot] Расписание звонков', state=MenuSG.additional)
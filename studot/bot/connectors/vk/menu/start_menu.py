@@ -26,6 +26,9 @@ class MenuSG(BaseStateGroup):
 
     settings_changes = 'settings_changes'
     settings_shedule = 'settings_shedule'
+    settings_shedule_time = 'settings_shedule_time'
+    settings_next_subject = 'settings_next_subject'
+    settings_next_subject_before = 'settings_next_subject_before'
 
     changeGroup = 'changeGroup'
 
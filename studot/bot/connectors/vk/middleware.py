@@ -0,0 +1,47 @@
+import functools
+
+from vkbottle import BaseMiddleware
+from vkbottle.bot import Message
+
+from bot.core.statistics.metrics.request_timing import start_request, finish_request, current_request
+
+
+def handler_name(handler) -> str:
+    """Function name of a labeler handler
+    """
+    func = getattr(handler, 'handler', handler)
+    return getattr(func, '__name__', type(handler).__name__)
+
+
+def time_view(view) -> None:
+    """Start request timing when the view gets the event.
+    View reads state_peer from the state dispenser before pre middlewares,
+    so without it state reads are not in handler time as they are on Telegram
+    """
+    handle_event = view.handle_event
+
+    @functools.wraps(handle_event)
+    async def timed_handle_event(*args, **kwargs):
+        start_request()
+        return await handle_event(*args, **kwargs)
+
+    view.handle_event = timed_handle_event
+
+
+class LatencyMiddleware(BaseMiddleware[Message]):
+    """Handler latency from the message event to the end of the handler,
+    state dispenser included when the view is wrapped by time_view.
+    DB and VK API time is counted by TimedAPI, the state dispenser
+    and the timed DB classes
+    """
+
+    async def pre(self) -> None:
+        self._timing = current_request() or start_request()
+
+    async def post(self) -> None:
+        finish_request(
+            'vk',
+            handler_name(self.handlers[0]) if self.handlers else 'unhandled',
+            self._timing,
+            detail=f'user {self.event.from_id} text {(self.event.text or "")[:50]!r}'
+        )
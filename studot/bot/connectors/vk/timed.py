@@ -0,0 +1,19 @@
+import time
+
+from vkbottle import API
+
+from bot.core.statistics.metrics.prometheus import API_REQUEST_SECONDS
+from bot.core.statistics.metrics.request_timing import section
+
+
+class TimedAPI(API):
+    """VK API that times every request
+    """
+
+    async def request(self, method: str, data: dict) -> dict:
+        start = time.perf_counter()
+        try:
+            with section('api'):
+                return await super().request(method, data)
+        finally:
+            API_REQUEST_SECONDS.labels('vk', method).observe(time.perf_counter() - start)
@@ -3,6 +3,8 @@ from vkbottle import Bot
 from config import settings
 
 from bot.connectors.vk.vk_bot_config import labeler, state_dispenser
+from bot.connectors.vk.middleware import LatencyMiddleware, time_view
+from bot.connectors.vk.timed import TimedAPI
 import bot.connectors.vk.telemetry
 import bot.connectors.vk.commands.common
 import bot.connectors.vk.menu.shedule
@@ -13,5 +15,8 @@ import bot.connectors.vk.menu.additional
 import bot.connectors.vk.menu.profile
 
 
-bot = Bot(token=settings.vk_bot_api_key, labeler=labeler, state_dispenser=state_dispenser)
+time_view(labeler.message_view)
+labeler.message_view.register_middleware(LatencyMiddleware)
+
+bot = Bot(api=TimedAPI(token=settings.vk_bot_api_key), labeler=labeler, state_dispenser=state_dispenser)
 
@@ -2,9 +2,12 @@ from vkbottle import BuiltinStateDispenser, ABCStateDispenser
 from vkbottle.dispatch.dispenser.base import StatePeer
 from vkbottle.bot import BotLabeler
 
+from bot.core.statistics.metrics.prometheus import STATE_STORAGE_SECONDS
+from bot.core.statistics.metrics.request_timing import timed_methods
 from bot.core.utils.db.db import database
 
 
+@timed_methods(STATE_STORAGE_SECONDS, kind='db', labels=('vk',))
 class MongoStateDispenser(ABCStateDispenser):
     def __init__(self):
         self.db = database['vk_states']
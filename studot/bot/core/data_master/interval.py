@@ -0,0 +1,124 @@
+import datetime
+import logging
+import time
+
+from typing import Optional
+
+from config import settings
+
+
+interval_logger = logging.getLogger(__name__)
+interval_logger.setLevel(logging.INFO)
+handler = logging.FileHandler(f"logs/AdaptiveInterval.log", mode='w')
+formatter = logging.Formatter("%(name)s %(asctime)s %(levelname)s %(message)s")
+handler.setFormatter(formatter)
+interval_logger.addHandler(handler)
+interval_logger.addHandler(logging.StreamHandler())
+
+
+# Backoff power cap, enough to reach any max interval
+MAX_POWER = 32
+
+
+def parse_interval(string: str) -> int:
+    """Time interval in format <TT S> to seconds
+    Where T - time interval
+    Where S - symbol representing (h, m, s)
+    """
+    s = string.split()
+    value = int(s[0])
+    sym = s[1]
+
+    if sym == 'h':
+        value = value * 60 * 60
+    elif sym == 'm':
+        value = value * 60
+
+    return value
+
+
+def parse_window(string: str) -> tuple[datetime.time, datetime.time]:
+    """'12:00-17:00' -> (time(12, 0), time(17, 0))
+    """
+    start, end = string.split('-')
+    return datetime.time.fromisoformat(start.zfill(5)), datetime.time.fromisoformat(end.zfill(5))
+
+
+def in_window(moment: datetime.time, window: tuple[datetime.time, datetime.time]) -> bool:
+    start, end = window
+    if start <= end:
+        return start <= moment < end
+    # Window over midnight
+    return moment >= start or moment < end
+
+
+class AdaptiveInterval:
+    """Scan interval of DataMaster
+
+    Base interval depends on the time of day: hot windows when changes are
+    usually posted, quiet windows at night and the default interval otherwise.
+    After a change the scanner polls with the min interval for boost time.
+    Without changes the interval grows by backoff factor up to backoff limit
+    times the base, errors grow it up to the max interval.
+    """
+
+    def __init__(self, config: Optional[dict] = None) -> None:
+        config = config or settings.scanner
+
+        self.default = parse_interval(config['time-interval'])
+        self.min = parse_interval(config['min-interval'])
+        self.max = parse_interval(config['max-interval'])
+        self.hot = parse_interval(config['hot-interval'])
+        self.quiet = parse_interval(config['quiet-interval'])
+        self.hot_windows = [parse_window(window) for window in config['hot-windows']]
+        self.quiet_windows = [parse_window(window) for window in config['quiet-windows']]
+        self.boost = parse_interval(config['boost-time'])
+        self.factor = config['backoff-factor']
+        self.limit = config['backoff-limit']
+
+        self._unchanged = 0
+        self._errors = 0
+        self._boost_until = 0.0
+
+    def record(self, changed: bool) -> None:
+        """Store scan result
+        """
+        self._errors = 0
+        if changed:
+            self._unchanged = 0
+            self._boost_until = time.monotonic() + self.boost
+        else:
+            self._unchanged += 1
+
+    def record_error(self) -> None:
+        self._errors += 1
+
+    def base(self, now: Optional[datetime.datetime] = None) -> int:
+        moment = (now or datetime.datetime.now(settings.tz_info)).time()
+        if any(in_window(moment, window) for window in self.hot_windows):
+            return self.hot
+        if any(in_window(moment, window) for window in self.quiet_windows):
+            return self.quiet
+        return self.default
+
+    def next(self, now: Optional[datetime.datetime] = None) -> int:
+        """Seconds to sleep before the next scan
+        """
+        base = self.base(now)
+
+        if self._errors:
+            interval = min(base * self.factor**min(self._errors, MAX_POWER), self.max)
+        elif time.monotonic() < self._boost_until:
+            interval = self.min
+        else:
+            interval = min(
+                base * self.factor**min(self._unchanged, MAX_POWER),
+                base * self.limit,
+                self.max
+            )
+
+        interval = int(max(interval, self.min))
+        interval_logger.info(
+            f'Next scan in {interval}s (base {base}s, unchanged {self._unchanged}, errors {self._errors})'
+        )
+        return interval
@@ -1,17 +1,28 @@
 import asyncio
 from typing import Optional
 import datetime
+import email.utils
 import logging
 import json
 import time
 
+import aiohttp
+from prometheus_client import start_http_server
+
+from config import settings
+
 from bot.core.notifier.notifier import notifier
+from bot.core.statistics.metrics.metrics import metrics
 
-from bot.core.scanner.scanner import Scanner
+from bot.core.scanner.scanner import Scanner, FileUpdate
+from bot.core.data_master.interval import AdaptiveInterval
 from bot.core.data_parser.PDFParser import PDFParser
-from bot.core.data_parser.JSONParser import JSONParser
+from bot.core.data_parser.PDFParser.extractor import extractionWorker
+from bot.core.data_parser.tasks import parse_change_dict, parse_change_rows
 from bot.core.file_resolver.resolver import File
-from bot.core.utils.db.shedule import SheduleDB
+from bot.core.utils.db.shedule import sheduleDB
+from bot.core.utils.http import httpClient
+from bot.core.utils.workers import parsingPool
 
 
 """Summary:
@@ -34,76 +45,159 @@ master_logger.addHandler(logging.StreamHandler())
 
 class DataMaster:
     def __init__(self) -> None:
-        self.db = SheduleDB()
+        self.db = sheduleDB
         self.scanner = Scanner()
         self.notifier = notifier
-        self.time_interval = self.scanner.interval
+        self.interval = AdaptiveInterval()
 
     async def start(self):
         try:
             master_logger.info('Data master started')
+            await extractionWorker.start()
             while True:
-                await self._scan()
-                await self._check()
-                master_logger.info(f'Sleeping {self.time_interval}s')
-                await asyncio.sleep(self.time_interval)
+                try:
+                    await self._scan()
+                    changed = await self._check()
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    master_logger.error(f'Site is not available -- {e}')
+                    self.interval.record_error()
+                else:
+                    self.interval.record(changed)
+
+                time_interval = self.interval.next()
+                await metrics.gauge('scan_interval_seconds', time_interval)
+                master_logger.info(f'Sleeping {time_interval}s')
+                await asyncio.sleep(time_interval)
         except Exception as er:
             master_logger.info('Data master stoped in cause of error')
             master_logger.error(er, exc_info=True)
+        finally:
+            await httpClient.close()
+            extractionWorker.shutdown()
+            parsingPool.shutdown()
 
     async def _scan(self):
         master_logger.info('Scanning site')
         await self.scanner.process()
 
-    async def _check(self):
-        master_logger.info('Checking file url')
+    async def _check(self) -> bool:
+        """Process new files of the page concurrently
+
+        Returns:
+            bool: Was a new file found
+        """
+        master_logger.info('Checking files')
         if self.scanner.no_url:
             master_logger.info('No changes found')
+            return False
+
+        # Files are requested even if the page is the same, they may be re-uploaded under the same URL
+        files = await self.scanner.new_files()
+        if not files:
+            master_logger.info('Same files')
+            return False
+
+        master_logger.info(f'{len(files)} new files: {[file.url for file in files]}')
+        # Dates are processed concurrently, files of one date -- one by one in page order,
+        # so the last file wins and changes are saved and notified once per file
+        by_date: dict[str, list[FileUpdate]] = {}
+        for file in files:
+            by_date.setdefault(file.date, []).append(file)
+        await asyncio.gather(*(self._process_date(date_files) for date_files in by_date.values()))
+        return True
+
+    async def _process_date(self, files: list[FileUpdate]) -> None:
+        for file in files:
+            await self._process_file(file)
+
+    async def _process_file(self, file: FileUpdate) -> None:
+        await self._export_latency(file.response.last_modified)
+
+        try:
+            changed = await self._save(file.response.path, file.date)
+            # Saved file or broken one (admin is alerted once), both are not retried every scan
+            await self.scanner.mark_processed(file)
+        except Exception as e:
+            # Not marked, the file is processed again on the next scan
+            master_logger.error(f'{file.url} was not processed -- {e}', exc_info=True)
+            await self.notifier.alert_admin(f'Проблема с сохранением файла {file.url} -- {e}')
             return
-        elif self.scanner.same_url:
-            master_logger.info('Same file url')
-            return
-        
-        await self._save()
 
-        date = datetime.date.fromisoformat(self.scanner.date)
-        await self._notify(date)
+        if not changed:
+            # Not parsed or every group is the same
+            return
 
-    async def _save(self):
+        try:
+            await self._notify(datetime.date.fromisoformat(file.date), changed)
+        except Exception as e:
+            # Changes are saved, a repeated scan would not notify them again
+            master_logger.error(f'Changes of {file.url} were not notified -- {e}', exc_info=True)
+            await self.notifier.alert_admin(f'Проблема с рассылкой изменений {file.date} -- {e}')
+
+    async def _export_latency(self, last_modified: Optional[str]) -> None:
+        """Time from file upload (Last-Modified header) to its detection
+        """
+        if not last_modified:
+            return
+        try:
+            uploaded = email.utils.parsedate_to_datetime(last_modified)
+        except (TypeError, ValueError):
+            return
+        if uploaded.tzinfo is None:
+            uploaded = uploaded.replace(tzinfo=datetime.timezone.utc)
+        latency = (datetime.datetime.now(datetime.timezone.utc) - uploaded).total_seconds()
+        master_logger.info(f'File detected {latency:.0f}s after upload')
+        await metrics.gauge('change_detection_latency_seconds', latency)
+
+    async def _save(self, path: str, date: str) -> Optional[list[tuple[str, str]]]:
+        """Parse file and save change shedule of the date
+
+        Returns:
+            Optional[list[tuple[str, str]]]: Changed (course, group) pairs, None if file was not parsed
+        """
         master_logger.info('Saving changes to DB')
 
-        pdfParser = PDFParser(src=self.scanner.result)
         try:
-            pdfParser.process()
-            dict_to_parse = pdfParser.extract_dict()
+            pdfParser = await PDFParser.from_file(path)
+        except Exception as e:
+            master_logger.error(e, exc_info=True)
+            await self.notifier.alert_admin(f'Проблема с извлечением таблицы из файла -- {e}')
+            return None
+
+        # pandas and JSON stages run in the parsing pool, the loop keeps serving
+        try:
+            dict_to_parse = await parsingPool.run(parse_change_rows, pdfParser.rows)
         except Exception as e:
             master_logger.error(e, exc_info=True)
             await self.notifier.alert_admin(f'Проблема с парсом файла в таблицу -- {e}')
-            await self.notifier.alert_admin_file(pdfParser.beauty_csv)
-            return
+            await self.notifier.alert_admin_file(pdfParser.debug_csv())
+            return None
 
-        jsonParser = JSONParser(dict_to_parse=dict_to_parse)
         try:
-            changeShedule = jsonParser.parse()
+            changeShedule = await parsingPool.run(parse_change_dict, dict_to_parse)
         except Exception as e:
             master_logger.error(e, exc_info=True)
             await self.notifier.alert_admin(f'Проблема с парсом файла из таблицы в json-- {e}')
-            await self.notifier.alert_admin_file(pdfParser.beauty_csv)
-            return
+            await self.notifier.alert_admin_file(pdfParser.debug_csv())
+            return None
 
-        with open(File(f'changes_{self.scanner.date}.json'), 'w') as file:
+        with open(File(f'changes_{date}.json'), 'w') as file:
             json.dump(changeShedule, file, ensure_ascii=False, indent=4, sort_keys=True)
         master_logger.info('JSON saved')
 
-        await self.db.save_change_shedule(change=changeShedule, date=self.scanner.date)
-        master_logger.info('Document mongo saved')
+        changed = await self.db.save_change_shedule(change=changeShedule, date=date)
+        master_logger.info(f'Document mongo saved, {len(changed)} groups changed')
+        return changed
 
-    async def _notify(self, date: Optional[datetime.date] = None):
-        await self.notifier.notify_changes(date)
+    async def _notify(self, date: Optional[datetime.date] = None,
+                groups: Optional[list[tuple[str, str]]] = None):
+        await self.notifier.notify_changes(date, groups)
 
 
 async def _start_data_master():
     master_logger.info('Starting data master')
+    # DataMaster runs in its own process, its gauges are exported on a separate port
+    start_http_server(settings.scanner['export-port'])
     master = DataMaster()
     await master.start()
 
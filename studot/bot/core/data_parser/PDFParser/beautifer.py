@@ -2,6 +2,7 @@ import logging
 import pandas as pd
 
 from bot.core.file_resolver.resolver import File
+from bot.core.data_parser.PDFParser.pipeline import normalize_line
 
 
 beautifer_logger = logging.getLogger(__name__)
@@ -63,33 +64,11 @@ class CSVBeautifer:
 
     def _beautifing(self):
         beautifer_logger.info('Start beautifing')
-        def right_line(line: str):
-            spec_sym = ('"', 'а', 'б', 'в', 'г', 'д', 'е', 'ж', 'з', 'и', 'й', 'к', 'л', 'м', 'н', 'о', 'п', 'р', 'с', 'т', 'у', 'ф', 'х', 'ц', 'ч', 'ш', 'щ', 'ъ', 'ы', 'ь', 'э', 'ю', 'я')
-            if line.lower().startswith(spec_sym) or 'курс' in line.lower():
-                return True
-            return False
-
         with open(self.orig_csv, 'r') as f1, open(self.csv, 'w') as f2:
-            lines = f1.readlines()
-
-            for c, line in enumerate(lines):
-                line = line.strip()
-                if not right_line(line):
-                    if line[0] == ',':
-                        if line[-1] == ',':
-                            line = '""'+line[:-1]
-                        else:
-                            line = '""'+line
-                    else:    
-                        if line[-1] == ',':
-                            line = '"",'+line[:-1]
-                        else:
-                            line = '"",'+line
-                elif line[0] == 'с':
-                    line = '"",'+line[:-1]
-                elif 'практика' in line.lower():
+            for line in f1:
+                line = normalize_line(line.strip())
+                if line is None:
                     break
-                    
 
                 f2.write(line+'\n')
                 
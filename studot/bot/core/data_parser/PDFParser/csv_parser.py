@@ -1,7 +1,7 @@
 import logging
 import json
 
-from typing import Optional
+from typing import Iterable, Optional
 
 import pandas as pd
 
@@ -19,16 +19,24 @@ class CSVParser:
     """CSVParser parses csv table or pandas dataframe to JSON or python dict
     """
     def __init__(self, dataframe: Optional[pd.DataFrame] = None,
-                csv_filepath: Optional[str] = None) -> None:
+                csv_filepath: Optional[str] = None,
+                records: Optional[Iterable[tuple]] = None) -> None:
         """
         Args:
             dataframe (Optional[pd.DataFrame], optional): Data frame to process. Defaults to None.
             csv_filepath (Optional[str], optional): CSV file path to process. Defaults to None.
+            records (Optional[Iterable[tuple]], optional): (Группа, Пара, Провести) rows
+                with NaN for empty cells, as pipeline.change_records gives them. Defaults to None.
         """
-        csv_parser_logger.info('Reading DataFrame')
-        if dataframe is not None:
+        self.records = records
+        self.df = None
+        if records is not None:
+            csv_parser_logger.info('Reading records')
+        elif dataframe is not None:
+            csv_parser_logger.info('Reading DataFrame')
             self.df = dataframe
         else:
+            csv_parser_logger.info('Reading DataFrame')
             self.df = pd.read_csv(csv_filepath)
 
         self.schema = {"Курс": {}}
@@ -42,11 +50,19 @@ class CSVParser:
 
         csv_parser_logger.info('Ready to start parse')
 
-    def process(self):
+    def process(self, vectorized: bool = False):
         """Dictionary extraction from Data frame
+
+        Args:
+            vectorized (bool, optional): Use column operations instead of
+                the row by row parse, the result is the same. Defaults to False.
         """
+        if vectorized:
+            self._process_vectorized()
+            return
+
         csv_parser_logger.info('Starting parse')
-        for row in zip(self.df['Группа'], self.df['Пара'], self.df['Провести']):
+        for row in self._rows():
             group_field = row[0]
             sub_num = row[1]
             change = row[2]
@@ -59,6 +75,60 @@ class CSVParser:
 
         csv_parser_logger.info('Parse done')
 
+    def _process_vectorized(self):
+        """Course rows split the table into sections, course and group rows
+        split it into segments -- one changes dict per segment.
+        Later duplicates replace earlier ones like in the row by row parse
+        """
+        csv_parser_logger.info('Starting vectorized parse')
+        df = self._frame()
+        groups = df['Группа'].astype(object)
+
+        is_str = groups.map(lambda v: isinstance(v, str)).astype(bool)
+        is_float = groups.map(lambda v: isinstance(v, float)).astype(bool)
+        course = groups.where(is_str, '').str.contains('курс', regex=False).astype(bool)
+        group = ~course & ~is_float
+
+        section = course.cumsum()
+        segment = (course | group).cumsum()
+        # Group name goes on after course row until the next group row
+        name = groups[group].map(str.upper).reindex(df.index).ffill().fillna('')
+
+        # Section 0 is the rows before the first course row, parsed as 1 course
+        sections = {}
+        if len(df) and not course.iat[0]:
+            sections[0] = ('1', {})
+        for number, value in enumerate(groups[course], start=1):
+            sections[number] = (str(int(value[0])), {})
+
+        entries = pd.DataFrame({
+            'section': section,
+            'segment': segment,
+            'name': name,
+            'sub_num': df['Пара'].map(self._sub_num_key),
+            'change': df['Провести']
+        })[~course]
+        for (number, _), rows in entries.groupby(['section', 'segment'], sort=False):
+            sections[number][1][rows['name'].iat[0]] = dict(zip(rows['sub_num'], rows['change']))
+
+        courses = {}
+        for course_name, course_groups in sections.values():
+            courses[course_name] = course_groups
+        self.schema = {'Курс': courses}
+
+        csv_parser_logger.info('Parse done')
+
+    def _frame(self) -> pd.DataFrame:
+        if self.df is None:
+            self.df = pd.DataFrame(list(self.records), columns=['Группа', 'Пара', 'Провести'])
+            self.records = None
+        return self.df.reset_index(drop=True)
+
+    def _rows(self) -> Iterable[tuple]:
+        if self.records is not None:
+            return self.records
+        return zip(self.df['Группа'], self.df['Пара'], self.df['Провести'])
+
     def json(self, output: str):
         self._convert_to_json(output)
 
@@ -83,12 +153,13 @@ class CSVParser:
             if group:
                 self._clear_current()
                 self.current_group_name = group_field.upper()
-            if isinstance(sub_num, str):
-                self._update_current_group(str(sub_num), change)
-            elif isinstance(sub_num, float):
-                self._update_current_group(str(sub_num), change)
-            else:
-                self._update_current_group(str(int(sub_num)), change)
+            self._update_current_group(self._sub_num_key(sub_num), change)
+
+    @staticmethod
+    def _sub_num_key(sub_num) -> str:
+        if isinstance(sub_num, (str, float)):
+            return str(sub_num)
+        return str(int(sub_num))
 
 
     def _check_fields(self, row):
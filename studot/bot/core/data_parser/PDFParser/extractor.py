@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import tabula
+
+
+extractor_logger = logging.getLogger(__name__)
+extractor_logger.setLevel(logging.INFO)
+handler = logging.FileHandler(f"logs/TableExtractor.log", mode='w')
+formatter = logging.Formatter("%(name)s %(asctime)s %(levelname)s %(message)s")
+handler.setFormatter(formatter)
+extractor_logger.addHandler(handler)
+extractor_logger.addHandler(logging.StreamHandler())
+
+
+def extract_rows(path: str) -> list[list[str]]:
+    """Table cells of every page, rows in the order tabula writes them to CSV.
+
+    JVM is started in the calling process on the first call (jpype)
+    and is reused by the next ones.
+
+    Args:
+        path (str): PDF file path
+
+    Returns:
+        list[list[str]]: Rows of cell texts
+    """
+    tables = tabula.read_pdf(
+        path,
+        pages='all',
+        output_format='json',
+        force_subprocess=False
+    )
+    rows = []
+    for table in tables:
+        for row in table['data']:
+            rows.append([cell['text'] for cell in row])
+    return rows
+
+
+def _minimal_pdf() -> bytes:
+    """One page PDF with one line of text, used to warm up the JVM
+    """
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 200 100] '
+        b'/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>',
+        None,
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>'
+    ]
+    stream = b'BT /F1 12 Tf 20 50 Td (warm up) Tj ET'
+    objects[3] = b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream)
+
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+
+    xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects)+1)
+    for offset in offsets:
+        pdf += b'%010d 00000 n \n' % offset
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects)+1, xref)
+    return pdf
+
+
+def _warm_up() -> None:
+    """Worker initializer, starts the JVM and loads tabula classes
+    """
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as file:
+        file.write(_minimal_pdf())
+    try:
+        extract_rows(file.name)
+    except Exception:
+        # Warm up is best effort, the real file will show the error
+        pass
+    finally:
+        os.remove(file.name)
+
+
+class ExtractionWorker:
+    """Long-lived process with a warm JVM extracting PDF tables
+
+    One worker is enough: files come rarely and the JVM takes a lot of memory.
+    The process is started on first use, or in advance by start().
+    """
+
+    def __init__(self) -> None:
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            extractor_logger.info('Starting extraction worker')
+            self._executor = ProcessPoolExecutor(max_workers=1, initializer=_warm_up)
+        return self._executor
+
+    async def start(self) -> None:
+        """Start the worker and wait for the JVM to warm up
+        """
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        await loop.run_in_executor(self._get_executor(), os.getpid)
+        extractor_logger.info(f'Extraction worker is ready in {time.monotonic()-start:.1f}s')
+
+    async def extract(self, path: str) -> list[list[str]]:
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        try:
+            rows = await loop.run_in_executor(self._get_executor(), extract_rows, path)
+        except BrokenProcessPool:
+            # Worker died (JVM crash, OOM), next call starts a new one
+            self._executor = None
+            raise
+        extractor_logger.info(f'{path} extracted in {time.monotonic()-start:.2f}s, {len(rows)} rows')
+        return rows
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+extractionWorker = ExtractionWorker()
@@ -1,18 +1,21 @@
 import logging
 import requests
 
-from typing import Any
+from typing import Any, Optional
 from urllib.parse import urlparse
 from pathlib import Path
 
-import tabula
 import pandas as pd
 from pydantic import BaseModel, validator
 
+from config import settings
+
 from bot.core.file_resolver.resolver import File
+from bot.core.utils.http import httpClient
 
 from .csv_parser import CSVParser
-from .beautifer import CSVBeautifer
+from .extractor import extract_rows, extractionWorker
+from .pipeline import RECORD_COLUMNS, change_records, drop_column, normalize, write_csv
 
 
 pdf_parser_logger = logging.getLogger(__name__)
@@ -45,12 +48,13 @@ class FileSrc(BaseModel):
 
 
 class PDFParser:
-    def __init__(self, src: str) -> None:
-        """Read PDF in filepath and processes it converting to CSV cells
-        and then to pandas DataFrame
+    def __init__(self, src: str, rows: Optional[list[list[str]]] = None) -> None:
+        """Read PDF in filepath and parse its table rows in memory
 
         Args:
             src (str): Path to PDF file or URL to file
+            rows (Optional[list[list[str]]], optional): Table rows already extracted
+                from the file by extraction worker. Defaults to None -- extract in this process
         """
         pdf_parser_logger.info('Starting PDF parser')
         src = FileSrc(path=src)
@@ -58,21 +62,61 @@ class PDFParser:
         if self._is_url(filepath):
             filepath = self._download_file(filepath)
 
-        output_csv = File('pdf-csv.csv')
-        pdf_parser_logger.info('Start converting PDF to CSV')
-        
-        tabula.convert_into(filepath, output_csv, output_format="csv", pages='all')
-        pdf_parser_logger.info('PDF converted')
+        if rows is None:
+            pdf_parser_logger.info('Start extracting PDF tables')
+            rows = extract_rows(filepath)
+            pdf_parser_logger.info('PDF tables extracted')
+
+        self.rows = rows
+        self.beauty_csv = None
+        self._df = None
+
+        # Rows are normalized on the way to the parser, nothing is written to disk
+        self.parser = CSVParser(records=change_records(self.rows))
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Normalized table, made on first use
+        """
+        if self._df is None:
+            self._df = pd.DataFrame(
+                list(change_records(self.rows)),
+                columns=list(RECORD_COLUMNS)
+            )
+        return self._df
+
+    def debug_csv(self) -> str:
+        """Normalized table as CSV file to send to admin, written on first call
+
+        Returns:
+            str: CSV file path
+        """
+        if self.beauty_csv is None:
+            self.beauty_csv = write_csv(normalize(drop_column(self.rows)), File('beauty.csv'))
+        return self.beauty_csv
+
+    @classmethod
+    async def from_url(cls, url: str) -> 'PDFParser':
+        """Download PDF with the shared async session and parse it
+
+        Args:
+            url (str): URL to file
+        """
+        path = await httpClient.download(url, File('changes.pdf'))
+        return await cls.from_file(path)
 
-        csvBeautifer = CSVBeautifer(output_csv)
-        self.df = csvBeautifer.beautify()
-        self.beauty_csv = csvBeautifer.csv
-        pdf_parser_logger.info('DataFrame is recieved')
+    @classmethod
+    async def from_file(cls, path: str) -> 'PDFParser':
+        """Extract tables by the warm extraction worker and parse them
 
-        self.parser = CSVParser(dataframe=self.df)
+        Args:
+            path (str): Path to PDF file
+        """
+        rows = await extractionWorker.extract(path)
+        return cls(src=path, rows=rows)
 
     def process(self):
-        pdf_parser_logger.info('Start processing DataFrame')
+        pdf_parser_logger.info('Start processing table rows')
         self.parser.process()
 
     def extract_csv(self, output: str) -> str:
@@ -97,16 +141,20 @@ class PDFParser:
         return self.parser.json(output=output)
 
     def _is_url(self, filepath: str):
-        return True
+        return urlparse(filepath).scheme in ('http', 'https')
 
     def _download_file(self, filepath: str):
+        """Blocking download, only for sync callers. Async code uses PDFParser.from_url
+        """
         pdf_parser_logger.info(f'Downloading PDF file from {filepath}')
 
         path = File('changes.pdf')
 
-        with open(path, 'wb') as file:
-            r = requests.get(filepath)
-            file.write(r.content)
+        with requests.get(filepath, stream=True, timeout=settings.http['timeout']) as r:
+            r.raise_for_status()
+            with open(path, 'wb') as file:
+                for chunk in r.iter_content(chunk_size=settings.http['chunk-size']):
+                    file.write(chunk)
 
         pdf_parser_logger.info(f'File {path} downloaded')
 
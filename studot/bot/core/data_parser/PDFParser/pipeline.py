@@ -0,0 +1,133 @@
+import csv
+import io
+
+from typing import Iterable, Iterator, Optional
+
+
+"""Summary:
+In-memory replacement of pdf-csv.csv -> beauty.csv -> pd.read_csv.
+Rows extracted from PDF go through generators:
+drop_column (limited doc) -> normalize (CSVBeautifer line rules) -> records,
+records are fed to CSVParser one by one.
+"""
+
+
+# Column of the not limited doc
+REPLACE_COLUMN = 'Заменить'
+# Columns used by CSVParser
+RECORD_COLUMNS = ('Группа', 'Пара', 'Провести')
+# Strings pandas.read_csv reads as NaN by default
+NA_VALUES = frozenset((
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+))
+# First symbols of a line that starts with a group name or a text cell
+SPEC_SYM = ('"', 'а', 'б', 'в', 'г', 'д', 'е', 'ж', 'з', 'и', 'й', 'к', 'л', 'м', 'н', 'о', 'п', 'р', 'с', 'т', 'у', 'ф', 'х', 'ц', 'ч', 'ш', 'щ', 'ъ', 'ы', 'ь', 'э', 'ю', 'я')
+
+
+def right_line(line: str) -> bool:
+    if line.lower().startswith(SPEC_SYM) or 'курс' in line.lower():
+        return True
+    return False
+
+
+def normalize_line(line: str) -> Optional[str]:
+    """Fix CSV line made by tabula, so every line has group cell first
+
+    Args:
+        line (str): Stripped CSV line
+
+    Returns:
+        Optional[str]: Fixed line, None -- the table is over
+    """
+    if not right_line(line):
+        if line[0] == ',':
+            if line[-1] == ',':
+                line = '""'+line[:-1]
+            else:
+                line = '""'+line
+        else:
+            if line[-1] == ',':
+                line = '"",'+line[:-1]
+            else:
+                line = '"",'+line
+    elif line[0] == 'с':
+        line = '"",'+line[:-1]
+    elif 'практика' in line.lower():
+        return None
+    return line
+
+
+def row_to_line(row: list[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue()
+
+
+def drop_column(rows: Iterable[list[str]], column: str = REPLACE_COLUMN) -> Iterator[list[str]]:
+    """Remove <column> from the table if header has it
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+    if column not in header:
+        yield header
+        yield from rows
+        return
+
+    index = header.index(column)
+    yield header[:index] + header[index+1:]
+    for row in rows:
+        yield row[:index] + row[index+1:]
+
+
+def normalize(rows: Iterable[list[str]]) -> Iterator[list[str]]:
+    """CSVBeautifer rules over rows
+    """
+    for row in rows:
+        line = row_to_line(row).strip()
+        if not line:
+            continue
+        line = normalize_line(line)
+        if line is None:
+            return
+        yield next(csv.reader([line]))
+
+
+def _value(cell: str):
+    """Cell as pandas.read_csv gives it to CSVParser: NaN for empty, str otherwise
+    """
+    if cell in NA_VALUES:
+        return float('nan')
+    return cell
+
+
+def records(rows: Iterable[list[str]]) -> Iterator[tuple]:
+    """(Группа, Пара, Провести) of every row after the header
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+    indexes = [header.index(column) for column in RECORD_COLUMNS]
+
+    for row in rows:
+        yield tuple(
+            _value(row[index]) if index < len(row) else float('nan')
+            for index in indexes
+        )
+
+
+def change_records(rows: Iterable[list[str]]) -> Iterator[tuple]:
+    """Full pipeline from extracted rows to CSVParser records
+    """
+    return records(normalize(drop_column(rows)))
+
+
+def write_csv(rows: Iterable[list[str]], path: str) -> str:
+    """Debug artifact, rows as CSV file
+    """
+    with open(path, 'w', newline='') as file:
+        csv.writer(file).writerows(rows)
+    return path
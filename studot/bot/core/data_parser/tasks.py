@@ -0,0 +1,32 @@
+from bot.core.data_parser.JSONParser import JSONParser
+from bot.core.data_parser.PDFParser.csv_parser import CSVParser
+from bot.core.data_parser.PDFParser.pipeline import change_records
+
+
+"""Summary:
+Parsing stages for ParsingPool. They are module level functions,
+so they are pickled to a worker process by name, and take and return
+plain rows and dicts.
+"""
+
+
+def parse_change_rows(rows: list[list[str]]) -> dict:
+    """Table rows extracted from PDF -> CSVParser dict
+    """
+    csvParser = CSVParser(records=change_records(rows))
+    csvParser.process()
+    return csvParser.dict()
+
+
+def parse_change_dict(dict_to_parse: dict) -> dict:
+    """CSVParser dict -> change shedule document
+    """
+    return JSONParser(dict_to_parse=dict_to_parse).parse()
+
+
+def parse_change_csv(path: str) -> dict:
+    """Normalized CSV table -> change shedule document
+    """
+    csvParser = CSVParser(csv_filepath=path)
+    csvParser.process()
+    return parse_change_dict(csvParser.dict())
@@ -1,19 +1,23 @@
-from typing import Optional
+from typing import Any, Optional
 import logging
 import datetime
 import asyncio
-from asyncio import sleep
 
-import telebot
 import vkbottle
+from aiogram import Bot
+from prometheus_client import start_http_server
 
 from config import settings
 
 from bot.core.utils.db.shedule import sheduleDB
 from bot.core.utils.db.users import usersDB
 from bot.core.statistics.metrics.metrics import metrics
-from bot.core.utils.types.userinfo import UserInfo
-from bot.core.utils.types.shedule import DayShedule, SHEDULE_DAY
+from bot.core.statistics.metrics.archive import metricsArchive
+from bot.core.notifier.sender import Sender
+from bot.core.notifier.queue import NotifyQueue
+from bot.core.notifier.scheduler import Scheduler
+from bot.core.utils.types.userinfo import UserInfo, time_of_minute, DEFAULT_NEXT_SUBJECT_BEFORE
+from bot.core.utils.types.shedule import SHEDULE_DAY, SUBJECT_STARTS
 
 
 notifier_logger = logging.getLogger(__name__)
@@ -28,20 +32,42 @@ notifier_logger.addHandler(logging.StreamHandler())
 class Notifier:
     def __init__(self) -> None:
         notifier_logger.info('Notifier INIT')
-        self.tg_bot = telebot.TeleBot(settings.bot_api_key)
+        self.tg_bot = Bot(settings.bot_api_key)
         self.vk_bot = vkbottle.Bot(settings.vk_bot_api_key)
+        self.sender = Sender(self.tg_bot, self.vk_bot)
+        self.queue = NotifyQueue(self.sender)
         self.db = sheduleDB
         self.users_db = usersDB
         notifier_logger.info('Notifier is ready')
 
     async def alert_admin(self, error):
-        self.tg_bot.send_message(settings.admin_id, error)
+        await self.tg_bot.send_message(settings.admin_id, error)
 
     async def alert_admin_file(self, filename: str):
         with open(filename, 'rb') as file:
-            self.tg_bot.send_document(chat_id=settings.admin_id, document=file)
+            await self.tg_bot.send_document(chat_id=settings.admin_id, document=file)
 
-    async def notify_changes(self, date: Optional[datetime.date] = None):
+    def _group_users(self, users: list[UserInfo]) -> dict:
+        """Group users by place, course and group
+
+        Returns:
+            dict: place -- {(course, group) -- [UserInfo]}
+        """
+        groups = {}
+        for userInfo in users:
+            place_groups = groups.setdefault(userInfo.place, {})
+            place_groups.setdefault((userInfo.course, userInfo.group), []).append(userInfo)
+        return groups
+
+    async def notify_changes(self, date: Optional[datetime.date] = None,
+                groups: Optional[list[tuple[str, str]]] = None):
+        """Send change shedule
+
+        Args:
+            date (Optional[datetime.date]): Changes date. Defaults to tomorrow
+            groups (Optional[list[tuple[str, str]]]): Notify only users of the (course, group) pairs,
+                as save_change_shedule returns them. Defaults to all groups
+        """
         notifier_logger.info('Start to notify changes')
 
         if date is None:
@@ -50,95 +76,217 @@ class Notifier:
 
         date_str = date.strftime('%Y-%m-%d')
 
-        users = await self.users_db.get_users(filter={'changes_notify': True})
-
-        await metrics.gauge('users_with_changes_notify', len(users))
-
-        for userInfo in users:
-            changes = await sheduleDB.get_change_shedule(date, userInfo)
-            await self._notify_user_changes(userInfo, changes, f'Появились новые замены ({date_str}):\n')
+        filter = {'changes_notify': True}
+        if groups is not None:
+            if not groups:
+                notifier_logger.info('No changed groups')
+                return
+            filter['course'] = {'$in': sorted({course for course, _ in groups})}
+        users = await self.users_db.get_users(filter=filter)
+
+        if groups is None:
+            await metrics.gauge('users_with_changes_notify', len(users))
+        else:
+            groups = set(groups)
+            users = [userInfo for userInfo in users if (userInfo.course, userInfo.group) in groups]
+            notifier_logger.info(f'{len(groups)} changed groups, {len(users)} users')
+
+        messages = []
+        for place, place_groups in self._group_users(users).items():
+            texts = await self.db.get_change_texts(date, place, list(place_groups.keys()))
+            for key, group_users in place_groups.items():
+                text = f'Появились новые замены ({date_str}):\n'+texts[key]
+                messages.extend((userInfo, text) for userInfo in group_users)
+
+        await self.queue.broadcast('changes', messages)
 
         notifier_logger.info('Notifing is done')
 
-    async def notify_shedule(self, date: Optional[datetime.date] = None):
-        notifier_logger.info('Start notifing shedule')
-
+    async def notify_shedule(self, date: Optional[datetime.date] = None,
+                courses: Optional[list[str]] = None,
+                minute: Optional[int] = None,
+                exclude_courses: Optional[list[str]] = None):
+        """Send day shedule
+
+        Args:
+            date (Optional[datetime.date]): Shedule date. Defaults to tomorrow
+            courses (Optional[list[str]]): Notify only users of the courses. Defaults to all
+            exclude_courses (Optional[list[str]]): Do not notify users of the courses,
+                when <courses> is None. Defaults to none
+            minute (Optional[int]): Notify users who chose the minute of day.
+                Defaults to users with the default time
+        """
         if date is None:
             date = datetime.date.today()
             date += datetime.timedelta(days=1)
 
         day = SHEDULE_DAY.WEEKDAYS[date.weekday()]
 
-        users = await self.users_db.get_users(filter={'shedule_notify': True})
+        filter = {'shedule_notify': True, 'shedule_notify_minute': minute}
+        if courses is not None:
+            filter['course'] = {'$in': courses}
+        elif exclude_courses:
+            filter['course'] = {'$nin': exclude_courses}
+        users = await self.users_db.get_users(filter=filter)
 
-        await metrics.gauge('users_with_shedule_notify', len(users))
+        if courses is None and not exclude_courses and minute is None:
+            await metrics.gauge('users_with_shedule_notify', len(users))
+        if not users:
+            return
 
-        for userInfo in users:
-            shedule = await sheduleDB.get_day_shedule(day, userInfo)
-            await self._notify_user_changes(userInfo, shedule, f'Расписание на {day}:\n')
+        notifier_logger.info(
+            f'Start notifing shedule (courses={courses}, exclude={exclude_courses}, minute={minute})'
+        )
+
+        messages = []
+        for place_groups in self._group_users(users).values():
+            for group_users in place_groups.values():
+                text = await self.db.get_day_text(day, group_users[0])
+                messages.extend((userInfo, text) for userInfo in group_users)
+
+        await self.queue.broadcast('shedule', messages)
 
         notifier_logger.info('Notifing is done')
 
-    async def _notify_user_changes(self, userInfo: UserInfo, shedule: DayShedule, text: str) -> None:
-        if userInfo.social == 'telegram':
-            try:
-                self.tg_bot.send_message(
-                    userInfo.userID, 
-                    (
-                        text
-                        +repr(shedule)
-                    )
-                )
-            except:
-                pass
-        elif userInfo.social == 'vk':
-            try:
-                await self.vk_bot.api.messages.send(
-                    user_id=userInfo.userID, 
-                    message=(
-                        text
-                        +repr(shedule)
-                    ),
-                    random_id=0
-                )
-            except:
-                pass
+    async def notify_next_subject(self, now: datetime.datetime):
+        """Notify users whose next subject starts in their <next_subject_before> minutes
+        """
+        if now.weekday() == 6:
+            return
+
+        minute = now.hour*60 + now.minute
+
+        messages = []
+        for before in settings.scheduler['next-subject-before']:
+            start = minute + before
+            start_str = time_of_minute(start)
+            if start_str not in SUBJECT_STARTS:
+                continue
+
+            if before == DEFAULT_NEXT_SUBJECT_BEFORE:
+                # Users made before the setting have no field
+                filter = {'next_subject_notify': True, 'next_subject_before': {'$in': [before, None]}}
+            else:
+                filter = {'next_subject_notify': True, 'next_subject_before': before}
+            users = await self.users_db.get_users(filter=filter)
+
+            for place_groups in self._group_users(users).values():
+                for group_users in place_groups.values():
+                    # Changes of today replace, cancel and move subjects
+                    dayShedule = await self.db.get_combined_shedule(group_users[0], now.date())
+                    if isinstance(dayShedule, str):
+                        continue
+
+                    for key, subject in zip(dayShedule.keys, dayShedule.subjects):
+                        if subject.time[0] != start_str:
+                            continue
+                        text = (
+                            f'Через {before} мин. начнётся пара {key}:\n'
+                            f'{subject.name}\n({subject.time[0]}-{subject.time[1]})'
+                        )
+                        messages.extend((userInfo, text) for userInfo in group_users)
+
+        if messages:
+            await self.queue.broadcast('next_subject', messages)
 
     async def notify_users(self, text: str):
         users = await self.users_db.get_users(filter={})
 
-        for userInfo in users:
+        await self.queue.broadcast(
+            'users',
+            ((userInfo, text) for userInfo in users)
+        )
+
+    async def _shedule_push(self, date: datetime.date, courses: Optional[list[str]]):
+        waves = settings.scheduler['shedule-push']['waves']
+        if waves and courses == waves[-1]:
+            # Last wave takes every course of no earlier wave, so no user is left without push
+            earlier = [course for wave in waves[:-1] for course in wave]
+            await self.notify_shedule(date + datetime.timedelta(days=1), exclude_courses=earlier)
+            return
+        await self.notify_shedule(date + datetime.timedelta(days=1), courses=courses)
+
+    async def _rotate_metrics(self, date: datetime.date, wave: Optional[Any]):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, metricsArchive.rotate)
+
+    async def _minute_push(self, date: datetime.date, minute: int):
+        """Pushes of users who chose their own time. Called once for every minute of day
+        """
+        if date.weekday() not in settings.scheduler['shedule-push']['skip-weekdays']:
+            await self.notify_shedule(date + datetime.timedelta(days=1), minute=minute)
+
+    async def _next_subject_push(self, date: datetime.date, minute: int):
+        """Called once for every minute of day by its own job,
+        so a long shedule push does not make reminders late
+        """
+        now = datetime.datetime.now(settings.tz_info)
+        planned = datetime.datetime.combine(date, datetime.time(), tzinfo=settings.tz_info)
+        planned += datetime.timedelta(minutes=minute)
+        # Next subject notify is useless after catch-up
+        if now - planned < datetime.timedelta(minutes=1):
+            await self.notify_next_subject(planned)
+
+    async def _recover_queue(self):
+        """Continue broadcasts of stopped processes.
+        Heartbeat of a just restarted process expires after the lease, so it is repeated
+        """
+        while True:
             try:
-                await self._notify_user_text(userInfo, text)
-            except:
-                pass
-
-    async def _notify_user_text(self, userInfo: UserInfo, text: str) -> None:
-        if userInfo.social == 'telegram':
-            self.tg_bot.send_message(
-                userInfo.userID, 
-                text
-            )
-        elif userInfo.social == 'vk':
-            await self.vk_bot.api.messages.send(
-                user_id=userInfo.userID, 
-                message=text,
-                random_id=0
-            )
+                interrupted = await self.queue.recover()
+                for job in interrupted:
+                    await self.alert_admin(
+                        f'Проблема с рассылкой {job["kind"]} от {job["created"]:%d.%m %H:%M} UTC -- '
+                        f'создание прервано, не отправлена {job["total"]} получателям'
+                    )
+            except Exception as e:
+                notifier_logger.error(e, exc_info=True)
+            await asyncio.sleep(self.queue.lease)
 
     async def start(self):
-        while True:
-            date = datetime.datetime.now()
-            if date.weekday() != 5:
-                if date.strftime("%H:%M") == '18:00':
-                    await self.notify_shedule()
-            await sleep(60)
+        await self.users_db.create_indexes()
+
+        push = settings.scheduler['shedule-push']
+
+        scheduler = Scheduler()
+        scheduler.add_daily(
+            'shedule-push',
+            at=datetime.time.fromisoformat(push['time']),
+            callback=self._shedule_push,
+            waves=push['waves'],
+            window=push['window'],
+            skip_weekdays=push['skip-weekdays']
+        )
+        # Every minute of day is a wave
+        scheduler.add_daily(
+            'minute-push',
+            at=datetime.time(0, 0),
+            callback=self._minute_push,
+            waves=list(range(24*60)),
+            window=24*60
+        )
+        scheduler.add_daily(
+            'next-subject',
+            at=datetime.time(0, 0),
+            callback=self._next_subject_push,
+            waves=list(range(24*60)),
+            window=24*60
+        )
+        if settings.metrics['storage'] == 'CSV':
+            scheduler.add_daily(
+                'metrics-rotate',
+                at=datetime.time.fromisoformat(settings.metrics['rotate-time']),
+                callback=self._rotate_metrics
+            )
+        await asyncio.gather(scheduler.run(), self._recover_queue())
 
 
 notifier = Notifier()
 
 
 async def _start_notifier():
+    # Notifier runs in its own process, its SheduleDB timings are exported on a separate port
+    start_http_server(settings.notifier['export-port'])
     notifier_b = Notifier()
     await notifier_b.start()
 
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+import uuid
+
+from typing import Iterable, Optional
+
+from bson import ObjectId
+
+from config import settings
+
+from bot.core.notifier.sender import Sender
+from bot.core.utils.db.notify_queue import notifyQueueDB, NotifyQueueDB, DELIVERY_RECIPIENT_FIELDS
+from bot.core.utils.types.userinfo import UserInfo
+
+
+notify_queue_logger = logging.getLogger(__name__)
+notify_queue_logger.setLevel(logging.INFO)
+handler = logging.FileHandler(f"logs/NotifyQueue.log", mode='w')
+formatter = logging.Formatter("%(name)s %(asctime)s %(levelname)s %(message)s")
+handler.setFormatter(formatter)
+notify_queue_logger.addHandler(handler)
+notify_queue_logger.addHandler(logging.StreamHandler())
+
+
+class NotifyQueue:
+    """Broadcasts through the durable queue
+
+    Broadcast is stored before the first message is sent.
+    Workers claim deliveries by batches, send them with Sender
+    and store results of the whole batch at once,
+    so after restart only unacknowledged batches are sent again.
+
+    Every instance is an owner with its own id and a heartbeat written
+    every third of the lease. Workers renew the lease of a batch while sending it.
+    recover() takes over only jobs and claims of owners whose heartbeat stopped,
+    so live broadcasts of other processes are not touched.
+    """
+
+    def __init__(self, sender: Sender, db: NotifyQueueDB = notifyQueueDB,
+                workers: Optional[int] = None,
+                lease: Optional[int] = None) -> None:
+        self.sender = sender
+        self.db = db
+        self.workers = workers or settings.notifier['queue-workers']
+        self.lease = lease or settings.notifier['queue-lease']
+        self._texts: dict[ObjectId, dict] = {}
+
+        # Set with the heartbeat, instance may be created before fork
+        self.owner: Optional[str] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    async def broadcast(self, kind: str, messages: Iterable[tuple[UserInfo, str]]) -> ObjectId:
+        """Store broadcast and send it
+
+        Args:
+            kind (str): Broadcast name, only for logs
+            messages (Iterable[tuple[UserInfo, str]]): (user, text) pairs
+
+        Returns:
+            ObjectId: Job id
+        """
+        await self._ensure_heartbeat()
+        job_id = await self.db.create_job(kind, messages, self.owner)
+        await self.drain(job_id)
+        return job_id
+
+    async def drain(self, job_id: Optional[ObjectId] = None) -> tuple[int, int]:
+        """Send pending deliveries by worker pool
+
+        Args:
+            job_id (Optional[ObjectId]): Send only the job deliveries.
+                Defaults to all pending deliveries
+
+        Returns:
+            tuple[int, int]: Sent and failed messages count
+        """
+        start = time.monotonic()
+        await self._ensure_heartbeat()
+        # Claims of died workers, live ones renew their lease
+        await self.db.release_stale(self.lease)
+        results = await asyncio.gather(
+            *(self._worker(job_id) for _ in range(self.workers))
+        )
+        sent = sum(r[0] for r in results)
+        failed = sum(r[1] for r in results)
+
+        if job_id is not None:
+            if await self.db.finish_job(job_id):
+                self._texts.pop(job_id, None)
+
+        notify_queue_logger.info(
+            f'Drained {job_id or "all jobs"}: sent {sent}, failed {failed} in {time.monotonic()-start:.1f}s'
+        )
+        return sent, failed
+
+    async def recover(self) -> list[dict]:
+        """Continue broadcasts of stopped owners.
+        Their claims are released, their pending jobs are sent.
+        Jobs interrupted while being created are not sent, they are cancelled
+
+        Returns:
+            list[dict]: Cancelled jobs (_id, kind, total, created) to report to admin
+        """
+        await self._ensure_heartbeat()
+        released = await self.db.release_orphaned(self.lease)
+
+        interrupted = await self.db.interrupted_jobs(self.lease)
+        for job in interrupted:
+            await self.db.abort_job(job['_id'])
+
+        jobs = await self.db.orphaned_jobs(self.lease)
+        if jobs or released:
+            notify_queue_logger.info(f'Resuming {len(jobs)} jobs of stopped owners')
+            await self.drain()
+            for job_id in jobs:
+                if await self.db.finish_job(job_id):
+                    self._texts.pop(job_id, None)
+
+        return interrupted
+
+    async def _ensure_heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._heartbeat is not None and not self._heartbeat.done() and self._heartbeat.get_loop() is loop:
+            return
+        # New process or loop is a new owner, workers of the old one are gone
+        self.owner = uuid.uuid4().hex
+        # Owner is alive before its first job or claim is stored
+        await self.db.heartbeat(self.owner)
+        self._heartbeat = loop.create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await self.db.heartbeat(self.owner)
+            except Exception as e:
+                notify_queue_logger.error(f'Heartbeat of {self.owner} failed -- {e}')
+
+    async def _renew_loop(self, token: str, ids: list[ObjectId]) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await self.db.renew(token, ids)
+            except Exception as e:
+                notify_queue_logger.error(f'Lease renewal of {token} failed -- {e}')
+
+    async def _get_text(self, job_id: ObjectId, key: str) -> str:
+        texts = self._texts.get(job_id)
+        if texts is None:
+            texts = await self.db.get_texts(job_id)
+            self._texts[job_id] = texts
+        return texts.get(key)
+
+    async def _worker(self, job_id: Optional[ObjectId]) -> tuple[int, int]:
+        token = uuid.uuid4().hex
+        sent_count = 0
+        failed_count = 0
+
+        while True:
+            batch = await self.db.claim(token, self.owner, job_id)
+            if not batch:
+                return sent_count, failed_count
+
+            messages = []
+            for delivery in batch:
+                userInfo = UserInfo(
+                    **{field: delivery[field] for field in DELIVERY_RECIPIENT_FIELDS}
+                )
+                messages.append(
+                    (userInfo, await self._get_text(delivery['job_id'], delivery['text']))
+                )
+
+            # Sender may pause on RetryAfter longer than the lease
+            renewal = asyncio.get_running_loop().create_task(
+                self._renew_loop(token, [d['_id'] for d in batch])
+            )
+            try:
+                results = await self.sender.send_batch(messages)
+            finally:
+                renewal.cancel()
+
+            sent = [d['_id'] for d, ok in zip(batch, results) if ok]
+            failed = [d['_id'] for d, ok in zip(batch, results) if not ok]
+            await self.db.ack(sent, failed)
+
+            sent_count += len(sent)
+            failed_count += len(failed)
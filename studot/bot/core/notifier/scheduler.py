@@ -0,0 +1,142 @@
+import asyncio
+import datetime
+import logging
+
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from config import settings
+
+from bot.core.utils.db.scheduler_runs import schedulerRunsDB, SchedulerRunsDB
+
+
+scheduler_logger = logging.getLogger(__name__)
+scheduler_logger.setLevel(logging.INFO)
+handler = logging.FileHandler(f"logs/Scheduler.log", mode='w')
+formatter = logging.Formatter("%(name)s %(asctime)s %(levelname)s %(message)s")
+handler.setFormatter(formatter)
+scheduler_logger.addHandler(handler)
+scheduler_logger.addHandler(logging.StreamHandler())
+
+
+# Wall clock is rechecked at least that often, so clock changes and suspends do not shift runs
+MAX_SLEEP = 60
+
+
+class DailyJob:
+    """Job run every day at <at> by waves
+
+    Attributes:
+        name (str): Unique job name, used as a run key
+        at (datetime.time): Start time of the first wave in settings timezone
+        callback (Callable[[datetime.date, Any], Awaitable]): Called with run date and wave
+        waves (list): Wave arguments, waves are spread evenly over <window> minutes
+        window (int): Minutes
+        skip_weekdays (Iterable[int]): Weekdays without runs, 0 -- Monday
+    """
+
+    def __init__(self, name: str, at: datetime.time,
+                callback: Callable[[datetime.date, Any], Awaitable],
+                waves: Optional[list] = None,
+                window: int = 0,
+                skip_weekdays: Iterable[int] = ()) -> None:
+        self.name = name
+        self.at = at
+        self.callback = callback
+        self.waves = waves or [None]
+        self.window = window
+        self.skip_weekdays = set(skip_weekdays)
+
+    def runs(self, date: datetime.date) -> list[tuple[datetime.datetime, int, Any]]:
+        """Planned runs of the date
+
+        Returns:
+            list[tuple[datetime.datetime, int, Any]]: (run time, wave index, wave) sorted by time
+        """
+        if date.weekday() in self.skip_weekdays:
+            return []
+
+        start = datetime.datetime.combine(date, self.at, tzinfo=settings.tz_info)
+        step = datetime.timedelta(minutes=self.window) / len(self.waves)
+        return [
+            (start + step*i, i, wave)
+            for i, wave in enumerate(self.waves)
+        ]
+
+
+class Scheduler:
+    """Absolute time scheduler
+
+    Runs are claimed in scheduler_runs collection before the callback is called,
+    so a run is done once even if several processes are scheduling it or it was
+    already done before restart. Runs missed not longer than <catch_up> minutes ago
+    are done on start. A job without any stored run is new or was deployed
+    before runs were stored, its passed runs are skipped, not caught up,
+    as they may have been done without a record.
+    """
+
+    def __init__(self, db: SchedulerRunsDB = schedulerRunsDB,
+                catch_up: Optional[int] = None) -> None:
+        self.db = db
+        self.catch_up = datetime.timedelta(
+            minutes=catch_up if catch_up is not None else settings.scheduler['catch-up']
+        )
+        self.jobs: list[DailyJob] = []
+
+    def add_daily(self, *args, **kwargs) -> DailyJob:
+        """Add DailyJob, arguments are passed to DailyJob
+        """
+        job = DailyJob(*args, **kwargs)
+        self.jobs.append(job)
+        return job
+
+    async def run(self) -> None:
+        await asyncio.gather(
+            *(self._run_job(job) for job in self.jobs)
+        )
+
+    def _now(self) -> datetime.datetime:
+        return datetime.datetime.now(settings.tz_info)
+
+    async def _sleep_until(self, moment: datetime.datetime) -> None:
+        while True:
+            delay = (moment - self._now()).total_seconds()
+            if delay <= 0:
+                return
+            await asyncio.sleep(min(delay, MAX_SLEEP))
+
+    async def _run_job(self, job: DailyJob) -> None:
+        date = (self._now() - self.catch_up).date()
+        if not await self.db.has_runs(job.name):
+            await self._skip_passed(job, date)
+        while True:
+            for run_at, index, wave in job.runs(date):
+                if run_at < self._now() - self.catch_up:
+                    continue
+                await self._sleep_until(run_at)
+                await self._fire(job, date, index, wave, run_at)
+            date += datetime.timedelta(days=1)
+
+    async def _skip_passed(self, job: DailyJob, date: datetime.date) -> None:
+        now = self._now()
+        passed = []
+        while date <= now.date():
+            passed += [(date, index) for run_at, index, _ in job.runs(date) if run_at < now]
+            date += datetime.timedelta(days=1)
+        await self.db.seed(job.name, passed)
+        scheduler_logger.info(f'{job.name} has no runs stored, {len(passed)} passed runs are skipped')
+
+    async def _fire(self, job: DailyJob, date: datetime.date, index: int,
+                wave: Any, run_at: datetime.datetime) -> None:
+        if not await self.db.claim(job.name, date, index):
+            scheduler_logger.info(f'{job.name} {date} wave {index} is already done')
+            return
+
+        late = (self._now() - run_at).total_seconds()
+        scheduler_logger.info(f'Run {job.name} {date} wave {index} ({wave}), late by {late:.1f}s')
+        try:
+            await job.callback(date, wave)
+        except Exception as e:
+            scheduler_logger.error(e, exc_info=True)
+            await self.db.finish(job.name, date, index, error=str(e))
+        else:
+            await self.db.finish(job.name, date, index)
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import time
+
+from typing import Iterable, Optional
+
+import aiohttp
+from aiogram import Bot
+from aiogram.utils.exceptions import RetryAfter, NetworkError, TelegramAPIError
+from vkbottle import Bot as VKBot, VKAPIError
+
+from config import settings
+
+from bot.core.utils.types.userinfo import UserInfo
+
+
+sender_logger = logging.getLogger(__name__)
+sender_logger.setLevel(logging.INFO)
+handler = logging.FileHandler(f"logs/Sender.log", mode='w')
+formatter = logging.Formatter("%(name)s %(asctime)s %(levelname)s %(message)s")
+handler.setFormatter(formatter)
+sender_logger.addHandler(handler)
+sender_logger.addHandler(logging.StreamHandler())
+
+
+# VK error codes: 6 -- too many requests per second, 9 -- flood control
+VK_RATE_ERRORS = (6, 9)
+
+
+class TokenBucket:
+    """Token bucket rate limiter
+
+    Attributes:
+        rate (float): Tokens added per second
+        capacity (int): Max tokens, burst size
+    """
+
+    def __init__(self, rate: float, capacity: Optional[int] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(int(rate), 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        # Created on first use, asyncio primitives bind to the running loop
+        self._lock = None
+
+    def pause(self, seconds: float) -> None:
+        """Stop giving tokens for <seconds>, used when API asks to retry after
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    async def acquire(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class Sender:
+    """Concurrent message delivery to Telegram and VK users
+
+    Messages are sent by <concurrency> workers,
+    every platform has its own token bucket,
+    rate limit errors are retried after the time API asks.
+    """
+
+    def __init__(self, tg_bot: Bot, vk_bot: VKBot,
+                concurrency: Optional[int] = None,
+                telegram_rate: Optional[float] = None,
+                vk_rate: Optional[float] = None,
+                retries: Optional[int] = None) -> None:
+        self.tg_bot = tg_bot
+        self.vk_bot = vk_bot
+
+        self.concurrency = concurrency or settings.notifier['concurrency']
+        self.retries = retries if retries is not None else settings.notifier['retries']
+        self.buckets = {
+            'telegram': TokenBucket(telegram_rate or settings.notifier['telegram-rate']),
+            'vk': TokenBucket(vk_rate or settings.notifier['vk-rate'])
+        }
+        self._semaphore = None
+
+    async def send(self, userInfo: UserInfo, text: str) -> bool:
+        """Send message to user with retries
+
+        Returns:
+            bool: Was message delivered
+        """
+        bucket = self.buckets.get(userInfo.social)
+        if bucket is None:
+            sender_logger.error(f'Unknown social {userInfo.social} of user {userInfo.userID}')
+            return False
+
+        for attempt in range(self.retries+1):
+            await bucket.acquire()
+            try:
+                await self._send(userInfo, text)
+                return True
+            except RetryAfter as e:
+                sender_logger.info(f'Telegram asks to retry after {e.timeout}s')
+                bucket.pause(e.timeout)
+            except VKAPIError as e:
+                if e.code not in VK_RATE_ERRORS:
+                    sender_logger.info(f'VK user {userInfo.userID} is not reachable -- {e}')
+                    return False
+                bucket.pause(2**attempt)
+            except (NetworkError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                sender_logger.info(f'Network error, retrying -- {e}')
+                await asyncio.sleep(2**attempt)
+            except TelegramAPIError as e:
+                # Bot blocked, chat not found etc. Retry will not help
+                sender_logger.info(f'Telegram user {userInfo.userID} is not reachable -- {e}')
+                return False
+            except Exception as e:
+                sender_logger.error(e, exc_info=True)
+                return False
+
+        sender_logger.info(f'Message to {userInfo.userID} was not sent after {self.retries+1} attempts')
+        return False
+
+    async def _send(self, userInfo: UserInfo, text: str) -> None:
+        if userInfo.social == 'telegram':
+            await self.tg_bot.send_message(
+                userInfo.userID,
+                text
+            )
+        elif userInfo.social == 'vk':
+            await self.vk_bot.api.messages.send(
+                user_id=userInfo.userID,
+                message=text,
+                random_id=0
+            )
+
+    async def send_batch(self, messages: list[tuple[UserInfo, str]]) -> list[bool]:
+        """Send messages concurrently, at most <concurrency> at once for all batches
+
+        Args:
+            messages (list[tuple[UserInfo, str]]): (user, text) pairs
+
+        Returns:
+            list[bool]: Delivery result of every message
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(userInfo: UserInfo, text: str) -> bool:
+            async with self._semaphore:
+                return await self.send(userInfo, text)
+
+        return await asyncio.gather(
+            *(send(userInfo, text) for userInfo, text in messages)
+        )
+
+    async def send_many(self, messages: Iterable[tuple[UserInfo, str]]) -> tuple[int, int]:
+        """Send messages concurrently
+
+        Args:
+            messages (Iterable[tuple[UserInfo, str]]): (user, text) pairs
+
+        Returns:
+            tuple[int, int]: Sent and failed messages count
+        """
+        queue = asyncio.Queue(maxsize=self.concurrency*2)
+        counts = {True: 0, False: 0}
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                try:
+                    if item is None:
+                        return
+                    userInfo, text = item
+                    counts[await self.send(userInfo, text)] += 1
+                finally:
+                    queue.task_done()
+
+        start = time.monotonic()
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            for message in messages:
+                await queue.put(message)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+        sender_logger.info(
+            f'Sent {counts[True]}, failed {counts[False]} in {time.monotonic()-start:.1f}s'
+        )
+        return counts[True], counts[False]
@@ -0,0 +1,108 @@
+from html.parser import HTMLParser
+from typing import Optional
+
+
+# Page region with shedule links, <div class="right-column"><div class="page-tmpl-content">
+REGION_CLASSES = ('right-column', 'page-tmpl-content')
+CHANGES_TEXT = 'изменение занятий'
+
+
+class _RegionEnd(Exception):
+    pass
+
+
+class ChangesLinkExtractor(HTMLParser):
+    """Streaming extractor of change shedule links
+
+    Collects <h2><a href><span>text</span></a></h2> inside the page region
+    and stops at the end of the region, the rest of the page is not parsed.
+
+    Attributes:
+        links (list[tuple[str, str]]): (href, span text) in page order
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.links: list[tuple[str, str]] = []
+
+        # Region classes entered so far and div depth inside the last one
+        self._region = 0
+        self._div_depth = 0
+
+        self._in_h2 = False
+        self._href: Optional[str] = None
+        self._in_a = False
+        self._in_span = False
+        self._span_done = False
+        self._span_text: list[str] = []
+
+    def extract(self, html: str) -> list[tuple[str, str]]:
+        # Skip everything before the region without tokenizing it
+        region = html.find(REGION_CLASSES[0])
+        if region != -1:
+            html = html[max(html.rfind('<div', 0, region), 0):]
+
+        try:
+            self.feed(html)
+            self.close()
+        except _RegionEnd:
+            pass
+        return self.links
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag == 'div':
+            if self._region < len(REGION_CLASSES) and self._div_depth == 0:
+                classes = (dict(attrs).get('class') or '').split()
+                if REGION_CLASSES[self._region] in classes:
+                    self._region += 1
+                    self._div_depth = 1 if self._region == len(REGION_CLASSES) else 0
+                    return
+            if self._region == len(REGION_CLASSES):
+                self._div_depth += 1
+            return
+
+        if self._region != len(REGION_CLASSES):
+            return
+
+        if tag == 'h2':
+            self._in_h2 = True
+            self._href = None
+            self._span_done = False
+            self._span_text = []
+        elif tag == 'a' and self._in_h2 and self._href is None:
+            self._in_a = True
+            self._href = dict(attrs).get('href')
+        elif tag == 'span' and self._in_a and not self._span_done:
+            self._in_span = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._region != len(REGION_CLASSES):
+            return
+
+        if tag == 'div':
+            self._div_depth -= 1
+            if self._div_depth == 0:
+                raise _RegionEnd()
+        elif tag == 'span' and self._in_span:
+            self._in_span = False
+            self._span_done = True
+        elif tag == 'a':
+            self._in_a = False
+        elif tag == 'h2' and self._in_h2:
+            self._in_h2 = False
+            text = ''.join(self._span_text)
+            if self._href and CHANGES_TEXT in text.lower():
+                self.links.append((self._href, text))
+
+    def handle_data(self, data: str) -> None:
+        if self._in_span:
+            self._span_text.append(data)
+
+
+def extract_change_links(html: str) -> list[tuple[str, str]]:
+    """Find change shedule links of the page
+
+    Returns:
+        list[tuple[str, str]]: (href, link text) in page order
+    """
+    return ChangesLinkExtractor().extract(html)
@@ -1,8 +1,18 @@
-import requests
+import os
+import asyncio
+import datetime
 import logging
 
+from typing import Optional
+
+import aiohttp
+
 from config import settings
 from bot.core.scanner.site_parser import SiteParser
+from bot.core.data_master.interval import parse_interval
+from bot.core.file_resolver.resolver import File
+from bot.core.utils.http import httpClient, HTTPResponse
+from bot.core.utils.db.scanner_seen import scannerSeenDB, ScannerSeenDB
 
 
 scanner_logger = logging.getLogger(__name__)
@@ -14,65 +24,139 @@ scanner_logger.addHandler(handler)
 scanner_logger.addHandler(logging.StreamHandler())
 
 
-class Scanner:
-    result: str
-    date: str
+class FileUpdate:
+    """New change shedule file downloaded by Scanner
+
+    Attributes:
+        date (str): Change shedule date YYYY-MM-DD
+        url (str): File url
+        response (HTTPResponse): Downloaded file
+    """
+
+    def __init__(self, date: str, url: str, response: HTTPResponse) -> None:
+        self.date = date
+        self.url = url
+        self.response = response
 
-    def __init__(self) -> None:
+
+class Scanner:
+    """Site scanner
+
+    Index page is requested with If-None-Match/If-Modified-Since and parsed
+    only if its content hash changed. Every change shedule link of the page is
+    compared with the files seen before (scanner_seen collection):
+    files are requested conditionally and identified by content hash, so a file
+    re-uploaded under the same URL is found and the same file under a new URL
+    is skipped. Links for past dates are only remembered.
+    """
+    entries: list[tuple[str, str]]
+
+    def __init__(self, db: ScannerSeenDB = scannerSeenDB) -> None:
         scanner_logger.info('Init Scanner. Reading time interval from settings')
-        self.result = ''
-        self.check_result = ''
+        self.db = db
+        self.entries = []
+        self.no_url = True
+        self.not_modified = False
         self.interval = self._validate_interval(settings.scanner['time-interval'])
         scanner_logger.info('Done')
         self.url = 'http://www.lmk-lipetsk.ru/main_razdel/shedule/index.php'
 
-    async def get_file_url(self):
+        self._etag = None
+        self._last_modified = None
+        self._page_hash = None
+
+    async def get_file_urls(self) -> list[tuple[str, str]]:
         await self._process_site()
 
-        return self.result
+        return self.entries
 
     async def process(self):
         await self._process_site()
 
+    async def new_files(self) -> list[FileUpdate]:
+        """Download files of the page that were not processed before
+
+        Returns:
+            list[FileUpdate]: New files, oldest first
+        """
+        today = datetime.datetime.now(settings.tz_info).date().strftime('%Y-%m-%d')
+        known = await self.db.get_files([url for _, url in self.entries])
+
+        actual = []
+        for date, url in self.entries:
+            if date >= today:
+                actual.append((date, url))
+            elif url not in known:
+                # Backlog of past days is useless for users
+                await self.db.mark(url, date)
+
+        responses = await asyncio.gather(
+            *(
+                self._download(i, date, url, known.get(url))
+                for i, (date, url) in enumerate(actual)
+            )
+        )
+        return [
+            FileUpdate(date, url, r)
+            for (date, url), r in zip(actual, responses)
+            if r is not None
+        ]
+
+    async def mark_processed(self, file: FileUpdate) -> None:
+        """Remember file content after it was saved
+        """
+        r = file.response
+        await self.db.mark(file.url, file.date, r.digest, r.etag, r.last_modified)
+
+    async def _download(self, index: int, date: str, url: str,
+                known: Optional[dict]) -> Optional[HTTPResponse]:
+        etag = known.get('etag') if known else None
+        last_modified = known.get('last_modified') if known else None
+
+        try:
+            r = await httpClient.download_if_modified(
+                url, File(f'changes_{date}_{index}.pdf'), etag, last_modified
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Other files are processed, this one is tried again next scan
+            scanner_logger.error(f'File {url} is not downloaded -- {e}')
+            return None
+        if not r.modified:
+            return None
+
+        if (known and known.get('hash') == r.digest) or await self.db.has_hash(r.digest):
+            scanner_logger.info(f'File {url} content is already processed')
+            await self.db.mark(url, date, r.digest, r.etag, r.last_modified)
+            os.remove(r.path)
+            return None
+        return r
+
     async def _process_site(self):
         scanner_logger.info('Start processing site. Getting html')
-        r = requests.get(self.url)
-        html = r.text
+        r = await httpClient.get_text_if_modified(self.url, self._etag, self._last_modified)
+
+        self.not_modified = not r.modified or r.digest == self._page_hash
+        if self.not_modified:
+            scanner_logger.info('Page is not modified')
+            return
 
         scanner_logger.info('Start parsing html')
         parser = SiteParser()
-        await parser.parse(html)
-        self.no_url = False
-        if parser.no_url:
-            self.no_url = True
-            return
-        
-        self.date = parser.date
+        await parser.parse(r.text)
 
-        scanner_logger.info('Done')
+        # Validators are stored after successful parse, otherwise 304 would hide the page
+        self._etag = r.etag
+        self._last_modified = r.last_modified
+        self._page_hash = r.digest
+
+        self.no_url = parser.no_url
+        self.entries = parser.entries
 
-        self.check_result = parser.file_url
-        if self.check_result != self.result:
-            self.same_url = False
-            self.result = self.check_result
-        else:
-            self.same_url = True
+        scanner_logger.info(f'Done, {len(self.entries)} files on the page')
 
-    # TODO Create validation
     def _validate_interval(self, string: str):
         """Validates time interval in format <TT S>
         Where T - time interval
         Where S - symbol representing (h, m, s)
         """
-        s = string.split()
-        value = int(s[0])
-        sym = s[1]
-
-        if sym == 'h':
-            value = value * 60 * 60
-        elif sym == 'm':
-            value = value * 60
-
-        seconds_interval = value
-
-        return seconds_interval
\ No newline at end of file
+        return parse_interval(string)
\ No newline at end of file
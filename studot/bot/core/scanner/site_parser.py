@@ -3,6 +3,8 @@ import logging
 
 from bs4 import BeautifulSoup, Tag
 
+from bot.core.scanner.extractor import extract_change_links
+
 
 site_parser_logger = logging.getLogger(__name__)
 site_parser_logger.setLevel(logging.INFO)
@@ -15,32 +17,59 @@ site_parser_logger.addHandler(logging.StreamHandler())
 
 class SiteParser:
     """Scans HTML for <a> tag href with file url
+
+    Attributes:
+        entries (list[tuple[str, str]]): (date YYYY-MM-DD, file url) of every
+            change shedule link in page order
+        file_url (str): URL of the last link
+        date (str): Date of the last link
     """
     url: str
     file_url: str
     date: str
+    entries: list[tuple[str, str]]
+
+    def __init__(self, stream: bool = True) -> None:
+        """
+        Args:
+            stream (bool, optional): Use streaming extractor over the page region,
+                False -- html5lib BeautifulSoup tree of the whole page. Defaults to True.
+        """
+        self.stream = stream
+        self.entries = []
 
     async def parse(self, html_text: str):
-        """Find exactly 
+        """Find all change shedule links
         """
         site_parser_logger.info('Getting started to parse html')
+        if self.stream:
+            links = extract_change_links(html_text)
+        else:
+            links = await self._find_links_soup(html_text)
+
+        self.entries = []
+        for href, text in links:
+            try:
+                date = self._parse_date(text)
+            except (ValueError, IndexError):
+                site_parser_logger.info(f'No date in link text {text!r}, skipped')
+                continue
+            self.entries.append((date, 'http://www.lmk-lipetsk.ru/'+href))
+
+        self.no_url = not self.entries
+        if not self.no_url:
+            self.date, self.file_url = self.entries[-1]
+        site_parser_logger.info(f'html parsed, {len(self.entries)} links found')
+
+    async def _find_links_soup(self, html_text: str) -> list[tuple[str, str]]:
         soup = BeautifulSoup(html_text, features="html5lib")
 
         tags = await self._find_all_h2_tags(soup)
-        h2 = await self._find_h2(tags)
-        self.no_url = False
-        if not h2:
-            self.no_url = True
-            return
-
-        file = h2.find(
-            'a'
-        ).get('href')
-        
-        self.file_url = 'http://www.lmk-lipetsk.ru/'+file
-        self.date = await self.find_date(h2)
-        
-        site_parser_logger.info('html parsed')
+        h2s = await self._find_h2s(tags)
+        return [
+            (h2.find('a').get('href'), h2.find('a').find('span').text)
+            for h2 in h2s
+        ]
 
     async def find_date(self, h2: Tag) -> str:
         text = h2.find(
@@ -49,6 +78,11 @@ class SiteParser:
             'span'
         ).text
 
+        return self._parse_date(text)
+
+    def _parse_date(self, text: str) -> str:
+        """'Изменение занятий на 12.10.2023' -> '2023-10-12'
+        """
         date_text = text.split()[-1]
         date_slices = date_text.split('.')
         date = [int(slice) for slice in date_slices]
@@ -66,8 +100,8 @@ class SiteParser:
         )
         return h2_tags
 
-    async def _find_h2(self, tags: list) -> str:
-        """Find the needed h2 tag with file url and date
+    async def _find_h2s(self, tags: list) -> list:
+        """Find h2 tags with file url and date
         """
         h2s = []
         for h2 in tags:
@@ -77,4 +111,4 @@ class SiteParser:
                 a_span_text = a_spans.text
                 if 'изменение занятий' in a_span_text.lower():
                     h2s.append(h2)
-        return h2s[-1]
\ No newline at end of file
+        return h2s
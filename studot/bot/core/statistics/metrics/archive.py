@@ -0,0 +1,138 @@
+import datetime
+import logging
+import os
+import time
+
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from config import settings
+
+
+archive_logger = logging.getLogger(__name__)
+archive_logger.setLevel(logging.INFO)
+handler = logging.FileHandler(f"logs/MetricsArchive.log", mode='w')
+formatter = logging.Formatter("%(name)s %(asctime)s %(levelname)s %(message)s")
+handler.setFormatter(formatter)
+archive_logger.addHandler(handler)
+archive_logger.addHandler(logging.StreamHandler())
+
+
+# Columns read for stats, partition column is added by the dataset
+STATS_COLUMNS = ['Time', 'Metric', 'Course', 'Group', 'UserId']
+# Seconds for a batch written to the renamed file to end
+ROTATE_GRACE = 2
+
+
+class MetricsArchive:
+    """Metrics of CSV storage in daily parquet partitions:
+    <archive-path>/date=YYYY-MM-DD/part-<ns>.parquet
+
+    rotate() moves rows of metrics.csv to the partitions, CSV storage starts a new file.
+    Stats read only partitions of the date range and only the needed columns.
+    """
+
+    def __init__(self, csv_path: Optional[str] = None, path: Optional[str] = None) -> None:
+        """
+        Args:
+            csv_path (Optional[str], optional): CSV storage file. Defaults to settings.
+            path (Optional[str], optional): Archive folder. Defaults to settings.
+        """
+        self.csv_path = csv_path or settings.metrics_filepath+'.csv'
+        self.path = path or settings.metrics['archive-path']
+        self.partitioning = ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive')
+
+    def rotate(self) -> int:
+        """Blocking, move CSV rows to the archive
+
+        Returns:
+            int: Archived rows
+        """
+        rotating = self.csv_path+'.rotating'
+        # File of a failed rotation is archived first, the live one waits for the next rotation
+        if not os.path.isfile(rotating):
+            if not os.path.isfile(self.csv_path):
+                return 0
+            # Storage opens the file for every batch and creates a new one with header
+            os.replace(self.csv_path, rotating)
+            time.sleep(ROTATE_GRACE)
+
+        df = pd.read_csv(rotating, index_col=0, dtype=str, keep_default_na=False)
+        # Same part name on retry, so a partly written rotation is overwritten, not duplicated
+        part = f'part-{os.stat(rotating).st_mtime_ns}.parquet'
+        for date, day in df.groupby('Date', sort=True):
+            directory = os.path.join(self.path, f'date={date}')
+            os.makedirs(directory, exist_ok=True)
+            table = pa.Table.from_pandas(day.drop(columns=['Date']), preserve_index=False)
+            pq.write_table(table, os.path.join(directory, part), compression='zstd')
+
+        os.remove(rotating)
+        archive_logger.info(f'{len(df)} metric rows archived')
+        return len(df)
+
+    def _read_archive(self, start: datetime.date, end: datetime.date, columns: list[str]) -> Optional[pd.DataFrame]:
+        if not os.path.isdir(self.path):
+            return None
+        dataset = ds.dataset(self.path, format='parquet', partitioning=self.partitioning)
+        if not dataset.files:
+            return None
+        # Partitions out of range are not opened
+        in_range = (ds.field('date') >= start.isoformat()) & (ds.field('date') <= end.isoformat())
+        return dataset.to_table(columns=columns+['date'], filter=in_range).to_pandas()
+
+    def _read_live(self, start: datetime.date, end: datetime.date, columns: list[str]) -> Optional[pd.DataFrame]:
+        """Rows not rotated yet, the file has a day or two of them
+        """
+        if not os.path.isfile(self.csv_path):
+            return None
+        df = pd.read_csv(self.csv_path, usecols=['Date']+columns, dtype=str, keep_default_na=False)
+        df = df.rename(columns={'Date': 'date'})
+        return df[(df['date'] >= start.isoformat()) & (df['date'] <= end.isoformat())]
+
+    def read(self, start: datetime.date, end: datetime.date, columns: list[str]) -> pd.DataFrame:
+        """Metric rows of the dates, both ends included
+
+        Returns:
+            pd.DataFrame: <columns> and date
+        """
+        frames = [
+            frame for frame in (
+                self._read_archive(start, end, columns),
+                self._read_live(start, end, columns)
+            )
+            if frame is not None
+        ]
+        if not frames:
+            return pd.DataFrame(columns=columns+['date'])
+        return pd.concat(frames, ignore_index=True)
+
+    def stats(self, start: datetime.date, end: datetime.date, top_groups: int = 10) -> dict:
+        """Blocking, aggregates of the dates
+
+        Returns:
+            dict: requests -- rows count, users -- unique users,
+                dau -- {date: unique users}, groups -- [(course, group, requests)],
+                peak_hour -- (hour, requests) or None
+        """
+        df = self.read(start, end, STATS_COLUMNS)
+        if df.empty:
+            return {'requests': 0, 'users': 0, 'dau': {}, 'groups': [], 'peak_hour': None}
+
+        dau = df.groupby('date')['UserId'].nunique()
+        groups = df.groupby(['Course', 'Group']).size().sort_values(ascending=False).head(top_groups)
+        hours = df['Time'].str.slice(0, 2).value_counts()
+
+        return {
+            'requests': len(df),
+            'users': df['UserId'].nunique(),
+            'dau': dau.to_dict(),
+            'groups': [(course, group, int(count)) for (course, group), count in groups.items()],
+            'peak_hour': (int(hours.idxmax()), int(hours.max()))
+        }
+
+
+metricsArchive = MetricsArchive()
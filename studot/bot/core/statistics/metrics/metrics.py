@@ -8,6 +8,8 @@ from bot.core.statistics.metrics.metrics_storage import (
     MetricsStorageFactory, 
     IMetricsStorage
 )
+from bot.core.statistics.metrics.writer import BufferedMetricsWriter
+from bot.core.statistics.metrics.prometheus import USER_REQUESTS, bounded
 
 
 """Metrics
@@ -36,6 +38,7 @@ class Metrics:
 
         metrics_logger.info('Getting storage')
         self.storage: IMetricsStorage = MetricsStorageFactory.get_storage(settings.metrics['storage'])
+        self.writer = BufferedMetricsWriter(self.storage)
 
     async def collect(self, metric_name: str, *args) -> None:
         """ONLY with fields in settings.json
@@ -44,9 +47,15 @@ class Metrics:
             metric_name (str): Metric name to store
             args: Metrics that provided in settings.json
         """
-        metrics_logger.info('Collect new metrics')
         await self.export(metric_name, *args)
-        await self.storage.save(metric_name, *args)
+        fields = dict(zip(self.fields, args))
+        USER_REQUESTS.labels(
+            metric=metric_name,
+            social=bounded('social', fields.get('Social')),
+            course=bounded('course', fields.get('Course'))
+        ).inc()
+        # Only appended to the buffer, written in batches by the background task
+        self.writer.add(metric_name, *args)
 
     async def export(self, metric_name: str, *args) -> None:
         await self._create_counter(metric_name, *args)
@@ -60,8 +69,7 @@ class Metrics:
     async def _create_counter(self, metric_name: str, *args) -> None:
         if self.counters.get(metric_name) is None:
             self.counters[metric_name] = Counter(metric_name, "User metric")
-            self.counters[metric_name].inc()
-    
+
 
 
 metrics = Metrics()
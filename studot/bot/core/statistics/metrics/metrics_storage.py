@@ -1,10 +1,16 @@
+import asyncio
 import datetime
 import os.path
 import logging
 
+from typing import Optional
+
 from overrides import override
 
 import pandas as pd
+import pymongo
+from pymongo.errors import CollectionInvalid, OperationFailure
+from motor.motor_asyncio import AsyncIOMotorClient
 
 from config import settings
 from bot.core.statistics.metrics.errors import _StorageTypeError, _StorageFileError
@@ -30,6 +36,23 @@ class IMetricsStorage:
         """BaseMetricsStorage childs must to ovveride this method"""
         ...
 
+    async def save_rows(self, rows: list[list]) -> None:
+        """Batch write of [Date, Time, Metric, *fields] rows.
+        Blocking _save_rows is run in a thread
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._save_rows, rows)
+
+    def _save_rows(self, rows: list[list]) -> None:
+        """Blocking batch write, also used on exit when there is no loop.
+        Childs must to ovveride this method"""
+        ...
+
+    async def summary(self, start: datetime.datetime, end: datetime.datetime) -> Optional[dict]:
+        """Aggregated stats of the period, None if storage can not aggregate
+        """
+        return None
+
 
 class CSVMetricsStorage(IMetricsStorage):
     """
@@ -76,9 +99,10 @@ class CSVMetricsStorage(IMetricsStorage):
             metrics_storage_logger.error('File was not created', exc_info=True)
             raise _StorageFileError(f'Not able to create csv file ({self.filepath})')
 
-    async def _save_df(self, df: pd.DataFrame) -> None:
+    def _save_df(self, df: pd.DataFrame) -> None:
         metrics_storage_logger.info('Saving DataFrame to CSV')
-        df.to_csv(self.filepath, mode='a', header=False)
+        # File is moved away by MetricsArchive.rotate, the new one starts with header
+        df.to_csv(self.filepath, mode='a', header=not os.path.isfile(self.filepath))
         metrics_storage_logger.info('DataFrame is saved')
 
     @override
@@ -90,8 +114,13 @@ class CSVMetricsStorage(IMetricsStorage):
         ]
         metrics_storage_logger.info(f'Got metrics {data}')
 
-        df = pd.DataFrame(data, columns=self.heads)
-        await self._save_df(df)
+        self._save_rows(data)
+
+    @override
+    def _save_rows(self, rows: list[list]) -> None:
+        # Every row had its own DataFrame with index 0, the file keeps that format
+        df = pd.DataFrame(rows, columns=self.heads, index=[0]*len(rows))
+        self._save_df(df)
 
 
 class TextMetricsStorage(CSVMetricsStorage):
@@ -107,10 +136,165 @@ class TextMetricsStorage(CSVMetricsStorage):
         df.to_csv(self.filepath, mode='a', header=False, sep=', ')
 
 
+# Fields stored as time series metadata, documents are bucketed by them
+META_FIELDS = ('Place', 'Course', 'Group')
+
+
 class MongoMetricsStorage(IMetricsStorage):
+    """Metrics in MongoDB time series collection
+
+    Document: time, meta (Metric and META_FIELDS), other metrics fields.
+    Falls back to a regular collection with time index on MongoDB older than 5.0
+    """
+
+    def __init__(self) -> None:
+        self.fields = settings.metrics['fields']
+        self.collection_name = settings.metrics['mongo-collection']
+
+        client = AsyncIOMotorClient(
+            settings.mongo_host,
+            settings.mongo_port
+        )
+
+        self._database = client['main']
+
+        self._metrics = self._database[self.collection_name]
+        self._ready = False
+
+    async def _ensure_collection(self) -> None:
+        if self._ready:
+            return
+        try:
+            await self._database.create_collection(
+                self.collection_name,
+                timeseries={
+                    'timeField': 'time',
+                    'metaField': 'meta',
+                    'granularity': 'seconds'
+                },
+                expireAfterSeconds=settings.metrics['mongo-expire-days']*24*60*60
+            )
+            metrics_storage_logger.info(f'Time series collection {self.collection_name} created')
+        except CollectionInvalid:
+            # Already exists
+            pass
+        except OperationFailure as e:
+            metrics_storage_logger.info(f'Time series are not available, using regular collection -- {e}')
+            await self._metrics.create_index([('time', pymongo.ASCENDING)])
+            await self._metrics.create_index([('meta.Metric', pymongo.ASCENDING), ('time', pymongo.ASCENDING)])
+        self._ready = True
+
+    def _document(self, row: list) -> dict:
+        date, time, metric_name, *args = row
+        moment = datetime.datetime.strptime(f'{date} {time}', '%Y-%m-%d %H:%M:%S')
+        doc = {
+            'time': moment.replace(tzinfo=settings.tz_info).astimezone(datetime.timezone.utc),
+            'meta': {'Metric': metric_name}
+        }
+        for field, value in zip(self.fields, args):
+            if field in META_FIELDS:
+                doc['meta'][field] = value
+            else:
+                doc[field] = value
+        return doc
+
     @override
-    def _save_to_storage(self, metric_name: str, *args) -> None:
-        ...
+    async def save_rows(self, rows: list[list]) -> None:
+        await self._ensure_collection()
+        # Unordered: one bad document does not stop the rest of the batch
+        await self._metrics.insert_many([self._document(row) for row in rows], ordered=False)
+
+    @override
+    async def _save_to_storage(self, metric_name: str, *args) -> None:
+        date = datetime.date.today().strftime('%Y-%m-%d')
+        time = datetime.datetime.now(settings.tz_info).strftime('%H:%M:%S')
+        await self.save_rows([[date, time, metric_name, *args]])
+
+    @override
+    def _save_rows(self, rows: list[list]) -> None:
+        # Only on exit without a loop, motor needs one
+        client = pymongo.MongoClient(settings.mongo_host, settings.mongo_port)
+        try:
+            client['main'][self.collection_name].insert_many(
+                [self._document(row) for row in rows],
+                ordered=False
+            )
+        finally:
+            client.close()
+
+    @override
+    async def summary(self, start: datetime.datetime, end: datetime.datetime) -> dict:
+        """
+        Args:
+            start (datetime.datetime): Period start, aware
+            end (datetime.datetime): Period end, aware
+
+        Returns:
+            dict: metrics -- {metric: count},
+                days -- [(date, metric, count)],
+                users -- unique users count,
+                groups -- [(course, group, count)] of the most active groups
+        """
+        await self._ensure_collection()
+        docs = await self._metrics.aggregate(summary_pipeline(start, end)).to_list(length=1)
+        facets = docs[0] if docs else {}
+
+        return {
+            'metrics': {r['_id']: r['count'] for r in facets.get('metrics', [])},
+            'days': [(r['_id']['day'], r['_id']['metric'], r['count']) for r in facets.get('days', [])],
+            'users': facets['users'][0]['count'] if facets.get('users') else 0,
+            'groups': [(r['_id']['course'], r['_id']['group'], r['count']) for r in facets.get('groups', [])]
+        }
+
+
+def summary_pipeline(start: datetime.datetime, end: datetime.datetime, top_groups: int = 10) -> list[dict]:
+    """One aggregation with a facet for every stat of MongoMetricsStorage.summary
+    """
+    return [
+        {'$match': {'time': {'$gte': start, '$lt': end}}},
+        {'$facet': {
+            'metrics': [
+                {'$group': {'_id': '$meta.Metric', 'count': {'$sum': 1}}},
+                {'$sort': {'count': -1}}
+            ],
+            'days': [
+                {'$group': {
+                    '_id': {
+                        'day': {'$dateToString': {
+                            'format': '%Y-%m-%d',
+                            'date': '$time',
+                            'timezone': _tz_offset()
+                        }},
+                        'metric': '$meta.Metric'
+                    },
+                    'count': {'$sum': 1}
+                }},
+                {'$sort': {'_id.day': 1, 'count': -1}}
+            ],
+            'users': [
+                {'$group': {'_id': '$UserId'}},
+                {'$count': 'count'}
+            ],
+            'groups': [
+                {'$group': {
+                    '_id': {'course': '$meta.Course', 'group': '$meta.Group'},
+                    'count': {'$sum': 1}
+                }},
+                {'$sort': {'count': -1}},
+                {'$limit': top_groups}
+            ]
+        }}
+    ]
+
+
+def _tz_offset() -> str:
+    """settings.tz_info as MongoDB timezone offset, '+03:00'
+    """
+    offset = settings.tz_info.utcoffset(None)
+    minutes = int(offset.total_seconds()) // 60
+    sign = '+' if minutes >= 0 else '-'
+    minutes = abs(minutes)
+    return f'{sign}{minutes // 60:02d}:{minutes % 60:02d}'
 
 
 class MetricsStorageFactory:
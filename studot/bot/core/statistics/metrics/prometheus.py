@@ -0,0 +1,89 @@
+from prometheus_client import Counter, Histogram
+
+from config import settings
+
+
+"""Summary:
+Labelled Prometheus metrics. Label values come either from code
+(metric, method, handler names) or from user data clamped by bounded(),
+so the number of series stays small.
+"""
+
+
+# Label value of everything not in settings.metrics['label-values']
+OTHER = 'other'
+
+HANDLER_BUCKETS = (.01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+DB_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5)
+
+
+USER_REQUESTS = Counter(
+    'user_requests',
+    'User requests by metric name, social network and course',
+    ['metric', 'social', 'course']
+)
+
+SHEDULE_DB_SECONDS = Histogram(
+    'shedule_db_seconds',
+    'SheduleDB call latency',
+    ['method'],
+    buckets=DB_BUCKETS
+)
+
+USERS_DB_SECONDS = Histogram(
+    'users_db_seconds',
+    'UsersDB call latency',
+    ['method'],
+    buckets=DB_BUCKETS
+)
+
+STATE_STORAGE_SECONDS = Histogram(
+    'state_storage_seconds',
+    'Bot state storage call latency',
+    ['platform', 'method'],
+    buckets=DB_BUCKETS
+)
+
+API_REQUEST_SECONDS = Histogram(
+    'api_request_seconds',
+    'Outgoing Telegram and VK API request latency',
+    ['platform', 'method'],
+    buckets=HANDLER_BUCKETS
+)
+
+HANDLER_SECONDS = Histogram(
+    'handler_seconds',
+    'Bot handler latency from update to reply',
+    ['platform', 'handler'],
+    buckets=HANDLER_BUCKETS
+)
+
+HANDLER_DB_SECONDS = Histogram(
+    'handler_db_seconds',
+    'Time of a handler spent in SheduleDB, UsersDB and state storage',
+    ['platform', 'handler'],
+    buckets=HANDLER_BUCKETS
+)
+
+HANDLER_API_SECONDS = Histogram(
+    'handler_api_seconds',
+    'Time of a handler spent in outgoing API requests',
+    ['platform', 'handler'],
+    buckets=HANDLER_BUCKETS
+)
+
+
+def bounded(label: str, value) -> str:
+    """Clamp user data to the allowed values of the label
+
+    Args:
+        label (str): Key of settings.metrics['label-values']
+        value: User value
+
+    Returns:
+        str: Value or OTHER
+    """
+    value = str(value)
+    if value in settings.metrics['label-values'][label]:
+        return value
+    return OTHER
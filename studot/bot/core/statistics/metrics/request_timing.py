@@ -0,0 +1,159 @@
+import contextlib
+import contextvars
+import functools
+import inspect
+import logging
+import time
+
+from typing import Iterable, Optional
+
+from prometheus_client import Histogram
+
+from config import settings
+
+from bot.core.statistics.metrics.prometheus import (
+    HANDLER_SECONDS,
+    HANDLER_DB_SECONDS,
+    HANDLER_API_SECONDS
+)
+
+
+"""Summary:
+Time of one bot request split into DB and outgoing API time.
+Middleware starts RequestTiming for the update, DB classes and API clients
+wrapped by section() add their time to it through a context variable,
+so handlers do not pass anything around.
+"""
+
+
+slow_logger = logging.getLogger(__name__)
+slow_logger.setLevel(logging.INFO)
+handler = logging.FileHandler(f"logs/SlowRequests.log", mode='w')
+formatter = logging.Formatter("%(name)s %(asctime)s %(levelname)s %(message)s")
+handler.setFormatter(formatter)
+slow_logger.addHandler(handler)
+slow_logger.addHandler(logging.StreamHandler())
+
+
+# Sections of request time besides handler code
+SECTIONS = ('db', 'api')
+
+
+class RequestTiming:
+    """Wall time of a request and of its sections.
+    Nested and concurrent calls of one section are counted once:
+    section time goes while at least one call of it is running
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.totals = {kind: 0.0 for kind in SECTIONS}
+        self._running = {kind: 0 for kind in SECTIONS}
+        self._since = {kind: 0.0 for kind in SECTIONS}
+
+    def enter(self, kind: str) -> None:
+        if self._running[kind] == 0:
+            self._since[kind] = time.perf_counter()
+        self._running[kind] += 1
+
+    def exit(self, kind: str) -> None:
+        self._running[kind] -= 1
+        if self._running[kind] == 0:
+            self.totals[kind] += time.perf_counter() - self._since[kind]
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+_current: contextvars.ContextVar[Optional[RequestTiming]] = contextvars.ContextVar('request_timing', default=None)
+
+
+def start_request() -> RequestTiming:
+    """Start timing of the current update, called by middleware before handler
+    """
+    timing = RequestTiming()
+    _current.set(timing)
+    return timing
+
+
+def current_request() -> Optional[RequestTiming]:
+    """Timing started for the current update, if there is one
+    """
+    return _current.get()
+
+
+def finish_request(platform: str, handler_name: str, timing: RequestTiming, detail: str = '') -> None:
+    """Observe request histograms and log it if it is slower than metrics.slow-request
+
+    Args:
+        platform (str): telegram or vk
+        handler_name (str): Handler function name
+        timing (RequestTiming): Timing of start_request
+        detail (str, optional): User and text for the slow log. Defaults to ''.
+    """
+    _current.set(None)
+    total = timing.elapsed()
+    db = timing.totals['db']
+    api = timing.totals['api']
+
+    HANDLER_SECONDS.labels(platform, handler_name).observe(total)
+    HANDLER_DB_SECONDS.labels(platform, handler_name).observe(db)
+    HANDLER_API_SECONDS.labels(platform, handler_name).observe(api)
+
+    threshold = settings.metrics['slow-request']
+    if threshold and total >= threshold:
+        slow_logger.warning(
+            f'{platform} {handler_name} {total:.3f}s (db {db:.3f}s, api {api:.3f}s) {detail}'
+        )
+
+
+@contextlib.contextmanager
+def section(kind: str):
+    """Count the block as <kind> time of the current request, if there is one
+    """
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    timing.enter(kind)
+    try:
+        yield
+    finally:
+        timing.exit(kind)
+
+
+def timed_methods(histogram: Histogram, names: Iterable[str] = (),
+                kind: Optional[str] = None, labels: tuple = ()):
+    """Class decorator, observes latency of coroutine methods
+    in <histogram> labelled by method name
+
+    Args:
+        histogram (Histogram): Histogram with the last label -- method
+        names (Iterable[str], optional): Methods to time, inherited ones too.
+            Defaults to all public coroutine methods of the class
+        kind (Optional[str], optional): Request section the calls belong to. Defaults to None.
+        labels (tuple, optional): Values of the labels before method. Defaults to ().
+    """
+    def decorate(cls):
+        methods = list(names) or [
+            name for name, member in vars(cls).items()
+            if not name.startswith('_') and inspect.iscoroutinefunction(member)
+        ]
+        for name in methods:
+            setattr(cls, name, _timed(getattr(cls, name), histogram.labels(*labels, name), kind))
+        return cls
+    return decorate
+
+
+def _timed(method, child, kind: Optional[str]):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            if kind is None:
+                return await method(*args, **kwargs)
+            with section(kind):
+                return await method(*args, **kwargs)
+        finally:
+            child.observe(time.perf_counter() - start)
+    return wrapper
@@ -0,0 +1,125 @@
+import asyncio
+import atexit
+import collections
+import datetime
+import logging
+
+from typing import Optional
+
+from config import settings
+
+
+metrics_writer_logger = logging.getLogger(__name__)
+metrics_writer_logger.setLevel(logging.INFO)
+handler = logging.FileHandler(f"logs/MetricsWriter.log", mode='w')
+formatter = logging.Formatter("%(name)s %(asctime)s %(levelname)s %(message)s")
+handler.setFormatter(formatter)
+metrics_writer_logger.addHandler(handler)
+metrics_writer_logger.addHandler(logging.StreamHandler())
+
+
+class BufferedMetricsWriter:
+    """Ring buffer of metric rows written to storage in batches
+
+    Request path only appends a row. Background task writes the rows
+    every <flush-interval> seconds or as soon as <batch-size> rows are buffered.
+    If storage is slower than users, the oldest rows are dropped
+    when <buffer-size> rows are waiting.
+
+    Task is started on first add() in the running loop, so every process
+    has its own one. Rows left on loop shutdown or exit are written synchronously.
+    """
+
+    def __init__(self, storage,
+                buffer_size: Optional[int] = None,
+                batch_size: Optional[int] = None,
+                flush_interval: Optional[float] = None) -> None:
+        """
+        Args:
+            storage (IMetricsStorage): Storage with batch save_rows
+            buffer_size (Optional[int], optional): Max buffered rows. Defaults to settings.
+            batch_size (Optional[int], optional): Rows to write at once. Defaults to settings.
+            flush_interval (Optional[float], optional): Seconds between writes. Defaults to settings.
+        """
+        self.storage = storage
+        self.batch_size = batch_size or settings.metrics['batch-size']
+        self.flush_interval = flush_interval or settings.metrics['flush-interval']
+        self._buffer = collections.deque(maxlen=buffer_size or settings.metrics['buffer-size'])
+        self.dropped = 0
+
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        atexit.register(self.flush_sync)
+
+    def add(self, metric_name: str, *args) -> None:
+        """Buffer a metric row, time is taken now
+        """
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        now = datetime.datetime.now(settings.tz_info)
+        self._buffer.append([
+            datetime.date.today().strftime('%Y-%m-%d'),
+            now.strftime('%H:%M:%S'),
+            metric_name,
+            *args
+        ])
+        self._ensure_task()
+        if self._wakeup is not None and len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_task(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop: rows wait for the next add() in a loop or for exit
+            return
+        # Writer may be created before fork, then the task belongs to another loop
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+        finally:
+            self.flush_sync()
+
+    def _take(self) -> list[list]:
+        rows = []
+        while self._buffer:
+            rows.append(self._buffer.popleft())
+        return rows
+
+    async def flush(self) -> None:
+        """Write buffered rows by batches, file storages write in a thread
+        """
+        if self.dropped:
+            metrics_writer_logger.warning(f'{self.dropped} metric rows dropped, buffer is full')
+            self.dropped = 0
+
+        rows = self._take()
+        if not rows:
+            return
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start+self.batch_size]
+            try:
+                await self.storage.save_rows(batch)
+            except Exception:
+                metrics_writer_logger.error(f'{len(batch)} metric rows were not saved', exc_info=True)
+        metrics_writer_logger.info(f'{len(rows)} metric rows flushed')
+
+    def flush_sync(self) -> None:
+        rows = self._take()
+        if not rows:
+            return
+        try:
+            self.storage._save_rows(rows)
+        except Exception:
+            metrics_writer_logger.error(f'{len(rows)} metric rows were not saved', exc_info=True)
@@ -21,6 +21,14 @@ class CollectorProxy_SheduleDB:
         await metrics.collect('get_week_shedule', *userInfo.list())
         return await self.db.get_next_week_shedule(userInfo)
 
+    async def get_week_text(self, userInfo: UserInfo) -> str:
+        await metrics.collect('get_week_shedule', *userInfo.list())
+        return await self.db.get_week_text(userInfo)
+
+    async def get_next_week_text(self, userInfo: UserInfo) -> str:
+        await metrics.collect('get_week_shedule', *userInfo.list())
+        return await self.db.get_next_week_text(userInfo)
+
     async def save_shedule(self, placeShedule: dict, place: str, weekType: Literal[0, 1]) -> None:
         return await self.db.save_shedule(placeShedule, place, weekType)
 
@@ -28,10 +36,18 @@ class CollectorProxy_SheduleDB:
         await metrics.collect('get_day_shedule', *userInfo.list())
         return await self.db.get_day_shedule(day, userInfo)
 
+    async def get_day_text(self, day: str, userInfo: UserInfo) -> str:
+        await metrics.collect('get_day_shedule', *userInfo.list())
+        return await self.db.get_day_text(day, userInfo)
+
     async def get_change_shedule(self, date: datetime.date, userInfo: UserInfo) -> DayShedule:
         await metrics.collect('get_change_shedule', *userInfo.list())
         return await self.db.get_change_shedule(date, userInfo)
     
+    async def get_change_text(self, date: datetime.date, userInfo: UserInfo) -> str:
+        await metrics.collect('get_change_shedule', *userInfo.list())
+        return await self.db.get_change_text(date, userInfo)
+
     async def get_combined_shedule(self, userInfo: UserInfo) -> DayShedule:
         await metrics.collect('get_combined_shedule', *userInfo.list())
         return await self.db.get_combined_shedule(userInfo)
@@ -44,7 +60,7 @@ class CollectorProxy_SheduleDB:
         await metrics.collect('get_week_color', *userInfo.list())
         return await self.db.get_week_color()
 
-    async def save_change_shedule(self, change: dict, date: str):
+    async def save_change_shedule(self, change: dict, date: str) -> list[tuple[str, str]]:
         return await self.db.save_change_shedule(change, date)
 
 
@@ -0,0 +1,98 @@
+import time
+import logging
+
+from typing import Optional, Union
+
+
+shedule_cache_logger = logging.getLogger(__name__)
+shedule_cache_logger.setLevel(logging.INFO)
+handler = logging.FileHandler(f"logs/SheduleCache.log", mode='w')
+formatter = logging.Formatter("%(name)s %(asctime)s %(levelname)s %(message)s")
+handler.setFormatter(formatter)
+shedule_cache_logger.addHandler(handler)
+shedule_cache_logger.addHandler(logging.StreamHandler())
+
+
+class CacheEntry:
+    """Decoded shedule data of one document version
+
+    Attributes:
+        version (Optional[int]): Document version field at the moment of load.
+            For change shedule None means there is no document for the date
+        groups (dict): (course, group) -- place document projected to the group
+        days (dict): Group shedules from the group index.
+            (course, group, day) -- subjects of the day,
+            (course, group, None) -- all days of the group
+        texts (dict): Rendered messages.
+            (course, group, day) -- day shedule message,
+            (course, group, None) -- week shedule message,
+            (course, group) -- change shedule message,
+            (course, group, None) -- change shedule without header, for notifications
+        checked_at (float): Monotonic time of the last version check
+    """
+
+    version: Optional[int]
+    groups: dict
+    days: dict
+    texts: dict
+    checked_at: float
+
+    def __init__(self, version: Optional[int]) -> None:
+        self.version = version
+        self.groups = {}
+        self.days = {}
+        self.texts = {}
+        self.checked_at = time.monotonic()
+
+    def fresh(self, revalidate_interval: int) -> bool:
+        return time.monotonic() - self.checked_at < revalidate_interval
+
+    def touch(self) -> None:
+        self.checked_at = time.monotonic()
+
+
+class SheduleCache:
+    """In-process cache of shedule documents
+
+    Entries are keyed by (place, key) where key is
+    week color (0, 1) for main shedule and
+    date string (YYYY-MM-DD) for change shedule.
+
+    Entries are trusted for <revalidate_interval> seconds,
+    after that SheduleDB must compare the stored version with the database one.
+    """
+
+    def __init__(self, revalidate_interval: int) -> None:
+        self.revalidate_interval = revalidate_interval
+        self._entries: dict[tuple[str, Union[int, str]], CacheEntry] = {}
+
+    def get(self, place: str, key: Union[int, str]) -> Optional[CacheEntry]:
+        return self._entries.get((place, key))
+
+    def put(self, place: str, key: Union[int, str], version: Optional[int]) -> CacheEntry:
+        """Create empty entry for a new document version
+        """
+        entry = CacheEntry(version)
+        self._entries[(place, key)] = entry
+        return entry
+
+    def invalidate(self, place: Optional[str] = None,
+                key: Union[int, str, None] = None) -> None:
+        """Drop cached documents. Without arguments drops everything
+        """
+        shedule_cache_logger.info(f'Invalidating cache (place={place}, key={key})')
+        for entry_key in list(self._entries.keys()):
+            entry_place, entry_doc_key = entry_key
+            if place is not None and entry_place != place:
+                continue
+            if key is not None and entry_doc_key != key:
+                continue
+            self._entries.pop(entry_key)
+
+    def invalidate_changes(self) -> None:
+        """Drop all change shedule entries
+        """
+        shedule_cache_logger.info('Invalidating change shedule cache')
+        for entry_key in list(self._entries.keys()):
+            if isinstance(entry_key[1], str):
+                self._entries.pop(entry_key)
@@ -0,0 +1,64 @@
+from typing import Literal
+
+
+"""Group shedule index
+Flattened copy of white/green shedule documents.
+One document per (place, week color, course, group, day),
+so readers fetch a single day instead of the whole place document.
+
+{
+    "Место": "ЛМК",
+    "Неделя": 0,
+    "Курс": "1",
+    "Группа": "МЧМ 22-1",
+    "День": "Понедельник",
+    "Номер": 0,
+    "Пары": {
+        "1": {"Пара": "Математика", "Время": ["8:00", "9:30"]}
+    },
+    "version": 1677000000000000000
+}
+"""
+
+
+GROUP_SHEDULE_COLLECTION = 'group-shedule'
+
+GROUP_SHEDULE_INDEX = [
+    ('Место', 1),
+    ('Неделя', 1),
+    ('Курс', 1),
+    ('Группа', 1),
+    ('День', 1)
+]
+
+
+def flatten_place_shedule(placeShedule: dict, place: str,
+                        weekType: Literal[0, 1], version: int) -> list[dict]:
+    """Split place shedule document to group day documents
+
+    Args:
+        placeShedule (dict): Shedule document with "Курс" field
+        place (str): Place name
+        weekType (Literal[0, 1]): 0 -- White color, 1 -- Green color
+        version (int): Version of the place document
+
+    Returns:
+        list[dict]: Documents for group shedule index
+    """
+    docs = []
+    for course, groups in placeShedule['Курс'].items():
+        for group, days in groups.items():
+            for number, (day, subjects) in enumerate(days.items()):
+                docs.append(
+                    {
+                        "Место": place,
+                        "Неделя": weekType,
+                        "Курс": course,
+                        "Группа": group,
+                        "День": day,
+                        "Номер": number,
+                        "Пары": subjects,
+                        "version": version
+                    }
+                )
+    return docs
@@ -0,0 +1,351 @@
+import datetime
+import logging
+
+from typing import Iterable, Optional
+
+import pymongo
+from pymongo import UpdateMany
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from config import settings
+
+from bot.core.utils.db.projection import projection
+from bot.core.utils.types.userinfo import UserInfo
+
+
+notify_queue_logger = logging.getLogger(__name__)
+notify_queue_logger.setLevel(logging.INFO)
+handler = logging.FileHandler(f"logs/NotifyQueueDB.log", mode='w')
+formatter = logging.Formatter("%(name)s %(asctime)s %(levelname)s %(message)s")
+handler.setFormatter(formatter)
+notify_queue_logger.addHandler(handler)
+notify_queue_logger.addHandler(logging.StreamHandler())
+
+
+class JOB_STATUS:
+    CREATING = 'creating' # Deliveries are being inserted
+    PENDING = 'pending'
+    DONE = 'done'
+    INCOMPLETE = 'incomplete' # Creation was interrupted, deliveries are cancelled
+
+
+class DELIVERY_STATUS:
+    PENDING = 'pending'
+    SENDING = 'sending' # Claimed by a worker
+    SENT = 'sent'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled' # Job creation was interrupted
+
+
+# Delivery fields enough to build UserInfo
+DELIVERY_RECIPIENT_FIELDS = ('userID', 'social', 'course', 'group', 'place')
+# Seconds to keep heartbeats of stopped queue owners
+OWNERS_TTL = 24*60*60
+
+
+class NotifyQueueDB:
+    """Durable broadcast queue
+
+    notify_jobs -- one document per broadcast with texts deduplicated by key,
+    notify_deliveries -- one document per recipient with delivery status,
+    notify_owners -- heartbeat of every NotifyQueue instance (owner).
+
+    Jobs and claims store their owner. Several processes share the queue,
+    so only jobs and claims of owners without a recent heartbeat are recovered.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None) -> None:
+        client = AsyncIOMotorClient(
+            settings.mongo_host,
+            settings.mongo_port
+        )
+
+        self._database = client['main']
+
+        self._jobs = self._database['notify_jobs']
+        self._deliveries = self._database['notify_deliveries']
+        self._owners = self._database['notify_owners']
+
+        self.batch_size = batch_size or settings.notifier['queue-batch']
+        self._indexed = False
+
+    async def _ensure_indexes(self) -> None:
+        if self._indexed:
+            return
+        await self._deliveries.create_index(
+            [('job_id', pymongo.ASCENDING), ('status', pymongo.ASCENDING)]
+        )
+        await self._deliveries.create_index(
+            [('status', pymongo.ASCENDING), ('claimed_at', pymongo.ASCENDING)]
+        )
+        await self._jobs.create_index('status')
+        await self._owners.create_index('seen_at', expireAfterSeconds=OWNERS_TTL)
+        self._indexed = True
+
+    async def heartbeat(self, owner: str) -> None:
+        """Mark <owner> alive
+        """
+        await self._ensure_indexes()
+        await self._owners.update_one(
+            {'_id': owner},
+            {'$set': {'seen_at': datetime.datetime.utcnow()}},
+            upsert=True
+        )
+
+    async def _live_owners(self, lease: int) -> list[str]:
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=lease)
+        return [
+            r['_id']
+            async for r in self._owners.find({'seen_at': {'$gte': cutoff}}, projection(['_id']))
+        ]
+
+    async def create_job(self, kind: str, messages: Iterable[tuple[UserInfo, str]],
+                owner: Optional[str] = None) -> ObjectId:
+        """Store broadcast and all its deliveries
+
+        Args:
+            kind (str): Broadcast name, only for logs
+            messages (Iterable[tuple[UserInfo, str]]): (user, text) pairs
+            owner (Optional[str]): Queue instance creating the job
+
+        Returns:
+            ObjectId: Job id
+        """
+        await self._ensure_indexes()
+
+        job_id = ObjectId()
+        texts = {}
+        deliveries = []
+        for userInfo, text in messages:
+            key = texts.setdefault(text, str(len(texts)))
+            deliveries.append(
+                {
+                    'job_id': job_id,
+                    **{field: getattr(userInfo, field) for field in DELIVERY_RECIPIENT_FIELDS},
+                    'text': key,
+                    'status': DELIVERY_STATUS.PENDING,
+                    'worker': None,
+                    'owner': None,
+                    'claimed_at': None
+                }
+            )
+
+        await self._jobs.insert_one(
+            {
+                '_id': job_id,
+                'kind': kind,
+                'owner': owner,
+                'status': JOB_STATUS.CREATING,
+                'created': datetime.datetime.utcnow(),
+                'total': len(deliveries),
+                'texts': {key: text for text, key in texts.items()}
+            }
+        )
+        for i in range(0, len(deliveries), self.batch_size):
+            await self._deliveries.insert_many(
+                deliveries[i:i+self.batch_size],
+                ordered=False
+            )
+        await self._jobs.update_one(
+            {'_id': job_id},
+            {'$set': {'status': JOB_STATUS.PENDING}}
+        )
+
+        notify_queue_logger.info(f'Job {job_id} ({kind}) created with {len(deliveries)} deliveries')
+        return job_id
+
+    async def get_texts(self, job_id: ObjectId) -> dict:
+        r = await self._jobs.find_one({'_id': job_id}, projection(['texts']))
+        if r is None:
+            return {}
+        return r['texts']
+
+    async def claim(self, worker: str, owner: Optional[str] = None,
+                job_id: Optional[ObjectId] = None,
+                limit: Optional[int] = None) -> list[dict]:
+        """Mark up to <limit> pending deliveries as sending by <worker>
+
+        Args:
+            worker (str): Unique worker token
+            owner (Optional[str]): Queue instance of the worker
+            job_id (Optional[ObjectId]): Claim only deliveries of the job
+            limit (Optional[int]): Defaults to batch size
+
+        Returns:
+            list[dict]: Claimed deliveries
+        """
+        filter = {'status': DELIVERY_STATUS.PENDING}
+        if job_id is not None:
+            filter['job_id'] = job_id
+
+        ids = [
+            r['_id']
+            async for r in self._deliveries.find(filter, projection(['_id'])).limit(limit or self.batch_size)
+        ]
+        if not ids:
+            return []
+
+        # Other workers may claim the same ids, only still pending ones are taken
+        await self._deliveries.update_many(
+            {'_id': {'$in': ids}, 'status': DELIVERY_STATUS.PENDING},
+            {
+                '$set': {
+                    'status': DELIVERY_STATUS.SENDING,
+                    'worker': worker,
+                    'owner': owner,
+                    'claimed_at': datetime.datetime.utcnow()
+                }
+            }
+        )
+        return [
+            r
+            async for r in self._deliveries.find(
+                {'_id': {'$in': ids}, 'worker': worker, 'status': DELIVERY_STATUS.SENDING},
+                projection(['_id', 'job_id', 'text', *DELIVERY_RECIPIENT_FIELDS])
+            )
+        ]
+
+    async def ack(self, sent: list[ObjectId], failed: list[ObjectId]) -> None:
+        """Store results of a claimed batch with one request
+        """
+        requests = []
+        if sent:
+            requests.append(
+                UpdateMany({'_id': {'$in': sent}}, {'$set': {'status': DELIVERY_STATUS.SENT}})
+            )
+        if failed:
+            requests.append(
+                UpdateMany({'_id': {'$in': failed}}, {'$set': {'status': DELIVERY_STATUS.FAILED}})
+            )
+        if requests:
+            await self._deliveries.bulk_write(requests, ordered=False)
+
+    async def renew(self, worker: str, ids: list[ObjectId]) -> None:
+        """Extend the lease of deliveries <worker> is still sending
+        """
+        await self._deliveries.update_many(
+            {'_id': {'$in': ids}, 'worker': worker, 'status': DELIVERY_STATUS.SENDING},
+            {'$set': {'claimed_at': datetime.datetime.utcnow()}}
+        )
+
+    async def release_stale(self, lease: int) -> int:
+        """Return deliveries claimed more than <lease> seconds ago to pending.
+        Workers renew the lease while sending, so their worker has died
+        before acknowledging them
+
+        Returns:
+            int: Released deliveries count
+        """
+        r = await self._deliveries.update_many(
+            {
+                'status': DELIVERY_STATUS.SENDING,
+                'claimed_at': {'$lt': datetime.datetime.utcnow() - datetime.timedelta(seconds=lease)}
+            },
+            {'$set': {'status': DELIVERY_STATUS.PENDING, 'worker': None, 'owner': None}}
+        )
+        if r.modified_count:
+            notify_queue_logger.info(f'Released {r.modified_count} stale deliveries')
+        return r.modified_count
+
+    async def release_orphaned(self, lease: int) -> int:
+        """Return deliveries claimed by owners without heartbeat
+        for <lease> seconds to pending, whatever their claim time is
+
+        Returns:
+            int: Released deliveries count
+        """
+        live = await self._live_owners(lease)
+        r = await self._deliveries.update_many(
+            {'status': DELIVERY_STATUS.SENDING, 'owner': {'$nin': live}},
+            {'$set': {'status': DELIVERY_STATUS.PENDING, 'worker': None, 'owner': None}}
+        )
+        if r.modified_count:
+            notify_queue_logger.info(f'Released {r.modified_count} deliveries of stopped owners')
+        return r.modified_count
+
+    async def orphaned_jobs(self, lease: int) -> list[ObjectId]:
+        """Pending jobs of owners without heartbeat for <lease> seconds
+        """
+        live = await self._live_owners(lease)
+        return [
+            r['_id']
+            async for r in self._jobs.find(
+                {'status': JOB_STATUS.PENDING, 'owner': {'$nin': live}},
+                projection(['_id'])
+            )
+        ]
+
+    async def interrupted_jobs(self, lease: int) -> list[dict]:
+        """Jobs being created by owners without heartbeat for <lease> seconds
+
+        Returns:
+            list[dict]: _id, kind, total and created of the jobs
+        """
+        live = await self._live_owners(lease)
+        return [
+            r
+            async for r in self._jobs.find(
+                {'status': JOB_STATUS.CREATING, 'owner': {'$nin': live}},
+                projection(['_id', 'kind', 'total', 'created'])
+            )
+        ]
+
+    async def abort_job(self, job_id: ObjectId) -> int:
+        """Mark interrupted job incomplete and cancel its inserted deliveries,
+        so only a part of recipients does not get the broadcast
+
+        Returns:
+            int: Cancelled deliveries count
+        """
+        r = await self._deliveries.update_many(
+            {'job_id': job_id, 'status': {'$in': [DELIVERY_STATUS.PENDING, DELIVERY_STATUS.SENDING]}},
+            {'$set': {'status': DELIVERY_STATUS.CANCELLED, 'worker': None}}
+        )
+        await self._jobs.update_one(
+            {'_id': job_id},
+            {
+                '$set': {
+                    'status': JOB_STATUS.INCOMPLETE,
+                    'cancelled': r.modified_count,
+                    'finished': datetime.datetime.utcnow()
+                }
+            }
+        )
+        notify_queue_logger.warning(f'Job {job_id} is incomplete, {r.modified_count} deliveries cancelled')
+        return r.modified_count
+
+    async def finish_job(self, job_id: ObjectId) -> bool:
+        """Mark job done if all its deliveries are sent or failed
+
+        Returns:
+            bool: Is job done
+        """
+        counts = {}
+        async for r in self._deliveries.aggregate(
+            [
+                {'$match': {'job_id': job_id}},
+                {'$group': {'_id': '$status', 'count': {'$sum': 1}}}
+            ]
+        ):
+            counts[r['_id']] = r['count']
+
+        if counts.get(DELIVERY_STATUS.PENDING) or counts.get(DELIVERY_STATUS.SENDING):
+            return False
+
+        await self._jobs.update_one(
+            {'_id': job_id},
+            {
+                '$set': {
+                    'status': JOB_STATUS.DONE,
+                    'sent': counts.get(DELIVERY_STATUS.SENT, 0),
+                    'failed': counts.get(DELIVERY_STATUS.FAILED, 0),
+                    'finished': datetime.datetime.utcnow()
+                }
+            }
+        )
+        notify_queue_logger.info(f'Job {job_id} is done {counts}')
+        return True
+
+
+notifyQueueDB = NotifyQueueDB()
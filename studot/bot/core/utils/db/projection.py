@@ -0,0 +1,27 @@
+from typing import Iterable
+
+
+def projection(fields: Iterable[str]) -> dict:
+    """Build MongoDB projection that returns only <fields>
+
+    Args:
+        fields (Iterable[str]): Field names or dotted paths
+
+    Returns:
+        dict: Projection without _id, unless it is asked
+    """
+    fields = list(fields)
+    proj = {field: 1 for field in fields}
+    if '_id' not in proj:
+        proj['_id'] = 0
+    return proj
+
+
+def safe_path(*keys: str) -> bool:
+    """Check if keys can be joined to a dotted projection path.
+    Group names from users may contain dots or start with $
+    """
+    for key in keys:
+        if '.' in key or key.startswith('$'):
+            return False
+    return True
@@ -0,0 +1,75 @@
+import datetime
+
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from config import settings
+
+from bot.core.utils.db.projection import projection
+
+
+class ScannerSeenDB:
+    """Change shedule files found by Scanner, one document per file url
+
+    Document: url, date, hash (sha256 of the processed content,
+    None if the file was skipped), etag, last_modified, seen_at
+    """
+
+    def __init__(self) -> None:
+        client = AsyncIOMotorClient(
+            settings.mongo_host,
+            settings.mongo_port
+        )
+
+        self._database = client['main']
+
+        self._seen = self._database['scanner_seen']
+        self._indexed = False
+
+    async def _ensure_indexes(self) -> None:
+        if self._indexed:
+            return
+        await self._seen.create_index('url', unique=True)
+        await self._seen.create_index('hash')
+        self._indexed = True
+
+    async def get_files(self, urls: list[str]) -> dict[str, dict]:
+        """Returns:
+            dict[str, dict]: url -- seen file document
+        """
+        await self._ensure_indexes()
+        return {
+            r['url']: r
+            async for r in self._seen.find(
+                {'url': {'$in': urls}},
+                projection(['url', 'hash', 'etag', 'last_modified'])
+            )
+        }
+
+    async def has_hash(self, digest: str) -> bool:
+        r = await self._seen.find_one({'hash': digest}, projection(['_id']))
+        return r is not None
+
+    async def mark(self, url: str, date: str,
+                digest: Optional[str] = None,
+                etag: Optional[str] = None,
+                last_modified: Optional[str] = None) -> None:
+        fields = {
+            'url': url,
+            'date': date,
+            'etag': etag,
+            'last_modified': last_modified,
+            'seen_at': datetime.datetime.utcnow()
+        }
+        # Content hash is kept when only validators are updated
+        if digest is not None:
+            fields['hash'] = digest
+        await self._seen.update_one(
+            {'url': url},
+            {'$set': fields},
+            upsert=True
+        )
+
+
+scannerSeenDB = ScannerSeenDB()
@@ -0,0 +1,109 @@
+import datetime
+
+import pymongo
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from config import settings
+
+
+# Seconds to keep run documents
+RUNS_TTL = 14*24*60*60
+
+
+class SchedulerRunsDB:
+    """Runs of scheduled jobs, one document per (job, date, wave).
+    Unique index makes a run claimable only once by any process
+    """
+
+    def __init__(self) -> None:
+        client = AsyncIOMotorClient(
+            settings.mongo_host,
+            settings.mongo_port
+        )
+
+        self._database = client['main']
+
+        self._runs = self._database['scheduler_runs']
+        self._indexed = False
+
+    async def _ensure_indexes(self) -> None:
+        if self._indexed:
+            return
+        await self._runs.create_index(
+            [
+                ('job', pymongo.ASCENDING),
+                ('date', pymongo.ASCENDING),
+                ('wave', pymongo.ASCENDING)
+            ],
+            unique=True
+        )
+        # Minute jobs make a run per minute, old runs are not needed
+        await self._runs.create_index('started', expireAfterSeconds=RUNS_TTL)
+        self._indexed = True
+
+    async def claim(self, job: str, date: datetime.date, wave: int) -> bool:
+        """Returns:
+            bool: True if the run was not claimed before
+        """
+        await self._ensure_indexes()
+        try:
+            await self._runs.insert_one(
+                {
+                    'job': job,
+                    'date': date.strftime('%Y-%m-%d'),
+                    'wave': wave,
+                    'status': 'running',
+                    'started': datetime.datetime.utcnow()
+                }
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def has_runs(self, job: str) -> bool:
+        """Returns:
+            bool: True if the job was run before (within RUNS_TTL)
+        """
+        await self._ensure_indexes()
+        return await self._runs.find_one({'job': job}, {'_id': 1}) is not None
+
+    async def seed(self, job: str, runs: list[tuple[datetime.date, int]]) -> None:
+        """Store runs as skipped, so they are never claimed
+        """
+        if not runs:
+            return
+        await self._ensure_indexes()
+        now = datetime.datetime.utcnow()
+        try:
+            await self._runs.insert_many(
+                [
+                    {
+                        'job': job,
+                        'date': date.strftime('%Y-%m-%d'),
+                        'wave': wave,
+                        'status': 'skipped',
+                        'started': now
+                    }
+                    for date, wave in runs
+                ],
+                ordered=False
+            )
+        except BulkWriteError:
+            # Some runs are claimed by another process
+            pass
+
+    async def finish(self, job: str, date: datetime.date, wave: int, error: str = None) -> None:
+        await self._runs.update_one(
+            {'job': job, 'date': date.strftime('%Y-%m-%d'), 'wave': wave},
+            {
+                '$set': {
+                    'status': 'failed' if error else 'done',
+                    'error': error,
+                    'finished': datetime.datetime.utcnow()
+                }
+            }
+        )
+
+
+schedulerRunsDB = SchedulerRunsDB()
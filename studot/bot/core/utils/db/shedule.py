@@ -1,19 +1,36 @@
+import asyncio
 import datetime
+import hashlib
+import json
 import logging
+import time
 
-from typing import Literal, Union
+from typing import Literal, Optional, Union
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure
 
 from config import settings
 
+from bot.core.statistics.metrics.metrics import metrics
+from bot.core.statistics.metrics.prometheus import SHEDULE_DB_SECONDS
+from bot.core.statistics.metrics.request_timing import timed_methods
+from bot.core.utils.db.cache import SheduleCache, CacheEntry
+from bot.core.utils.db.projection import projection, safe_path
+from bot.core.utils.db.group_index import (
+    GROUP_SHEDULE_COLLECTION,
+    GROUP_SHEDULE_INDEX,
+    flatten_place_shedule
+)
 from bot.core.utils.types.userinfo import UserInfo
 from bot.core.utils.types.shedule import (
     WeekShedule, 
     WeekSheduleFactory, 
     DayShedule, 
     DaySheduleFactory,
-    SHEDULE_DAY
+    Subject,
+    SHEDULE_DAY,
+    SHEDULE_TIME
 )
 
 
@@ -26,6 +43,7 @@ shedule_db_logger.addHandler(handler)
 shedule_db_logger.addHandler(logging.StreamHandler())
 
 
+@timed_methods(SHEDULE_DB_SECONDS, kind='db')
 class SheduleDB:
     def __init__(self) -> None:
         shedule_db_logger.info('Initiating MongoDB SHEDULE client')
@@ -40,6 +58,10 @@ class SheduleDB:
 
         self._change_shedule = self._database['change_shedule']
         self._combined_shedule = self._database['combined_shedule']
+        self._group_shedule = self._database[GROUP_SHEDULE_COLLECTION]
+
+        self._cache = SheduleCache(settings.shedule_cache['revalidate-interval'])
+        self._watcher = None
 
         shedule_db_logger.info('SHEDULE Client is ready')
 
@@ -61,6 +83,181 @@ class SheduleDB:
             return self._database['white-shedule']
         return self._database['green-shedule']
 
+    async def _get_cache_entry(self, place: str, week_type: Literal[0, 1]) -> CacheEntry:
+        """Get cache entry of place shedule.
+        Entry is revalidated by place document version field
+        if it was not checked for revalidate-interval seconds
+
+        Args:
+            place (str): Place name
+            week_type (Literal[0, 1]): 0 -- White color, 1 -- Green color
+
+        Returns:
+            CacheEntry: Entry for the current document version
+        """
+        self._start_watcher()
+
+        entry = self._cache.get(place, week_type)
+        if entry is not None and entry.fresh(self._cache.revalidate_interval):
+            return entry
+
+        shedule_collection = await self._get_shedule_collection(week_type=week_type)
+        r = await shedule_collection.find_one(
+            {'Место': place},
+            projection(['version'])
+        )
+        version = r.get('version') if r is not None else None
+
+        if entry is not None and entry.version == version:
+            entry.touch()
+            return entry
+
+        return self._cache.put(place, week_type, version)
+
+    async def _get_place_group(self, userInfo: UserInfo, week_type: Literal[0, 1]) -> dict:
+        """Get place shedule document projected to the user group
+
+        Args:
+            userInfo (UserInfo): User to get group from
+            week_type (Literal[0, 1]): 0 -- White color, 1 -- Green color
+
+        Returns:
+            dict: Place shedule document with only "Курс.<course>.<group>" field
+        """
+        entry = await self._get_cache_entry(userInfo.place, week_type)
+        key = (userInfo.course, userInfo.group)
+        if key in entry.groups:
+            await metrics.export('shedule_cache_hit')
+            return entry.groups[key]
+
+        await metrics.export('shedule_cache_miss')
+        if safe_path(userInfo.course, userInfo.group):
+            path = f'Курс.{userInfo.course}.{userInfo.group}'
+        else:
+            path = 'Курс'
+
+        shedule_collection = await self._get_shedule_collection(week_type=week_type)
+        doc = await shedule_collection.find_one(
+            {'Место': userInfo.place},
+            projection([path])
+        )
+        entry.groups[key] = doc
+        return doc
+
+    async def _get_group_day(self, userInfo: UserInfo, week_type: Literal[0, 1], day: str) -> Union[dict, None]:
+        """Get subjects of the group day from group index
+
+        Returns:
+            Union[dict, None]: Subjects dict or None if there is no such day in index
+        """
+        entry = await self._get_cache_entry(userInfo.place, week_type)
+        key = (userInfo.course, userInfo.group, day)
+        if key in entry.days:
+            await metrics.export('shedule_cache_hit')
+            return entry.days[key]
+
+        await metrics.export('shedule_cache_miss')
+        r = await self._group_shedule.find_one(
+            {
+                'Место': userInfo.place,
+                'Неделя': week_type,
+                'Курс': userInfo.course,
+                'Группа': userInfo.group,
+                'День': day
+            },
+            projection(['Пары'])
+        )
+        subjects = r['Пары'] if r is not None else None
+        entry.days[key] = subjects
+        return subjects
+
+    async def _get_group_week(self, userInfo: UserInfo, week_type: Literal[0, 1]) -> dict:
+        """Get all days of the group from group index
+
+        Returns:
+            dict: Days dict in week order, empty if group is not in index
+        """
+        entry = await self._get_cache_entry(userInfo.place, week_type)
+        key = (userInfo.course, userInfo.group, None)
+        if key in entry.days:
+            await metrics.export('shedule_cache_hit')
+            return entry.days[key]
+
+        await metrics.export('shedule_cache_miss')
+        cursor = self._group_shedule.find(
+            {
+                'Место': userInfo.place,
+                'Неделя': week_type,
+                'Курс': userInfo.course,
+                'Группа': userInfo.group
+            },
+            projection(['День', 'Пары'])
+        ).sort('Номер', 1)
+        week = {}
+        async for r in cursor:
+            week[r['День']] = r['Пары']
+        entry.days[key] = week
+        return week
+
+    def _start_watcher(self) -> None:
+        if self._watcher is not None or not settings.shedule_cache['change-stream']:
+            return
+        self._watcher = asyncio.get_running_loop().create_task(self._watch_changes())
+
+    async def _watch_changes(self) -> None:
+        """Invalidate cache on every write to shedule collections.
+        Writes of this process are skipped, their entry is already pre-rendered
+        with the same version. Change streams are available only on replica set,
+        on standalone server cache relies on version checks
+        """
+        pipeline = [
+            {'$match': {'ns.coll': {'$in': ['white-shedule', 'green-shedule', 'change_shedule']}}},
+            # Only key fields of the written document, not the whole shedule
+            {'$project': {
+                'ns': 1,
+                'fullDocument.Место': 1,
+                'fullDocument.Дата': 1,
+                'fullDocument.version': 1
+            }}
+        ]
+        try:
+            async with self._database.watch(pipeline, full_document='updateLookup') as stream:
+                shedule_db_logger.info('Watching shedule changes')
+                async for change in stream:
+                    self._on_shedule_write(change['ns']['coll'], change.get('fullDocument'))
+        except OperationFailure as e:
+            shedule_db_logger.info(f'Change stream is not available, using version checks -- {e}')
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Next cache access starts a new watcher, until then versions are checked
+            shedule_db_logger.error(f'Change stream is closed -- {e}', exc_info=True)
+            self._watcher = None
+
+    def _on_shedule_write(self, coll: str, doc: Union[dict, None]) -> None:
+        """Invalidate cache entry of the written document.
+        <doc> is None for deletes, then every entry of the collection is dropped
+        """
+        if coll == 'change_shedule':
+            key = doc.get('Дата') if doc is not None else None
+            version = doc.get('version', 0) if doc is not None else None
+        else:
+            key = 0 if coll == 'white-shedule' else 1
+            version = doc.get('version') if doc is not None else None
+
+        if doc is None or key is None:
+            if coll == 'change_shedule':
+                self._cache.invalidate_changes()
+            else:
+                self._cache.invalidate(key=key)
+            return
+
+        entry = self._cache.get(doc.get('Место'), key)
+        if entry is not None and entry.version == version:
+            # Own write, entry is pre-rendered
+            return
+        self._cache.invalidate(place=doc.get('Место'), key=key)
+
     async def get_rings(self):
         rings = [
             'Обычные дни:',
@@ -106,41 +303,60 @@ class SheduleDB:
             # print('зеленая')
             return 1
 
-    async def get_week_shedule(self, userInfo: UserInfo) -> WeekShedule:
-        shedule_db_logger.info('Getting week shedule')
-
-        shedule_collection = await self._get_shedule_collection()
+    async def _get_week_shedule(self, userInfo: UserInfo, week_type: Literal[0, 1]) -> WeekShedule:
+        shedule_dict = await self._get_group_week(userInfo, week_type)
+        if not shedule_dict:
+            # Group is not in index, look into the place document
+            doc = await self._get_place_group(userInfo, week_type)
+            shedule_dict = doc['Курс'][userInfo.course][userInfo.group]
 
-        doc = await shedule_collection.find_one(
-            {
-                'Место': userInfo.place
-            }
-        )
-        shedule_dict = doc['Курс'][userInfo.course][userInfo.group]
         weekShedule = WeekSheduleFactory(shedule_dict).get()
 
         return weekShedule
 
+    async def _get_next_week_color(self) -> int:
+        this_week_color = await self._get_week_color()
+        if this_week_color == 0:
+            return 1
+        return 0
+
+    async def get_week_shedule(self, userInfo: UserInfo) -> WeekShedule:
+        shedule_db_logger.info('Getting week shedule')
+
+        return await self._get_week_shedule(userInfo, await self._get_week_color())
+
     async def get_next_week_shedule(self, userInfo: UserInfo) -> WeekShedule:
         shedule_db_logger.info('Getting week shedule')
 
-        this_week_color = await self._get_week_color()
-        if this_week_color == 0:
-            next_week_color = 1
-        else:
-            next_week_color = 0
+        return await self._get_week_shedule(userInfo, await self._get_next_week_color())
 
-        shedule_collection = await self._get_shedule_collection(next_week_color)
+    async def _get_week_text(self, userInfo: UserInfo, week_type: Literal[0, 1]) -> str:
+        entry = await self._get_cache_entry(userInfo.place, week_type)
+        key = (userInfo.course, userInfo.group, None)
+        text = entry.texts.get(key)
+        if text is not None:
+            await metrics.export('shedule_text_cache_hit')
+            return text
 
-        doc = await shedule_collection.find_one(
-            {
-                'Место': userInfo.place
-            }
-        )
-        shedule_dict = doc['Курс'][userInfo.course][userInfo.group]
-        weekShedule = WeekSheduleFactory(shedule_dict).get()
+        await metrics.export('shedule_text_cache_miss')
+        weekShedule = await self._get_week_shedule(userInfo, week_type)
+        text = self._render_week(weekShedule)
+        entry.texts[key] = text
+        return text
 
-        return weekShedule
+    async def get_week_text(self, userInfo: UserInfo) -> str:
+        """Rendered week shedule message
+        """
+        shedule_db_logger.info('Getting week shedule text')
+
+        return await self._get_week_text(userInfo, await self._get_week_color())
+
+    async def get_next_week_text(self, userInfo: UserInfo) -> str:
+        """Rendered next week shedule message
+        """
+        shedule_db_logger.info('Getting next week shedule text')
+
+        return await self._get_week_text(userInfo, await self._get_next_week_color())
 
     async def _get_shedule_for_user(self, doc: dict, userInfo: UserInfo) -> dict:
         course_shedule = doc['Курс'].get(userInfo.course, None)
@@ -156,11 +372,18 @@ class SheduleDB:
     async def get_day_shedule(self, day: str, userInfo: UserInfo) -> DayShedule:
         shedule_db_logger.info('Getting day shedule')
 
-        shedule_collection = await self._get_shedule_collection()
+        week_type = await self._get_week_color()
 
-        doc = await shedule_collection.find_one(
-            {'Место': userInfo.place}
-        )
+        index_day = day
+        day_shedule = await self._get_group_day(userInfo, week_type, index_day)
+        if day_shedule is None:
+            index_day = 'Понедельник'
+            day_shedule = await self._get_group_day(userInfo, week_type, index_day)
+        if day_shedule is not None:
+            return DaySheduleFactory({index_day: day_shedule}).get()
+
+        # Group is not in index, look into the place document
+        doc = await self._get_place_group(userInfo, week_type)
         group_shedule = await self._get_shedule_for_user(doc, userInfo)
         if isinstance(group_shedule, str):
             return group_shedule
@@ -177,49 +400,69 @@ class SheduleDB:
 
         return dayShedule
 
-    async def get_change_shedule(self, date: datetime.date, userInfo: UserInfo) -> DayShedule:
-        shedule_db_logger.info('Getting change shedule')
-
-        f_date = date
+    async def get_day_text(self, day: str, userInfo: UserInfo) -> str:
+        """Rendered day shedule message
+        """
+        shedule_db_logger.info('Getting day shedule text')
+
+        entry = await self._get_cache_entry(userInfo.place, await self._get_week_color())
+        key = (userInfo.course, userInfo.group, day)
+        text = entry.texts.get(key)
+        if text is not None:
+            await metrics.export('shedule_text_cache_hit')
+            return text
+
+        await metrics.export('shedule_text_cache_miss')
+        dayShedule = await self.get_day_shedule(day, userInfo)
+        text = self._render_day(dayShedule)
+        entry.texts[key] = text
+        return text
+
+    def _get_change_date(self, date: datetime.date) -> datetime.date:
         if date.weekday() == 5:
             # Saturday to Monday
-            f_date += datetime.timedelta(days=2)
+            return date + datetime.timedelta(days=2)
         elif date.weekday() == 6:
             # Sunday to Monday
-            f_date += datetime.timedelta(days=1)
+            return date + datetime.timedelta(days=1)
+        return date
+
+    async def _find_change_doc(self, place: str, date: datetime.date, userInfo: UserInfo) -> Union[dict, None]:
+        if safe_path(userInfo.course, userInfo.group):
+            fields = [f'Курс.{userInfo.course}.{userInfo.group}']
+        else:
+            fields = ['Курс']
 
-        # Find change shedule tomorrow
         doc = await self._change_shedule.find_one(
             {
-                "Место": userInfo.place,
-                "Дата": f_date.strftime('%Y-%m-%d')
-
-            }
+                "Место": place,
+                "Дата": date.strftime('%Y-%m-%d')
+            },
+            projection(fields)
         )
-        # If no change to tomorrow find today
-        if not doc:
-            today = datetime.date.today()
-            change_date = f_date
-            f_date = today
-            doc = await self._change_shedule.find_one(
-                {
-                    "Место": userInfo.place,
-                    "Дата": today.strftime('%Y-%m-%d')
-                }
-            )
-        try:
-            course_shedule = doc["Курс"].get(userInfo.course, None)
-        except TypeError:
-            return f'Нет замен ни на {change_date.strftime("%m-%d")}, ни на {today.strftime("%m-%d")}'
-        
+        return doc
+
+    def _make_change_shedule(self, doc: dict, date: datetime.date, course: str, group: str) -> Union[DayShedule, str]:
+        """Get group changes from change shedule document
+
+        Args:
+            doc (dict): Change shedule document of the <date>
+            date (datetime.date): Date of the document
+            course (str): Group course
+            group (str): Group name
+
+        Returns:
+            Union[DayShedule, str]: Changes or message why there is no changes
+        """
+        course_shedule = doc["Курс"].get(course, None)
         if course_shedule is None:
-            return f'В заменах твоего курса ({userInfo.course}) нет'
+            return f'В заменах твоего курса ({course}) нет'
         
-        group_shedule = course_shedule.get(userInfo.group, None)
+        group_shedule = course_shedule.get(group, None)
         if group_shedule is None:
-            return f'В заменах твоей группы ({userInfo.group}) нет'
+            return f'В заменах твоей группы ({group}) нет'
 
-        day = SHEDULE_DAY.WEEKDAYS[f_date.weekday()]
+        day = SHEDULE_DAY.WEEKDAYS[date.weekday()]
         shedule = {
             day: group_shedule
         }
@@ -227,47 +470,326 @@ class SheduleDB:
 
         return dayShedule
 
-    async def get_combined_shedule(self, userInfo: UserInfo) -> DayShedule:
+    async def get_change_shedule(self, date: datetime.date, userInfo: UserInfo) -> DayShedule:
+        shedule_db_logger.info('Getting change shedule')
+
+        f_date = self._get_change_date(date)
+
+        # Find change shedule tomorrow
+        doc = await self._find_change_doc(userInfo.place, f_date, userInfo)
+        # If no change to tomorrow find today
+        if not doc:
+            today = datetime.date.today()
+            change_date = f_date
+            f_date = today
+            doc = await self._find_change_doc(userInfo.place, today, userInfo)
+        if doc is None:
+            return f'Нет замен ни на {change_date.strftime("%m-%d")}, ни на {today.strftime("%m-%d")}'
+
+        return self._make_change_shedule(doc, f_date, userInfo.course, userInfo.group)
+
+    async def _get_change_entry(self, place: str, date: datetime.date) -> CacheEntry:
+        """Get cache entry of change shedule document.
+        Entry version is None if there is no document for the date
+        """
+        self._start_watcher()
+
+        date_str = date.strftime('%Y-%m-%d')
+        entry = self._cache.get(place, date_str)
+        if entry is not None and entry.fresh(self._cache.revalidate_interval):
+            return entry
+
+        r = await self._change_shedule.find_one(
+            {
+                "Место": place,
+                "Дата": date_str
+            },
+            projection(['version'])
+        )
+        version = r.get('version', 0) if r is not None else None
+
+        if entry is not None and entry.version == version:
+            entry.touch()
+            return entry
+
+        return self._cache.put(place, date_str, version)
+
+    async def get_change_text(self, date: datetime.date, userInfo: UserInfo) -> str:
+        """Rendered change shedule message
+        """
+        shedule_db_logger.info('Getting change shedule text')
+
+        f_date = self._get_change_date(date)
+        today = datetime.date.today()
+
+        # Changes to tomorrow, if there is no, changes to today
+        for change_date in (f_date, today):
+            entry = await self._get_change_entry(userInfo.place, change_date)
+            if entry.version is None:
+                continue
+
+            key = (userInfo.course, userInfo.group)
+            text = entry.texts.get(key)
+            if text is not None:
+                await metrics.export('shedule_text_cache_hit')
+                return text
+
+            await metrics.export('shedule_text_cache_miss')
+            doc = await self._find_change_doc(userInfo.place, change_date, userInfo)
+            if doc is None:
+                continue
+            text = self._render_change(
+                self._make_change_shedule(doc, change_date, userInfo.course, userInfo.group)
+            )
+            entry.texts[key] = text
+            return text
+
+        return f'Нет замен ни на {f_date.strftime("%m-%d")}, ни на {today.strftime("%m-%d")}'
+
+    async def get_change_texts(self, date: datetime.date, place: str, groups: list[tuple[str, str]]) -> dict:
+        """Change shedule of many groups at once rendered without header,
+        notifications add their own one. Change shedule document is read at most once
+
+        Args:
+            date (datetime.date): Date of changes
+            place (str): Place of the groups
+            groups (list[tuple[str, str]]): (course, group) pairs
+
+        Returns:
+            dict: (course, group) -- message
+        """
+        shedule_db_logger.info(f'Getting change shedule texts for {len(groups)} groups')
+
+        f_date = self._get_change_date(date)
+        today = datetime.date.today()
+
+        # Changes to tomorrow, if there is no, changes to today
+        for change_date in (f_date, today):
+            entry = await self._get_change_entry(place, change_date)
+            if entry.version is not None:
+                break
+        else:
+            text = f'Нет замен ни на {f_date.strftime("%m-%d")}, ни на {today.strftime("%m-%d")}'
+            return {key: text for key in groups}
+
+        missing = [key for key in groups if (*key, None) not in entry.texts]
+        if missing:
+            await metrics.export('shedule_text_cache_miss')
+            doc = await self._change_shedule.find_one(
+                {
+                    "Место": place,
+                    "Дата": change_date.strftime('%Y-%m-%d')
+                },
+                projection(['Курс'])
+            )
+            if doc is None:
+                # Document was deleted after version check
+                text = f'Нет замен на {change_date.strftime("%m-%d")}'
+                return {key: entry.texts.get((*key, None), text) for key in groups}
+
+            for course, group in missing:
+                entry.texts[(course, group, None)] = self._render_change_body(
+                    self._make_change_shedule(doc, change_date, course, group)
+                )
+        else:
+            await metrics.export('shedule_text_cache_hit')
+
+        return {key: entry.texts[(*key, None)] for key in groups}
+
+    def _render_day(self, dayShedule: Union[DayShedule, str]) -> str:
+        if isinstance(dayShedule, str):
+            return dayShedule
+        return f'Расписание на {dayShedule.name}:\n'+repr(dayShedule)
+
+    def _render_week(self, weekShedule: WeekShedule) -> str:
+        return repr(weekShedule)
+
+    def _render_change(self, dayShedule: Union[DayShedule, str]) -> str:
+        if isinstance(dayShedule, str):
+            return dayShedule
+        return f'Замены на {dayShedule.name}:\n'+repr(dayShedule)
+
+    def _render_change_body(self, dayShedule: Union[DayShedule, str]) -> str:
+        if isinstance(dayShedule, str):
+            return dayShedule
+        return repr(dayShedule)
+
+    async def get_combined_shedule(self, userInfo: UserInfo,
+                date: Optional[datetime.date] = None) -> Union[DayShedule, str]:
+        """Day shedule with change shedule of the date applied
+
+        Args:
+            userInfo (UserInfo): User
+            date (Optional[datetime.date]): Date. Defaults to today
+
+        Returns:
+            Union[DayShedule, str]: Shedule or message why there is no shedule
+        """
         shedule_db_logger.info('Getting combined shedule')
 
-        shedule_collection = await self._get_shedule_collection()
-        # TODO
+        if date is None:
+            date = datetime.date.today()
+        day = SHEDULE_DAY.WEEKDAYS[date.weekday()]
+
+        subjects = {}
+        dayShedule = await self.get_day_shedule(day, userInfo)
+        # Day is not in shedule, get_day_shedule gives Monday then
+        if not isinstance(dayShedule, str) and dayShedule.name == day:
+            subjects = dict(zip(dayShedule.keys, dayShedule.subjects))
+
+        # Cache entry tells if there is a change document without reading it
+        entry = await self._get_change_entry(userInfo.place, date)
+        if entry.version is not None:
+            doc = await self._find_change_doc(userInfo.place, date, userInfo)
+            changes = (doc or {}).get('Курс', {}).get(userInfo.course, {}).get(userInfo.group, {})
+            times = SHEDULE_TIME.WED_SUBJECTS if date.weekday() == 2 else SHEDULE_TIME.SUBJECTS
+            for key, subject in changes.items():
+                # Key is a pair number or 'с 1 на 5' for a moved pair
+                if key.startswith('с'):
+                    subjects.pop(key.split()[1], None)
+                number = key[-1]
+                if subject['Пара']:
+                    subjects[number] = Subject(subject['Пара'], times[int(number)-1])
+                else:
+                    # Pair is cancelled
+                    subjects.pop(number, None)
+
+        if not subjects:
+            if isinstance(dayShedule, str):
+                return dayShedule
+            return f'Нет пар на {date.strftime("%m-%d")}'
+
+        keys = sorted(subjects)
+        return DayShedule(day, [subjects[key] for key in keys], keys)
 
     async def save_shedule(self, placeShedule: dict, place: str, weekType: Literal[0, 1]) -> None:
         shedule_db_logger.info('Saving group shedule')
 
         shedule_collection = await self._get_shedule_collection(week_type=weekType)
+        version = time.time_ns()
+
+        await self._save_group_index(placeShedule, place, weekType, version)
 
-        r = await shedule_collection.insert_one(
+        r = await shedule_collection.replace_one(
+            {"Место": place},
             {
                 "Место": place,
-                **placeShedule
-            }
+                **placeShedule,
+                "version": version
+            },
+            upsert=True
         )
+        self._prerender_shedule(placeShedule, place, weekType, version)
 
-    async def save_change_shedule(self, change: dict, date: str):
-        shedule_db_logger.info('Saving change shedule')
-
-        r = await self._change_shedule.find_one(
+    def _prerender_shedule(self, placeShedule: dict, place: str,
+                        weekType: Literal[0, 1], version: int) -> None:
+        """Fill cache with messages of every group of the saved document
+        """
+        shedule_db_logger.info('Rendering saved shedule')
+
+        entry = self._cache.put(place, weekType, version)
+        for course, groups in placeShedule['Курс'].items():
+            for group, week in groups.items():
+                weekShedule = WeekSheduleFactory(week).get()
+                entry.days[(course, group, None)] = week
+                entry.texts[(course, group, None)] = self._render_week(weekShedule)
+
+                for day, subjects in week.items():
+                    dayShedule = DaySheduleFactory({day: subjects}).get()
+                    entry.days[(course, group, day)] = subjects
+                    entry.texts[(course, group, day)] = self._render_day(dayShedule)
+
+    async def _save_group_index(self, placeShedule: dict, place: str,
+                            weekType: Literal[0, 1], version: int) -> None:
+        shedule_db_logger.info('Saving group shedule index')
+
+        await self._group_shedule.create_index(GROUP_SHEDULE_INDEX, unique=True)
+        await self._group_shedule.delete_many(
             {
-                "Место": "ЛМК",
-                "Дата": date,
+                "Место": place,
+                "Неделя": weekType
             }
         )
-        if r is not None:
-            re = await self._change_shedule.delete_one(
-                {
-                    "_id": r['_id']
-                }
-            )
-        
-        r = await self._change_shedule.insert_one(
+        docs = flatten_place_shedule(placeShedule, place, weekType, version)
+        if docs:
+            await self._group_shedule.insert_many(docs)
+
+    async def save_change_shedule(self, change: dict, date: str) -> list[tuple[str, str]]:
+        """Save change shedule of the date with content hash of every group.
+        Nothing is written if all hashes are the same as in the saved document
+
+        Args:
+            change (dict): Change shedule document
+            date (str): Date of changes YYYY-MM-DD
+
+        Returns:
+            list[tuple[str, str]]: (course, group) pairs whose changes were added, edited or removed
+        """
+        shedule_db_logger.info('Saving change shedule')
+
+        query = {
+            "Место": "ЛМК",
+            "Дата": date,
+        }
+        hashes = self._change_hashes(change)
+
+        old = await self._change_shedule.find_one(query, projection(['hashes']))
+        old_hashes = {}
+        if old is not None:
+            if 'hashes' in old:
+                old_hashes = {(h['Курс'], h['Группа']): h['hash'] for h in old['hashes']}
+            else:
+                # Document saved before hashes were stored
+                old = await self._change_shedule.find_one(query, projection(['Курс']))
+                old_hashes = self._change_hashes(old or {})
+
+        changed = [key for key, digest in hashes.items() if old_hashes.get(key) != digest]
+        changed += [key for key in old_hashes if key not in hashes]
+        if old is not None and not changed:
+            shedule_db_logger.info('Change shedule is the same')
+            return []
+        shedule_db_logger.info(f'{len(changed)} groups changed')
+
+        version = time.time_ns()
+        await self._change_shedule.replace_one(
+            query,
             {
-                "Место": "ЛМК",
-                "Дата": date,
-                **change
-            }
+                **query,
+                **change,
+                "hashes": [
+                    {"Курс": course, "Группа": group, "hash": digest}
+                    for (course, group), digest in hashes.items()
+                ],
+                "version": version
+            },
+            upsert=True
         )
+        self._prerender_changes(change, "ЛМК", date, version)
+        return changed
+
+    def _change_hashes(self, change: dict) -> dict:
+        """Returns:
+            dict: (course, group) -- sha256 of the group changes
+        """
+        hashes = {}
+        for course, groups in change.get('Курс', {}).items():
+            for group, group_shedule in groups.items():
+                content = json.dumps(group_shedule, ensure_ascii=False, sort_keys=True)
+                hashes[(course, group)] = hashlib.sha256(content.encode()).hexdigest()
+        return hashes
+
+    def _prerender_changes(self, change: dict, place: str, date: str, version: int) -> None:
+        """Fill cache with change messages of every group of the saved document
+        """
+        shedule_db_logger.info('Rendering saved changes')
+
+        entry = self._cache.put(place, date, version)
+        day = SHEDULE_DAY.WEEKDAYS[datetime.date.fromisoformat(date).weekday()]
+        for course, groups in change['Курс'].items():
+            for group, group_shedule in groups.items():
+                dayShedule = DaySheduleFactory({day: group_shedule}).get()
+                entry.texts[(course, group)] = self._render_change(dayShedule)
+                entry.texts[(course, group, None)] = self._render_change_body(dayShedule)
 
 
 sheduleDB = SheduleDB()
\ No newline at end of file
@@ -1,12 +1,26 @@
 import datetime
-# import pymongo
+import pymongo
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from config import settings
 
+from bot.core.statistics.metrics.prometheus import USERS_DB_SECONDS
+from bot.core.statistics.metrics.request_timing import timed_methods
+from bot.core.utils.db.projection import projection
 from bot.core.utils.types.userinfo import UserInfo
 
 
+# Fields stored by UserInfo.dict()
+USERINFO_FIELDS = (
+    'userID', 'social', 'course', 'group', 'place',
+    'shedule_notify', 'changes_notify', 'next_subject_notify',
+    'trial_expires', 'shedule_notify_minute', 'next_subject_before'
+)
+# Fields enough to send a message to user
+RECIPIENT_FIELDS = ('userID', 'social', 'course', 'group', 'place')
+
+
+@timed_methods(USERS_DB_SECONDS, kind='db')
 class UsersDB:
     def __init__(self) -> None:
         client = AsyncIOMotorClient(
@@ -18,50 +32,66 @@ class UsersDB:
 
         self._users = self._database['users']
 
+    async def create_indexes(self):
+        """Indexes of notification buckets, every notifier tick reads one bucket
+        """
+        await self._users.create_index(
+            [
+                ('shedule_notify', pymongo.ASCENDING),
+                ('shedule_notify_minute', pymongo.ASCENDING)
+            ]
+        )
+        await self._users.create_index(
+            [
+                ('next_subject_notify', pymongo.ASCENDING),
+                ('next_subject_before', pymongo.ASCENDING)
+            ]
+        )
+
     async def create_user(self, userInfo: UserInfo):
         r = await self._users.insert_one(
             userInfo.dict()
         )
 
     async def update_user(self, userInfo: UserInfo):
-        a = await self._users.find_one(
-            {'userID': userInfo.userID}
-        )
-        _id = a['_id']
-
         r = await self._users.update_one(
-            {'_id': _id},
+            {'userID': userInfo.userID},
             {
                 '$set': {**userInfo.dict()}
             }
         )
 
-    async def get_user_info(self, user_id: int) -> UserInfo:
+    async def get_user_info(self, user_id: int, fields: tuple = USERINFO_FIELDS) -> UserInfo:
         r = await self._users.find_one(
             {
                 'userID': user_id
-            }
+            },
+            projection(fields)
         )
         if r is None:
             return None
 
-        r.pop('_id')
-
         userInfo = UserInfo(
             **r
         )
         return userInfo
 
-    async def get_users(self, filter: dict) -> dict:
+    async def get_users(self, filter: dict, fields: tuple = RECIPIENT_FIELDS) -> list[UserInfo]:
+        """Find users by filter
+
+        Args:
+            filter (dict): MongoDB filter
+            fields (tuple): Fields to fetch, must contain UserInfo required fields.
+                Defaults to RECIPIENT_FIELDS
+
+        Returns:
+            list[UserInfo]: Found users
+        """
         # TODO Find only with subcription
         users = []
-        async for r in self._users.find(filter):
+        async for r in self._users.find(filter, projection(fields)):
             userInfo = UserInfo(
-                userID=r['userID'],
-                social=r['social'],
-                course=r['course'],
-                group=r['group'],
-                place=r['place']
+                **r
             )
             users.append(userInfo)
 
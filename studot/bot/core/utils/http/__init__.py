@@ -0,0 +1 @@
+from bot.core.utils.http.client import HTTPClient, HTTPResponse, httpClient
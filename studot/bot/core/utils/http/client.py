@@ -0,0 +1,152 @@
+import hashlib
+import logging
+
+from typing import Optional
+
+import aiohttp
+
+from config import settings
+
+
+http_client_logger = logging.getLogger(__name__)
+http_client_logger.setLevel(logging.INFO)
+handler = logging.FileHandler(f"logs/HTTPClient.log", mode='w')
+formatter = logging.Formatter("%(name)s %(asctime)s %(levelname)s %(message)s")
+handler.setFormatter(formatter)
+http_client_logger.addHandler(handler)
+http_client_logger.addHandler(logging.StreamHandler())
+
+
+class HTTPResponse:
+    """Result of a conditional request
+
+    Attributes:
+        modified (bool): False if server answered 304 Not Modified
+        text (Optional[str]): Body of get_text_if_modified
+        path (Optional[str]): File of download_if_modified
+        digest (Optional[str]): sha256 of the body
+        etag (Optional[str]): ETag header to send as If-None-Match next time
+        last_modified (Optional[str]): Last-Modified header to send as If-Modified-Since next time
+    """
+
+    def __init__(self, modified: bool,
+                text: Optional[str] = None,
+                path: Optional[str] = None,
+                digest: Optional[str] = None,
+                etag: Optional[str] = None,
+                last_modified: Optional[str] = None) -> None:
+        self.modified = modified
+        self.text = text
+        self.path = path
+        self.digest = digest
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+def _conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> dict:
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    return headers
+
+
+class HTTPClient:
+    """Shared aiohttp session with keep-alive connection pool
+
+    Session is created on first request in the running loop,
+    every process has its own one.
+    """
+
+    def __init__(self) -> None:
+        self.timeout = aiohttp.ClientTimeout(
+            total=settings.http['timeout'],
+            connect=settings.http['connect-timeout']
+        )
+        self.pool_size = settings.http['pool-size']
+        self.keepalive = settings.http['keepalive']
+        self.chunk_size = settings.http['chunk-size']
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                raise_for_status=True
+            )
+        return self._session
+
+    async def get_text(self, url: str) -> str:
+        r = await self.get_text_if_modified(url)
+        return r.text
+
+    async def get_text_if_modified(self, url: str,
+                etag: Optional[str] = None,
+                last_modified: Optional[str] = None) -> HTTPResponse:
+        """GET with If-None-Match/If-Modified-Since, body is not read on 304
+        """
+        async with self.session.get(url, headers=_conditional_headers(etag, last_modified)) as r:
+            if r.status == 304:
+                return HTTPResponse(modified=False, etag=etag, last_modified=last_modified)
+
+            body = await r.read()
+            return HTTPResponse(
+                modified=True,
+                text=body.decode(r.get_encoding()),
+                digest=hashlib.sha256(body).hexdigest(),
+                etag=r.headers.get('ETag'),
+                last_modified=r.headers.get('Last-Modified')
+            )
+
+    async def download(self, url: str, path: str) -> str:
+        """Stream response body to file by chunks
+
+        Returns:
+            str: File path
+        """
+        r = await self.download_if_modified(url, path)
+        return r.path
+
+    async def download_if_modified(self, url: str, path: str,
+                etag: Optional[str] = None,
+                last_modified: Optional[str] = None) -> HTTPResponse:
+        """Stream response body to file by chunks hashing it on the way.
+        Nothing is written on 304
+        """
+        async with self.session.get(url, headers=_conditional_headers(etag, last_modified)) as r:
+            if r.status == 304:
+                http_client_logger.info(f'{url} is not modified')
+                return HTTPResponse(modified=False, etag=etag, last_modified=last_modified)
+
+            http_client_logger.info(f'Downloading {url} to {path}')
+            digest = hashlib.sha256()
+            size = 0
+            with open(path, 'wb') as file:
+                async for chunk in r.content.iter_chunked(self.chunk_size):
+                    file.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+
+            http_client_logger.info(f'{path} downloaded, {size} bytes')
+            return HTTPResponse(
+                modified=True,
+                path=path,
+                digest=digest.hexdigest(),
+                etag=r.headers.get('ETag'),
+                last_modified=r.headers.get('Last-Modified')
+            )
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+httpClient = HTTPClient()
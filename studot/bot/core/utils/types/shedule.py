@@ -1,4 +1,5 @@
 # from overrides import override
+import sys
 from typing import Union
 from dataclasses import dataclass
 
@@ -62,6 +63,46 @@ class SHEDULE_TIME:
     WED_SUBJECTS = [one, two, three, wed_four, wed_five, wed_six, wed_seven]
 
 
+def _make_times() -> dict:
+    times = {}
+    for time in (
+            SHEDULE_TIME.SUBJECTS
+            + SHEDULE_TIME.WED_SUBJECTS
+            + [SHEDULE_TIME.hour]):
+        times[f'{time[0]}-{time[1]}'] = time
+    return times
+
+
+# One tuple per lesson time, shared by every Subject
+_TIMES = _make_times()
+
+# Start times of all lessons, '8:00' etc.
+SUBJECT_STARTS = frozenset(time[0] for time in _TIMES.values())
+
+
+def intern_time(time: Union[tuple[str], list[str], str]) -> tuple[str]:
+    """Get shared tuple for lesson time
+
+    Args:
+        time (Union[tuple[str], list[str], str]): ('8:00', '9:30'), ['8:00', '9:30'] or '8:00-9:30'
+
+    Returns:
+        tuple[str]: Time tuple from SHEDULE_TIME if there is such time
+    """
+    if isinstance(time, str):
+        key = time
+    else:
+        key = f'{time[0]}-{time[1]}'
+
+    interned = _TIMES.get(key)
+    if interned is not None:
+        return interned
+
+    if isinstance(time, str):
+        time = time.split('-')
+    return (time[0], time[1])
+
+
 class Subject:
     """Subject class for representive subjects
 
@@ -70,15 +111,16 @@ class Subject:
         time (str): Time in string when subject to start
     """
 
+    __slots__ = ('name', 'time')
+
     name: str
     time: tuple[str]
 
     def __init__(self, name: str, time: Union[tuple[str], list[str], str]) -> None:
+        if isinstance(name, str):
+            name = sys.intern(name)
         self.name = name
-        self.time = time
-        if isinstance(time, str):
-            time = time.split('-')
-            self.time = (time[0], time[1])
+        self.time = intern_time(time)
 
     def __str__(self) -> str:
         return self.__dict__().__str__()
@@ -94,6 +136,8 @@ class Subject:
 
 
 class IShedule:
+    __slots__ = ()
+
     def dict(self) -> dict:
         ...
 
@@ -106,8 +150,10 @@ class DayShedule(IShedule):
         subjects (lits[Subject]): List of subjects by a day
     """
 
+    __slots__ = ('_name', '_subjects', 'keys', '_shedule')
+
     _name: str
-    _subjects: list[Subject]
+    _subjects: tuple[Subject]
 
     def __init__(self, 
             day: SHEDULE_DAY, 
@@ -115,22 +161,26 @@ class DayShedule(IShedule):
             keys: list[str]) -> None:
         
         self._name = day
-        self._subjects = subjects
-        self.keys = keys
+        self._subjects = tuple(subjects)
+        self.keys = tuple(keys)
 
-        self._make_dict()
+        self._shedule = None
 
-    def _make_dict(self):
-        subs = [sub.__dict__() for sub in self._subjects]
-
-        self.shedule = dict(zip(self.keys, subs))
+    @property
+    def shedule(self) -> dict:
+        """Dict view, made on first use
+        """
+        if self._shedule is None:
+            subs = [sub.__dict__() for sub in self._subjects]
+            self._shedule = dict(zip(self.keys, subs))
+        return self._shedule
 
     @property
     def name(self) -> str:
         return self._name
 
     @property
-    def subjects(self) -> list[Subject]:
+    def subjects(self) -> tuple[Subject]:
         return self._subjects
 
     # @override
@@ -138,10 +188,10 @@ class DayShedule(IShedule):
         return self.shedule
 
     def __repr__(self) -> str:
-        re = ''
-        for c, subject in enumerate(self._subjects):
-            re += f'{self.keys[c]}: {subject.name}\n({subject.time[0]}-{subject.time[1]})\n'
-        return re
+        return ''.join(
+            f'{key}: {subject.name}\n({subject.time[0]}-{subject.time[1]})\n'
+            for key, subject in zip(self.keys, self._subjects)
+        )
 
 
 class WeekShedule(IShedule):
@@ -150,34 +200,44 @@ class WeekShedule(IShedule):
     This is a list of DayShedule
     """
 
+    __slots__ = ('_shedule', '_week_shedule')
+
     def __init__(self, days_shedule: list[DayShedule]) -> None:
-        days = [day.name for day in days_shedule]
-        shedule = [day_shed.dict() for day_shed in days_shedule]
+        self._shedule = tuple(days_shedule)
+        self._week_shedule = None
 
-        self.week_shedule = dict(zip(days, shedule))
-        self._shedule = days_shedule
+    @property
+    def week_shedule(self) -> dict:
+        """Dict view, made on first use
+        """
+        if self._week_shedule is None:
+            self._week_shedule = {
+                day_shed.name: day_shed.dict()
+                for day_shed in self._shedule
+            }
+        return self._week_shedule
 
     # @override
     def dict(self) -> dict:
         return self.week_shedule
 
-    def day(self, day: str) -> DayShedule:
+    def day(self, day: str) -> dict:
         return self.week_shedule[day]
 
     def days_with(self, subject: str):
         con = {}
-        for day, shedule in self.week_shedule.items():
-            for sub in shedule.values():
+        for day_shed in self._shedule:
+            for sub in day_shed.subjects:
                 if sub.name == subject:
-                    con[day] = shedule
+                    con[day_shed.name] = day_shed.dict()
                     break
         return con
 
     def __repr__(self) -> str:
-        re = ''
-        for shedule in self._shedule:
-            re += f'{shedule.name}:\n{shedule}\n\n'
-        return re
+        return ''.join(
+            f'{shedule.name}:\n{shedule!r}\n\n'
+            for shedule in self._shedule
+        )
 
 
 class GroupShedule(IShedule):
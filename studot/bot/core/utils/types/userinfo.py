@@ -2,6 +2,10 @@ from datetime import time
 from typing import Literal, Optional, Union
 
 
+# Minutes before the next subject to notify
+DEFAULT_NEXT_SUBJECT_BEFORE = 10
+
+
 class UserInfo:
     """
     userID: ID in social network,
@@ -20,13 +24,18 @@ class UserInfo:
     changes_notify: bool
     next_subject_notify: bool
 
+    shedule_notify_minute: Optional[int] # Minute of day for shedule notify, None -- default time
+    next_subject_before: int # Minutes before the next subject to notify
+
     def __init__(self, userID: int, social: str, 
                 course: Literal['1', '2', '3', '4'], 
                 group: str, place: str, 
                 shedule_notify=False,
                 changes_notify=True,
                 next_subject_notify=False,
-                trial_expires: Optional[time] = None
+                trial_expires: Optional[time] = None,
+                shedule_notify_minute: Optional[int] = None,
+                next_subject_before: int = DEFAULT_NEXT_SUBJECT_BEFORE
     ) -> None:
         self.userID = userID
         self.course = course
@@ -38,6 +47,9 @@ class UserInfo:
         self.changes_notify = changes_notify
         self.next_subject_notify = next_subject_notify
 
+        self.shedule_notify_minute = shedule_notify_minute
+        self.next_subject_before = next_subject_before
+
         self.trial_expires = trial_expires
 
     def dict(self) -> dict:
@@ -49,4 +61,17 @@ class UserInfo:
         Returns:
             list
         """
-        return [self.place, self.course, self.group, self.userID, self.social]
\ No newline at end of file
+        return [self.place, self.course, self.group, self.userID, self.social]
+
+
+def minute_of_day(time_str: str) -> int:
+    """'18:30' -> 1110, for UserInfo.shedule_notify_minute
+    """
+    hours, minutes = time_str.split(':')
+    return int(hours)*60 + int(minutes)
+
+
+def time_of_minute(minute: int) -> str:
+    """1110 -> '18:30'
+    """
+    return f'{minute//60}:{minute%60:02d}'
@@ -0,0 +1 @@
+from bot.core.utils.workers.pool import ParsingPool, PoolQueueFull, parsingPool
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from config import settings
+
+
+pool_logger = logging.getLogger(__name__)
+pool_logger.setLevel(logging.INFO)
+handler = logging.FileHandler(f"logs/ParsingPool.log", mode='w')
+formatter = logging.Formatter("%(name)s %(asctime)s %(levelname)s %(message)s")
+handler.setFormatter(formatter)
+pool_logger.addHandler(handler)
+pool_logger.addHandler(logging.StreamHandler())
+
+
+class PoolQueueFull(Exception):
+    """All places of the parsing queue are taken
+    """
+
+
+class ParsingPool:
+    """Shared process pool for CPU-heavy parsing (pandas, JSON), so the event loop
+    keeps handling messages while a file is parsed
+
+    At most <queue_size> calls are running or waiting for a worker.
+    Cancelled and timed out calls are removed from the pool if they have not started,
+    a started one runs to the end and its result is dropped.
+    Every process has its own pool, workers are started on first use.
+    """
+
+    def __init__(self, processes: Optional[int] = None,
+                queue_size: Optional[int] = None,
+                timeout: Optional[float] = None) -> None:
+        """
+        Args:
+            processes (Optional[int], optional): Worker processes. Defaults to settings.
+            queue_size (Optional[int], optional): Calls running or waiting at once. Defaults to settings.
+            timeout (Optional[float], optional): Seconds to wait for one call. Defaults to settings.
+        """
+        self.processes = processes or settings.parsing_pool['processes']
+        self.queue_size = queue_size or settings.parsing_pool['queue-size']
+        self.timeout = timeout or settings.parsing_pool['timeout']
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Created in the running loop on first call
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._futures: set[asyncio.Future] = set()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            pool_logger.info(f'Starting parsing pool of {self.processes} processes')
+            self._executor = ProcessPoolExecutor(max_workers=self.processes)
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.queue_size)
+        return self._slots
+
+    async def run(self, func: Callable, *args, wait: bool = True) -> Any:
+        """Call func(*args) in a worker process
+
+        Args:
+            func (Callable): Module level function, it is pickled to the worker
+            wait (bool, optional): Wait for a queue place if all are taken,
+                otherwise raise PoolQueueFull. Defaults to True.
+
+        Raises:
+            PoolQueueFull: Queue is full and wait is False
+            asyncio.TimeoutError: Call took longer than timeout
+
+        Returns:
+            Any: func result
+        """
+        slots = self._get_slots()
+        if not wait and slots.locked():
+            raise PoolQueueFull(f'{self.queue_size} files are already parsed')
+
+        name = getattr(func, '__name__', repr(func))
+        async with slots:
+            loop = asyncio.get_running_loop()
+            start = time.monotonic()
+            future = loop.run_in_executor(self._get_executor(), func, *args)
+            self._futures.add(future)
+            try:
+                result = await asyncio.wait_for(future, self.timeout)
+            except BrokenProcessPool:
+                # A worker died, next call starts a new pool
+                pool_logger.error(f'{name}: parsing pool is broken')
+                self._executor = None
+                raise
+            except asyncio.TimeoutError:
+                pool_logger.error(f'{name}: no result in {self.timeout}s')
+                raise
+            except asyncio.CancelledError:
+                pool_logger.info(f'{name}: cancelled')
+                raise
+            finally:
+                self._futures.discard(future)
+
+        pool_logger.info(f'{name} done in {time.monotonic()-start:.2f}s')
+        return result
+
+    def cancel_all(self) -> None:
+        """Cancel every call of this pool, waiting callers get CancelledError
+        """
+        for future in list(self._futures):
+            future.cancel()
+
+    def shutdown(self) -> None:
+        self.cancel_all()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+parsingPool = ParsingPool()
@@ -0,0 +1,71 @@
+# usr/local/bin/python3
+"""CSVParser benchmark
+Compares row by row and vectorized CSVParser modes on a corpus
+of normalized change tables (beauty.csv files sent to admin, PDFParser.extract_csv).
+Both modes must give the same dict with the same key order.
+
+cli/Benchmarks/tables has hand-made tables with the parse corner cases:
+rows before the first course, repeated courses and groups, empty cells,
+moved pairs, numeric pair column. Real tables may be added there too.
+
+Run from studot folder:
+    python3 -m cli.Benchmarks.csv_parser --corpus tables/
+    python3 -m cli.Benchmarks.csv_parser --check  # exit code 1 if results differ
+"""
+import argparse
+import glob
+import json
+import sys
+import time
+
+import pandas as pd
+
+from bot.core.data_parser.PDFParser.csv_parser import CSVParser
+
+
+def measure(df: pd.DataFrame, vectorized: bool, count: int) -> tuple[float, str]:
+    """Returns:
+        tuple[float, str]: Seconds per parse and the result dumped without key sorting
+    """
+    start = time.perf_counter()
+    for _ in range(count):
+        parser = CSVParser(dataframe=df)
+        parser.process(vectorized=vectorized)
+    elapsed = (time.perf_counter() - start) / count
+    # NaN != NaN, so results are compared as JSON text
+    return elapsed, json.dumps(parser.dict(), ensure_ascii=False)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='CSVParser benchmark')
+    argparser.add_argument('--corpus', default='cli/Benchmarks/tables/', help='Folder with *.csv change tables')
+    argparser.add_argument('--count', type=int, default=20)
+    argparser.add_argument('--check', action='store_true', help='Parse once, only compare results')
+    args = argparser.parse_args()
+
+    paths = sorted(glob.glob(args.corpus.rstrip('/')+'/*.csv'))
+    if not paths:
+        print(f'No CSV files in {args.corpus}')
+        return
+
+    count = 1 if args.check else args.count
+    different = 0
+    for path in paths:
+        df = pd.read_csv(path)
+        rows, rows_result = measure(df, False, count)
+        vectorized, vectorized_result = measure(df, True, count)
+
+        print(f'{path} ({len(df)} rows)')
+        print(f'    rows:       {rows*1000:8.2f} ms')
+        print(f'    vectorized: {vectorized*1000:8.2f} ms ({rows/vectorized:.1f}x faster)')
+        if rows_result != vectorized_result:
+            different += 1
+            print('    DIFFERENT RESULTS')
+
+    print(f'{len(paths)} tables, {different} different')
+    if different:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# usr/local/bin/python3
+"""PDF table extraction benchmark
+Compares tabula.convert_into (new JVM process per file, the old PDFParser way)
+with the warm extraction worker on sample PDF files.
+
+Run from studot folder:
+    python3 -m cli.Benchmarks.extraction --pdfs files/
+"""
+import argparse
+import asyncio
+import csv
+import glob
+import tempfile
+import time
+
+import tabula
+
+from bot.core.data_parser.PDFParser.extractor import ExtractionWorker
+
+
+def convert_into(path: str) -> list[list[str]]:
+    with tempfile.NamedTemporaryFile(suffix='.csv') as output:
+        tabula.convert_into(path, output.name, output_format='csv', pages='all')
+        with open(output.name, 'r', newline='') as file:
+            return list(csv.reader(file))
+
+
+async def measure_worker(paths: list[str], count: int) -> dict[str, tuple[float, list]]:
+    worker = ExtractionWorker()
+    start = time.perf_counter()
+    await worker.start()
+    print(f'Worker warm up: {time.perf_counter()-start:.2f}s')
+
+    results = {}
+    for path in paths:
+        start = time.perf_counter()
+        for _ in range(count):
+            rows = await worker.extract(path)
+        results[path] = ((time.perf_counter() - start) / count, rows)
+    worker.shutdown()
+    return results
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='PDF extraction benchmark')
+    argparser.add_argument('--pdfs', default='files/', help='Folder with sample *.pdf files')
+    argparser.add_argument('--count', type=int, default=3)
+    args = argparser.parse_args()
+
+    paths = sorted(glob.glob(args.pdfs.rstrip('/')+'/*.pdf'))
+    if not paths:
+        print(f'No PDF files in {args.pdfs}')
+        return
+
+    worker_results = asyncio.run(measure_worker(paths, args.count))
+
+    for path in paths:
+        start = time.perf_counter()
+        for _ in range(args.count):
+            rows = convert_into(path)
+        subprocess_time = (time.perf_counter() - start) / args.count
+        worker_time, worker_rows = worker_results[path]
+
+        print(f'{path} ({len(rows)} rows)')
+        print(f'    convert_into: {subprocess_time*1000:9.1f} ms')
+        print(f'    worker:       {worker_time*1000:9.1f} ms ({subprocess_time/worker_time:.1f}x faster)')
+        if rows != worker_rows:
+            print('    DIFFERENT ROWS')
+
+
+if __name__ == '__main__':
+    main()
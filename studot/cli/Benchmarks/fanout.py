@@ -0,0 +1,117 @@
+# usr/local/bin/python3
+"""Notification fan-out benchmark
+Starts a fake Telegram Bot API server on localhost and broadcasts
+to <users> chats one by one and with Sender.
+
+Fake server answers after <latency> ms and asks to retry
+every <flood-every> request, like Telegram does under flood.
+
+Run from studot folder:
+    python3 -m cli.Benchmarks.fanout --users 2000
+"""
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+from aiogram import Bot
+from aiogram.bot.api import TelegramAPIServer
+
+from bot.core.notifier.sender import Sender
+from bot.core.utils.types.userinfo import UserInfo
+
+
+TOKEN = '123456789:AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA'
+HOST = '127.0.0.1'
+PORT = 8181
+
+
+def make_app(latency: float, flood_every: int) -> web.Application:
+    state = {'requests': 0}
+
+    async def send_message(request: web.Request) -> web.Response:
+        state['requests'] += 1
+        data = await request.post()
+        await asyncio.sleep(latency)
+
+        if flood_every and state['requests'] % flood_every == 0:
+            return web.json_response(
+                {
+                    'ok': False,
+                    'error_code': 429,
+                    'description': 'Too Many Requests: retry after 1',
+                    'parameters': {'retry_after': 1}
+                }
+            )
+
+        return web.json_response(
+            {
+                'ok': True,
+                'result': {
+                    'message_id': state['requests'],
+                    'date': int(time.time()),
+                    'chat': {'id': int(data['chat_id']), 'type': 'private'},
+                    'text': data['text']
+                }
+            }
+        )
+
+    app = web.Application()
+    app.router.add_post(f'/bot{TOKEN}/sendMessage', send_message)
+    return app
+
+
+async def sequential(bot: Bot, users: list[UserInfo], text: str) -> None:
+    for userInfo in users:
+        try:
+            await bot.send_message(userInfo.userID, text)
+        except Exception:
+            pass
+
+
+async def run(args) -> None:
+    runner = web.AppRunner(make_app(args.latency/1000, args.flood_every))
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+
+    server = TelegramAPIServer.from_base(f'http://{HOST}:{PORT}')
+    bot = Bot(TOKEN, server=server)
+    users = [
+        UserInfo(userID=i+1, social='telegram', course='1', group='МЧМ 22-1', place='ЛМК')
+        for i in range(args.users)
+    ]
+    text = 'Появились новые замены'
+
+    try:
+        start = time.monotonic()
+        await sequential(bot, users, text)
+        print(f'Sequential:  {time.monotonic()-start:8.2f}s for {args.users} messages')
+
+        sender = Sender(
+            bot, None,
+            concurrency=args.concurrency,
+            telegram_rate=args.rate,
+            vk_rate=args.rate
+        )
+        start = time.monotonic()
+        sent, failed = await sender.send_many((userInfo, text) for userInfo in users)
+        print(f'Sender:      {time.monotonic()-start:8.2f}s for {args.users} messages (sent {sent}, failed {failed})')
+    finally:
+        await (await bot.get_session()).close()
+        await runner.cleanup()
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Notification fan-out benchmark')
+    argparser.add_argument('--users', type=int, default=1000)
+    argparser.add_argument('--latency', type=float, default=80, help='Fake API latency, ms')
+    argparser.add_argument('--flood-every', type=int, default=500, help='Answer 429 every N requests, 0 -- never')
+    argparser.add_argument('--concurrency', type=int, default=20)
+    argparser.add_argument('--rate', type=float, default=25, help='Messages per second')
+    args = argparser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# usr/local/bin/python3
+"""Projection benchmark
+Measures bytes transferred and decode time per request
+for full documents and projected ones against a local mongod.
+
+Run from studot folder:
+    python3 -m cli.Benchmarks.projection --host mongodb://localhost:27017
+"""
+import argparse
+import json
+import time
+
+import bson
+import pymongo
+from bson.raw_bson import RawBSONDocument
+
+
+SHEDULE_FILE = 'cli/MainSheduleParser/files/white/all_parsed.json'
+PLACE = 'ЛМК'
+DAY = 'Среда'
+
+USERS_COUNT = 5000
+RECIPIENT_FIELDS = ('userID', 'social', 'course', 'group', 'place')
+
+
+def projection(fields) -> dict:
+    proj = {field: 1 for field in fields}
+    proj['_id'] = 0
+    return proj
+
+
+def measure(collection, query: dict, proj, count: int) -> tuple[int, float]:
+    """Run <query> <count> times with raw documents
+
+    Returns:
+        tuple[int, float]: Bytes per request and decode seconds per request
+    """
+    size = 0
+    decode = 0.0
+    for _ in range(count):
+        raws = list(collection.find(query, proj))
+        size += sum(len(raw.raw) for raw in raws)
+
+        start = time.perf_counter()
+        for raw in raws:
+            bson.decode(raw.raw)
+        decode += time.perf_counter() - start
+
+    return size // count, decode / count
+
+
+def report(name: str, full: tuple[int, float], projected: tuple[int, float]) -> None:
+    print(name)
+    print(f'    full:      {full[0]:>10} bytes  {full[1]*1000:8.3f} ms decode')
+    print(f'    projected: {projected[0]:>10} bytes  {projected[1]*1000:8.3f} ms decode')
+    print(f'    saved:     {full[0]-projected[0]:>10} bytes  {(full[1]-projected[1])*1000:8.3f} ms decode')
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='SheduleDB/UsersDB projection benchmark')
+    argparser.add_argument('--host', default='mongodb://localhost:27017')
+    argparser.add_argument('--count', type=int, default=200)
+    args = argparser.parse_args()
+
+    client = pymongo.MongoClient(args.host, document_class=RawBSONDocument)
+    database = client['benchmark_projection']
+
+    with open(SHEDULE_FILE, 'r') as file:
+        placeShedule = json.load(file)
+    course = '1'
+    group = list(placeShedule['Курс'][course].keys())[0]
+
+    shedule = database['white-shedule']
+    shedule.drop()
+    shedule.insert_one({'Место': PLACE, **placeShedule})
+
+    users = database['users']
+    users.drop()
+    users.insert_many(
+        [
+            {
+                'userID': 10**9+i, 'social': 'telegram',
+                'course': course, 'group': group, 'place': PLACE,
+                'shedule_notify': True, 'changes_notify': True,
+                'next_subject_notify': False, 'trial_expires': None
+            }
+            for i in range(USERS_COUNT)
+        ]
+    )
+
+    query = {'Место': PLACE}
+    report(
+        f'SheduleDB.get_day_shedule ({group}, {DAY})',
+        measure(shedule, query, None, args.count),
+        measure(shedule, query, projection([f'Курс.{course}.{group}.{DAY}']), args.count)
+    )
+    report(
+        f'SheduleDB.get_week_shedule ({group})',
+        measure(shedule, query, None, args.count),
+        measure(shedule, query, projection([f'Курс.{course}.{group}']), args.count)
+    )
+
+    count = max(args.count // 20, 1)
+    query = {'changes_notify': True}
+    report(
+        f'UsersDB.get_users ({USERS_COUNT} users)',
+        measure(users, query, None, count),
+        measure(users, query, projection(RECIPIENT_FIELDS), count)
+    )
+
+    client.drop_database('benchmark_projection')
+
+
+if __name__ == '__main__':
+    main()
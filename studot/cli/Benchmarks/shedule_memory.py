@@ -0,0 +1,120 @@
+# usr/local/bin/python3
+"""Shedule model memory benchmark
+Builds WeekShedule of every group of white and green shedules
+and measures memory with tracemalloc.
+Legacy classes are the models before __slots__ and lazy dict views.
+
+Run from studot folder:
+    python3 -m cli.Benchmarks.shedule_memory
+"""
+import gc
+import json
+import tracemalloc
+
+from bot.core.utils.types.shedule import WeekSheduleFactory
+
+
+SHEDULE_FILES = [
+    'cli/MainSheduleParser/files/white/all_parsed.json',
+    'cli/MainSheduleParser/files/green/all_parsed.json'
+]
+
+
+class LegacySubject:
+    def __init__(self, name, time) -> None:
+        self.name = name
+        self.time = time
+        if isinstance(time, str):
+            time = time.split('-')
+            self.time = (time[0], time[1])
+
+    def __dict__(self) -> dict:
+        return {
+            "Пара": self.name,
+            "Время": f"{self.time[0]}-{self.time[1]}"
+        }
+
+
+class LegacyDayShedule:
+    def __init__(self, day, subjects, keys) -> None:
+        self._name = day
+        self._subjects = subjects
+        self.keys = keys
+
+        subs = [sub.__dict__() for sub in self._subjects]
+        self.shedule = dict(zip(self.keys, subs))
+
+    def dict(self) -> dict:
+        return self.shedule
+
+
+class LegacyWeekShedule:
+    def __init__(self, days_shedule) -> None:
+        days = [day._name for day in days_shedule]
+        shedule = [day_shed.dict() for day_shed in days_shedule]
+
+        self.week_shedule = dict(zip(days, shedule))
+        self._shedule = days_shedule
+
+
+def legacy_week(document: dict) -> LegacyWeekShedule:
+    days = []
+    for day, shedule in document.items():
+        days.append(
+            LegacyDayShedule(
+                day=day,
+                subjects=[
+                    LegacySubject(sub['Пара'], sub['Время'])
+                    for sub in shedule.values()
+                ],
+                keys=list(shedule.keys())
+            )
+        )
+    return LegacyWeekShedule(days)
+
+
+def current_week(document: dict):
+    return WeekSheduleFactory(document).get()
+
+
+def load_documents() -> list[dict]:
+    """Group week documents as they come from Mongo (fresh objects per group)
+    """
+    documents = []
+    for path in SHEDULE_FILES:
+        with open(path, 'r') as file:
+            placeShedule = json.load(file)
+        for groups in placeShedule['Курс'].values():
+            documents.extend(groups.values())
+    return documents
+
+
+def measure(build) -> tuple[int, int]:
+    """Build models of every group
+
+    Returns:
+        tuple[int, int]: Groups count and bytes held by the models
+    """
+    documents = load_documents()
+    gc.collect()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    models = [build(document) for document in documents]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return len(models), after - before
+
+
+def main():
+    count, legacy = measure(legacy_week)
+    _, current = measure(current_week)
+
+    print(f'Groups: {count}')
+    print(f'    legacy:  {legacy:>10} bytes')
+    print(f'    current: {current:>10} bytes ({current/legacy:.0%} of legacy)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# usr/local/bin/python3
+"""SiteParser benchmark
+Compares html5lib BeautifulSoup tree with the streaming extractor
+on saved college pages or on a synthetic page of the same layout.
+
+Save a page:
+    curl http://www.lmk-lipetsk.ru/main_razdel/shedule/index.php > pages/index.html
+
+Run from studot folder:
+    python3 -m cli.Benchmarks.site_parser --pages pages/
+"""
+import argparse
+import asyncio
+import glob
+import time
+
+from bot.core.scanner.site_parser import SiteParser
+
+
+def synthetic_page(links: int = 30, menu: int = 400, footer: int = 300) -> str:
+    """Page with the college site layout: menus, the content region, footer
+    """
+    parts = ['<!DOCTYPE html><html><head><title>Расписание</title></head><body>']
+    parts.append('<div class="header"><ul>')
+    parts.extend(f'<li><a href="/page/{i}">Раздел {i}</a></li>' for i in range(menu))
+    parts.append('</ul></div>')
+
+    parts.append('<div class="left-column"><p>Новости<br>колледжа</p></div>')
+    parts.append('<div class="right-column"><div class="breadcrumbs"><a href="/">Главная</a></div>')
+    parts.append('<div class="page-tmpl-content"><div class="text"><p>Расписание занятий</p></div>')
+    parts.append('<h2><a href="upload/main.pdf"><span>Основное расписание</span></a></h2>')
+    for i in range(links):
+        day = i % 28 + 1
+        parts.append(
+            f'<h2><a href="upload/iblock/{i}/changes.pdf">'
+            f'<span>Изменение занятий на {day:02d}.10.2023</span></a></h2><p>&nbsp;</p>'
+        )
+    parts.append('</div></div>')
+
+    parts.append('<div class="footer">')
+    parts.extend(f'<p>Контакты <b>{i}</b> &laquo;ЛМК&raquo;</p>' for i in range(footer))
+    parts.append('</div></body></html>')
+    return ''.join(parts)
+
+
+def load_pages(path: str) -> list[tuple[str, str]]:
+    pages = []
+    for filename in sorted(glob.glob(path.rstrip('/')+'/*.html')):
+        with open(filename, 'r') as file:
+            pages.append((filename, file.read()))
+    return pages
+
+
+def measure(html: str, stream: bool, count: int) -> tuple[float, list]:
+    """Returns:
+        tuple[float, list]: Seconds per parse and found (date, file url) entries
+    """
+    parser = SiteParser(stream=stream)
+    start = time.perf_counter()
+    for _ in range(count):
+        asyncio.run(parser.parse(html))
+    elapsed = (time.perf_counter() - start) / count
+    return elapsed, parser.entries
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='SiteParser benchmark')
+    argparser.add_argument('--pages', default=None, help='Folder with saved *.html pages')
+    argparser.add_argument('--count', type=int, default=20)
+    args = argparser.parse_args()
+
+    pages = load_pages(args.pages) if args.pages else []
+    if not pages:
+        pages = [('synthetic', synthetic_page())]
+
+    for name, html in pages:
+        soup, soup_result = measure(html, False, args.count)
+        stream, stream_result = measure(html, True, args.count)
+
+        print(f'{name} ({len(html)} chars, {len(stream_result)} links)')
+        print(f'    html5lib: {soup*1000:8.2f} ms')
+        print(f'    stream:   {stream*1000:8.2f} ms ({soup/stream:.0f}x faster)')
+        if soup_result != stream_result:
+            print(f'    DIFFERENT RESULTS: {set(soup_result) ^ set(stream_result)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 import datetime
 import logging
+import time
 
 from typing import Literal
 
@@ -7,6 +8,11 @@ import pymongo
 
 from config import settings
 
+from bot.core.utils.db.group_index import (
+    GROUP_SHEDULE_COLLECTION,
+    GROUP_SHEDULE_INDEX,
+    flatten_place_shedule
+)
 from bot.core.utils.types.userinfo import UserInfo
 from bot.core.utils.types.shedule import (
     WeekShedule, 
@@ -39,6 +45,7 @@ class SheduleDB:
 
         self._change_shedule = self._database['change_shedule']
         self._combined_shedule = self._database['combined_shedule']
+        self._group_shedule = self._database[GROUP_SHEDULE_COLLECTION]
 
         shedule_db_logger.info('Client is ready')
 
@@ -139,12 +146,39 @@ class SheduleDB:
         shedule_collection = self._get_shedule_collection()
         # TODO
 
-    def save_shedule(self, placeShedule: dict, weekType: Literal[0, 1]) -> None:
+    def save_shedule(self, placeShedule: dict, weekType: Literal[0, 1], place: str = 'ЛМК') -> None:
         shedule_db_logger.info('Saving group shedule')
 
         shedule_collection = self._get_shedule_collection(week_type=weekType)
+        version = time.time_ns()
+
+        self._save_group_index(placeShedule, place, weekType, version)
+
+        # version lets running bot processes drop their cached copy
+        r = shedule_collection.replace_one(
+            {"Место": place},
+            {
+                "Место": place,
+                **placeShedule,
+                "version": version
+            },
+            upsert=True
+        )
 
-        r = shedule_collection.insert_one(placeShedule)
+    def _save_group_index(self, placeShedule: dict, place: str,
+                        weekType: Literal[0, 1], version: int) -> None:
+        shedule_db_logger.info('Saving group shedule index')
+
+        self._group_shedule.create_index(GROUP_SHEDULE_INDEX, unique=True)
+        self._group_shedule.delete_many(
+            {
+                "Место": place,
+                "Неделя": weekType
+            }
+        )
+        docs = flatten_place_shedule(placeShedule, place, weekType, version)
+        if docs:
+            self._group_shedule.insert_many(docs)
 
     def save_change_shedule(self, change: dict, date: str):
         shedule_db_logger.info('Saving change shedule')
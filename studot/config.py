@@ -23,10 +23,69 @@ except:
             'available-storage-types': [
                 'CSV', 'Mongo', 'Text'
             ],
-            'export-port': 9877
+            'export-port': 9877,
+            'buffer-size': 10000,
+            'batch-size': 500,
+            'flush-interval': 5,
+            'mongo-collection': 'metrics',
+            'mongo-expire-days': 365,
+            'archive-path': 'data/metrics/archive',
+            'rotate-time': '00:05',
+            'label-values': {
+                'social': ['telegram', 'vk'],
+                'course': ['1', '2', '3', '4']
+            },
+            'slow-request': 1.0
         },
         'site-scanner': {
-            'time-interval': '10 m'
+            'time-interval': '10 m',
+            'min-interval': '1 m',
+            'max-interval': '1 h',
+            'hot-windows': ['12:00-18:00'],
+            'hot-interval': '2 m',
+            'quiet-windows': ['23:00-06:00'],
+            'quiet-interval': '30 m',
+            'boost-time': '30 m',
+            'backoff-factor': 2,
+            'backoff-limit': 4,
+            'export-port': 9878
+        },
+        'http': {
+            'timeout': 60,
+            'connect-timeout': 10,
+            'pool-size': 10,
+            'keepalive': 60,
+            'chunk-size': 65536
+        },
+        'parsing-pool': {
+            'processes': 2,
+            'queue-size': 4,
+            'timeout': 300
+        },
+        'shedule-cache': {
+            'revalidate-interval': 30,
+            'change-stream': True
+        },
+        'notifier': {
+            'concurrency': 20,
+            'telegram-rate': 25,
+            'vk-rate': 18,
+            'retries': 3,
+            'queue-batch': 100,
+            'queue-workers': 4,
+            'queue-lease': 300,
+            'export-port': 9879
+        },
+        'scheduler': {
+            'catch-up': 180,
+            'shedule-push': {
+                'time': '18:00',
+                'window': 20,
+                'skip-weekdays': [5],
+                'waves': [['1'], ['2'], ['3', '4']]
+            },
+            'shedule-notify-times': ['17:00', '18:00', '19:00', '20:00', '21:00'],
+            'next-subject-before': [5, 10, 15, 30]
         },
         'files': {
             'path': 'files/',
@@ -59,6 +118,16 @@ class Settings(BaseSettings):
 
     scanner = settings_yml['site-scanner']
 
+    http = settings_yml['http']
+
+    parsing_pool = settings_yml['parsing-pool']
+
+    shedule_cache = settings_yml['shedule-cache']
+
+    notifier = settings_yml['notifier']
+
+    scheduler = settings_yml['scheduler']
+
     files = settings_yml['files']
 
 